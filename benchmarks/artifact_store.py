@@ -0,0 +1,166 @@
+"""
+Benchmark of the registry artifact store (mlops_demo/utils/artifact_store.py).
+
+1. Compression: for each artifact type, stored size, write time and
+   joblib.load time of every codec (this is how DEFAULT_COMPRESSION was chosen).
+2. Registration: N versions registered the previous way (joblib.load +
+   joblib.dump into every version directory) vs through the content-addressed
+   store, comparing time per registration and disk usage. Every version gets a
+   new model while the scaler and imputation values are unchanged, as in
+   day-to-day retraining.
+
+Usage (from the repository root):
+    python -m benchmarks.artifact_store --versions 100
+"""
+import argparse
+import functools
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.preprocessing import StandardScaler
+
+from mlops_demo.utils.artifact_store import ArtifactStore
+from mlops_demo.utils.model_backends import get_backend
+
+CODECS = [None, 'zlib:1', 'zlib:3', 'gzip:3', 'xz:1', 'bz2:9']
+
+
+def unique_disk_usage(path):
+    """Bytes under `path`, hardlinked files counted once"""
+    seen, total = set(), 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            if (stat.st_dev, stat.st_ino) not in seen:
+                seen.add((stat.st_dev, stat.st_ino))
+                total += stat.st_size
+    return total
+
+
+def make_artifacts(workdir, rows):
+    X, y = make_classification(n_samples=rows, n_features=10, n_informative=8, random_state=42)
+    scaler = StandardScaler().fit(X)
+    X = scaler.transform(X)
+    paths = {'scaler': os.path.join(workdir, 'scaler.pkl'), 'imputation': os.path.join(workdir, 'imputation.json')}
+    joblib.dump(scaler, paths['scaler'])
+    with open(paths['imputation'], 'w') as f:
+        json.dump({'strategy': 'median', 'values': {f'f{i}': 0.0 for i in range(10)}}, f)
+    models = {}
+    for name in ('random_forest', 'hist_gradient_boosting'):
+        backend = get_backend(name)
+        models[name] = backend.build(dict(backend.default_hyperparameters)).fit(X, y)
+        paths[name] = os.path.join(workdir, f'{name}.pkl')
+        joblib.dump(models[name], paths[name])
+    return paths, models
+
+
+def compression_table(workdir, paths, repeats=3):
+    rows = []
+    for kind, source in paths.items():
+        for codec in CODECS:
+            store = ArtifactStore(os.path.join(workdir, 'codec_store'), compression={kind: codec})
+            start = time.perf_counter()
+            entry = store.put(source, kind)
+            write_seconds = time.perf_counter() - start
+            object_path = os.path.join(store.root, entry['object'])
+            load = None
+            if kind != 'imputation':
+                timings = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    joblib.load(object_path)
+                    timings.append(time.perf_counter() - start)
+                load = min(timings)
+            rows.append({
+                'artifact': kind,
+                'codec': codec or 'none',
+                'bytes': entry['bytes'],
+                'stored_bytes': entry['stored_bytes'],
+                'ratio': round(entry['bytes'] / entry['stored_bytes'], 2),
+                'write_ms': round(write_seconds * 1000, 2),
+                'load_ms': round(load * 1000, 2) if load is not None else None
+            })
+            shutil.rmtree(store.root)
+    return rows
+
+
+def legacy_register(registry, version, model_path, scaler_path, imputation_path):
+    version_path = os.path.join(registry, version)
+    os.makedirs(version_path)
+    model = joblib.load(model_path)
+    scaler = joblib.load(scaler_path)
+    joblib.dump(model, os.path.join(version_path, 'model.pkl'))
+    joblib.dump(scaler, os.path.join(version_path, 'scaler.pkl'))
+    shutil.copyfile(imputation_path, os.path.join(version_path, 'imputation.json'))
+
+
+def store_register(registry, version, model_path, scaler_path, imputation_path, compression=None):
+    version_path = os.path.join(registry, version)
+    os.makedirs(version_path)
+    ArtifactStore(os.path.join(registry, 'objects'), compression).add_version_artifacts(version_path, {
+        'model.pkl': (model_path, 'model'),
+        'scaler.pkl': (scaler_path, 'scaler'),
+        'imputation.json': (imputation_path, 'imputation')
+    })
+
+
+def registration_benchmark(workdir, paths, models, backend, n_versions, compression=None):
+    model = models[backend]
+    results = {}
+    registrations = (
+        ('legacy', legacy_register),
+        ('store', functools.partial(store_register, compression=compression))
+    )
+    for label, register in registrations:
+        registry = os.path.join(workdir, f'registry_{label}')
+        os.makedirs(registry)
+        timings = []
+        for i in range(n_versions):
+            # A retrained model: same size, different bytes
+            model.random_state = i
+            joblib.dump(model, paths[backend])
+            start = time.perf_counter()
+            register(registry, f'v_{i:04d}', paths[backend], paths['scaler'], paths['imputation'])
+            timings.append(time.perf_counter() - start)
+        results[label] = {
+            'versions': n_versions,
+            'total_seconds': round(sum(timings), 3),
+            'median_ms_per_version': round(float(np.median(timings)) * 1000, 2),
+            'disk_bytes': unique_disk_usage(registry)
+        }
+    results['speedup'] = round(results['legacy']['total_seconds'] / results['store']['total_seconds'], 2)
+    results['disk_reduction'] = round(results['legacy']['disk_bytes'] / results['store']['disk_bytes'], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--versions', type=int, default=100)
+    parser.add_argument('--rows', type=int, default=20_000, help='training rows of the benchmarked models')
+    parser.add_argument('--backend', default='random_forest')
+    parser.add_argument('--compression', default=None, help="store codecs, e.g. 'model=none' (default: DEFAULT_COMPRESSION)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='artifact_store_') as workdir:
+        paths, models = make_artifacts(workdir, args.rows)
+        table = compression_table(workdir, paths)
+        print(f"{'artifact':<24} {'codec':<8} {'bytes':>10} {'stored':>10} {'ratio':>6} {'write ms':>9} {'load ms':>8}")
+        for r in table:
+            load = '-' if r['load_ms'] is None else f"{r['load_ms']:.2f}"
+            print(f"{r['artifact']:<24} {r['codec']:<8} {r['bytes']:>10} {r['stored_bytes']:>10} "
+                  f"{r['ratio']:>6} {r['write_ms']:>9.2f} {load:>8}")
+
+        registration = registration_benchmark(
+            workdir, paths, models, args.backend, args.versions, args.compression
+        )
+        print(json.dumps(registration, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark of chunked batch scoring (mlops_demo/utils/batch_scoring.py).
+
+Compares, in rows per second, on the same customer file:
+- per_row: the generated predict.py batch_predict (registry lookup and both
+  pickles reloaded for every customer), on a small sample
+- io_floor: reading the input chunks and writing same-shaped output, no model
+- score_source with 1 and N worker processes, for CSV and Parquet inputs
+
+Usage (from the repository root):
+    python -m benchmarks.batch_scoring --rows 10000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from mlops_demo.utils.batch_scoring import DEFAULT_CHUNK_SIZE, RISK_LEVELS, score_source
+from mlops_demo.utils.features import FEATURE_NAMES, ID_COLUMN, MODEL_DTYPE
+from mlops_demo.utils.model_backends import get_backend
+from mlops_demo.utils.streaming_preprocessing import iter_chunks
+
+
+def make_customers(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(rows, len(FEATURE_NAMES))).astype('float32'), columns=FEATURE_NAMES)
+    df.insert(0, ID_COLUMN, np.arange(rows, dtype='int32'))
+    return df
+
+
+def make_registry(root, backend, train_rows=20_000):
+    """Registry with a single served version, laid out like register_model's"""
+    df = make_customers(train_rows, seed=1)
+    X = df[FEATURE_NAMES]
+    y = (X.iloc[:, :3].sum(axis=1) + np.random.default_rng(2).normal(size=train_rows) > 0).astype(int)
+    scaler = StandardScaler().fit(X)
+    backend = get_backend(backend)
+    model = backend.build(dict(backend.default_hyperparameters)).fit(scaler.transform(X).astype(MODEL_DTYPE), y)
+
+    version = 'v_benchmark'
+    version_path = os.path.join(root, version)
+    os.makedirs(version_path)
+    joblib.dump(model, os.path.join(version_path, 'model.pkl'))
+    joblib.dump(scaler, os.path.join(version_path, 'scaler.pkl'))
+    with open(os.path.join(version_path, 'lineage.json'), 'w') as f:
+        json.dump({'version': version, 'dtype_policy': {'model_dtype': MODEL_DTYPE}}, f)
+    with open(os.path.join(root, 'latest.json'), 'w') as f:
+        json.dump({'version': version, 'path': version_path}, f)
+
+
+def per_row_rate(registry, df, rows):
+    """The generated predict.py: every customer reloads the registry pointer and both pickles"""
+    start = time.perf_counter()
+    for customer in df.head(rows).to_dict('records'):
+        with open(os.path.join(registry, 'latest.json')) as f:
+            latest_info = json.load(f)
+        model = joblib.load(os.path.join(latest_info['path'], 'model.pkl'))
+        scaler = joblib.load(os.path.join(latest_info['path'], 'scaler.pkl'))
+        X = scaler.transform(pd.DataFrame([customer])[FEATURE_NAMES])
+        model.predict(X)
+        model.predict_proba(X)
+    return rows / (time.perf_counter() - start)
+
+
+def io_floor_rate(source, output, chunk_size):
+    """Read every chunk and write an output of the same shape, without scoring"""
+    os.makedirs(output)
+    rows = 0
+    start = time.perf_counter()
+    for index, chunk in enumerate(iter_chunks(source, chunk_size)):
+        pd.DataFrame({
+            ID_COLUMN: chunk[ID_COLUMN].to_numpy(),
+            'churn_probability': np.zeros(len(chunk), dtype=np.float32),
+            'prediction': np.zeros(len(chunk), dtype=np.int8),
+            'risk_level': pd.Categorical.from_codes(np.zeros(len(chunk), dtype=int), RISK_LEVELS)
+        }).to_parquet(os.path.join(output, f'part-{index:06d}.parquet'), index=False)
+        rows += len(chunk)
+    return rows / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--backend', default='random_forest')
+    parser.add_argument('--n-jobs', type=int, default=os.cpu_count())
+    parser.add_argument('--per-row-sample', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='batch_scoring_') as root:
+        registry = os.path.join(root, 'registry')
+        make_registry(registry, args.backend)
+        df = make_customers(args.rows)
+        sources = {
+            'parquet': os.path.join(root, 'customers.parquet'),
+            'csv': os.path.join(root, 'customers.csv')
+        }
+        df.to_parquet(sources['parquet'], index=False, row_group_size=args.chunk_size)
+        df.to_csv(sources['csv'], index=False)
+
+        results = {
+            'rows': args.rows,
+            'cpus': os.cpu_count(),
+            'backend': args.backend,
+            'per_row_rows_per_second': round(per_row_rate(registry, df, args.per_row_sample), 1)
+        }
+        for fmt, source in sources.items():
+            results[fmt] = {
+                'io_floor_rows_per_second': round(io_floor_rate(source, os.path.join(root, f'floor_{fmt}'), args.chunk_size))
+            }
+            for n_jobs in sorted({1, args.n_jobs}):
+                summary = score_source(source, os.path.join(root, f'scores_{fmt}_{n_jobs}'), registry_path=registry,
+                                       chunk_size=args.chunk_size, n_jobs=n_jobs, report_every=10 ** 9)
+                results[fmt][f'n_jobs={n_jobs}'] = {
+                    'rows_per_second': summary['rows_per_second'],
+                    'seconds': summary['seconds'],
+                    # Share of the run spent scoring + writing in workers (vs reading)
+                    'worker_seconds': summary['worker_seconds']
+                }
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark of the chart summary emitted by make_dataset (mlops_demo/utils/column_summary.py).
+
+For growing row counts, compares what the make_dataset_histogram_n2 chart
+block costs:
+- legacy: the chart receives the whole DataFrame and bins one full column
+  (what Mage's histogram widget did), payload = the DataFrame
+- summary: the loader summarizes every column once (summarize_seconds), the
+  chart only reads bin labels and counts, payload = the summary JSON
+
+Usage (from the repository root):
+    python -m benchmarks.column_summary --rows 10000 100000 1000000 10000000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.batch_scoring import make_customers
+from mlops_demo.utils.column_summary import summarize
+from mlops_demo.utils.features import FEATURE_NAMES
+from mlops_demo.utils.profiling import output_size_bytes
+
+COLUMN = FEATURE_NAMES[0]
+
+
+def render_legacy(df, buckets=10):
+    """Full-column histogram, as the widget built it from the raw values"""
+    values = df[COLUMN]
+    values = values[values.notna()].tolist()
+    counts, edges = np.histogram(values, bins=buckets)
+    return edges.tolist(), counts.tolist()
+
+
+def render_summary(summary):
+    """Same lines as the chart block"""
+    histogram = summary['columns'][COLUMN]['histogram']
+    edges = histogram['edges']
+    x = [f"{low:g}-{high:g}" for low, high in zip(edges[:-1], edges[1:])]
+    return x, histogram['counts']
+
+
+def timed(function, *args, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        df = make_customers(rows)
+        _, legacy_seconds = timed(render_legacy, df)
+        summary, summarize_seconds = timed(summarize, df, FEATURE_NAMES, repeat=1)
+        _, render_seconds = timed(render_summary, summary)
+        results.append({
+            'rows': rows,
+            'legacy': {
+                'render_ms': round(legacy_seconds * 1000, 3),
+                'payload_bytes': output_size_bytes(df)
+            },
+            'summary': {
+                'summarize_seconds': round(summarize_seconds, 3),
+                'render_ms': round(render_seconds * 1000, 3),
+                'payload_bytes': len(json.dumps(summary))
+            }
+        })
+        del df
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
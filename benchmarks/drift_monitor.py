@@ -0,0 +1,77 @@
+"""
+Benchmark of the streaming drift monitor (prediction_service/drift_monitor.py).
+
+Builds the reference profile of a synthetic training set like the registry
+does (mlops_demo/utils/feature_profile.py), then feeds served requests one by
+one through DriftMonitor.observe(), as /predict does, and reports:
+- observe_us: cost per scored row (the overhead added to /predict)
+- drift_ms: cost of a /drift computation over all windows
+- psi / ks: scores on requests drawn like the training data, and on requests
+  where --shift features moved by half a standard deviation
+
+Usage (from the repository root):
+    python -m benchmarks.drift_monitor --rows 1000000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.batch_scoring import make_customers
+from mlops_demo.prediction_service.drift_monitor import DriftMonitor
+from mlops_demo.utils.feature_profile import build_profile
+from mlops_demo.utils.features import FEATURE_NAMES
+
+
+def feed(monitor, records, window_seconds):
+    """Spread the records over the monitor's windows; returns seconds per observe()"""
+    per_window = -(-len(records) // monitor.windows)
+    observe = monitor.observe
+    start = time.perf_counter()
+    for i, record in enumerate(records):
+        observe(record, now=(i // per_window) * window_seconds)
+    return (time.perf_counter() - start) / len(records)
+
+
+def summary(report):
+    scored = {name: f for name, f in report['features'].items() if f['psi'] is not None}
+    return {
+        'rows': report['rows'],
+        'max_psi': report['max_psi'],
+        'max_ks': max(f['ks'] for f in scored.values()),
+        'statuses': {status: sum(f['status'] == status for f in scored.values()) for status in ('ok', 'warning', 'drift')}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='served requests per scenario')
+    parser.add_argument('--train-rows', type=int, default=100_000)
+    parser.add_argument('--windows', type=int, default=12)
+    parser.add_argument('--shift', nargs='*', default=['monthly_charges', 'satisfaction_score'])
+    args = parser.parse_args()
+
+    profile = build_profile(make_customers(args.train_rows, seed=1), FEATURE_NAMES)
+    served = make_customers(args.rows, seed=2)[FEATURE_NAMES]
+    shifted = served.copy()
+    for name in args.shift:
+        shifted[name] += 0.5 * shifted[name].std()
+
+    results = {'rows': args.rows, 'features': len(FEATURE_NAMES), 'windows': args.windows}
+    for name, df in (('stable', served), ('shifted', shifted)):
+        # Plain floats, like the parsed JSON body of a request
+        records = df.astype('float64').to_dict('records')
+        monitor = DriftMonitor(profile, FEATURE_NAMES, window_seconds=60, windows=args.windows)
+        seconds = feed(monitor, records, 60)
+        start = time.perf_counter()
+        report = monitor.drift(now=(args.windows - 1) * 60)
+        drift_ms = (time.perf_counter() - start) * 1000
+        results[name] = {
+            'observe_us': round(seconds * 1e6, 2),
+            'drift_ms': round(drift_ms, 2),
+            **summary(report)
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Measure the compact dtype policy of mlops_demo/utils/features.py.
+
+Generates customers with the make_dataset block (already downcast), rebuilds
+the same frame with the previous float64/int64 dtypes, then runs the
+preprocessing (median fill + StandardScaler) and each model backend on both.
+Reports memory, preprocessing/training/scoring time and the agreement of the
+float32 and float64 predictions.
+
+Usage (from the repository root):
+    python -m benchmarks.dtype_policy --rows 1000000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from benchmarks.pipeline_runner import load_block
+from mlops_demo.utils.features import FEATURE_NAMES, MODEL_DTYPE, TARGET_COLUMN
+from mlops_demo.utils.model_backends import BACKENDS, get_backend
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def preprocess(df, dtype):
+    X = df[FEATURE_NAMES]
+    X = X.fillna(X.median()).astype(dtype)
+    return StandardScaler().fit_transform(X)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--max-train-rows', type=int, default=200_000,
+                        help='cap on the rows used for model training')
+    args = parser.parse_args()
+
+    compact, _ = load_block('data_loaders/make_dataset.py')['load_customer_data'](n_samples=args.rows)
+    wide = compact.astype({
+        column: np.int64 if np.issubdtype(dtype, np.integer) else np.float64
+        for column, dtype in compact.dtypes.items()
+    })
+
+    results = {
+        'rows': args.rows,
+        'frame_bytes': {
+            'float64': int(wide.memory_usage(index=False).sum()),
+            MODEL_DTYPE: int(compact.memory_usage(index=False).sum())
+        }
+    }
+
+    matrices = {}
+    for label, df, dtype in (('float64', wide, np.float64), (MODEL_DTYPE, compact, MODEL_DTYPE)):
+        X, seconds = timed(lambda: preprocess(df, dtype))
+        matrices[label] = X
+        results.setdefault('preprocess_seconds', {})[label] = round(seconds, 3)
+        results.setdefault('feature_matrix_bytes', {})[label] = int(X.nbytes)
+
+    y = compact[TARGET_COLUMN].to_numpy()
+    idx_train, idx_test = train_test_split(
+        np.arange(len(y)), test_size=0.2, random_state=42, stratify=y
+    )
+    idx_train = idx_train[:args.max_train_rows]
+
+    results['backends'] = {}
+    for backend_name in args.backends.split(','):
+        backend = get_backend(backend_name)
+        probabilities = {}
+        entry = {}
+        for label, X in matrices.items():
+            model = backend.build(dict(backend.default_hyperparameters), n_jobs=-1)
+            _, fit_seconds = timed(lambda: model.fit(X[idx_train], y[idx_train]))
+            X_test = X[idx_test]
+            proba, score_seconds = timed(lambda: model.predict_proba(X_test)[:, 1])
+            probabilities[label] = proba
+            entry[label] = {
+                'fit_seconds': round(fit_seconds, 3),
+                'score_rows_per_second': round(len(idx_test) / score_seconds)
+            }
+        reference, compact_proba = probabilities['float64'], probabilities[MODEL_DTYPE]
+        entry['class_agreement'] = float(np.mean((reference > 0.5) == (compact_proba > 0.5)))
+        entry['max_abs_probability_diff'] = float(np.max(np.abs(reference - compact_proba)))
+        results['backends'][backend_name] = entry
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
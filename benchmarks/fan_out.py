@@ -0,0 +1,78 @@
+"""
+Benchmark of the fan-out trigger (mlops_demo/utils/fan_out.py).
+
+Runs --children child runs against LocalTriggerAPI, the in-process stub of the
+trigger API: each child waits --start-latency seconds in 'initial' (scheduler
+pick-up) then works for a random 0.5-3 s. Reports end-to-end latency and the
+delay between a child finishing and fan_out noticing it, for:
+- adaptive: polling from --initial-poll seconds, x1.5 while unchanged, capped at 10 s
+- fixed_5s: a constant 5 s poll interval
+- fixed_60s: trigger_pipeline's default poll_interval=60, estimated (every
+  child is noticed at its first poll, 60 s after its start; measuring it
+  would take minutes)
+
+Usage (from the repository root):
+    python -m benchmarks.fan_out --children 50 --max-concurrency 10
+"""
+import argparse
+import json
+import math
+import random
+import statistics
+import time
+
+from mlops_demo.utils.fan_out import LocalTriggerAPI, fan_out
+
+
+def run_children(durations, args, **poll):
+    def child(variables):
+        time.sleep(durations[variables['partition']])
+        return {'partition': variables['partition'], 'rows': 1000}
+
+    api = LocalTriggerAPI(child, start_latency=args.start_latency)
+    result = fan_out(api, 'child_pipeline', [{'partition': i} for i in range(len(durations))],
+                     max_concurrency=args.max_concurrency, verbose=False, **poll)
+    api.pool.shutdown()
+    lags = sorted(
+        child['seconds'] - (api.runs[child['run_id']]['finished_at'] - api.runs[child['run_id']]['created_at'])
+        for child in result['children'])
+    return {
+        'completed': result['completed'],
+        'seconds': result['seconds'],
+        'detection_lag_ms_p50': round(statistics.median(lags) * 1000, 1),
+        'detection_lag_ms_max': round(lags[-1] * 1000, 1),
+        'status_calls': result['status_calls']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--children', type=int, default=50)
+    parser.add_argument('--max-concurrency', type=int, default=10)
+    parser.add_argument('--start-latency', type=float, default=0.3)
+    parser.add_argument('--initial-poll', type=float, default=0.25)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    durations = [rng.uniform(0.5, 3.0) for _ in range(args.children)]
+    work = [args.start_latency + d for d in durations]
+    results = {
+        'children': args.children,
+        'max_concurrency': args.max_concurrency,
+        'child_seconds_mean': round(statistics.mean(work), 2),
+        # No polling at all: children packed greedily on the concurrency slots
+        'ideal_seconds': round(max(sum(work) / args.max_concurrency, max(work)), 2)
+    }
+    results['adaptive'] = run_children(durations, args, initial_poll=args.initial_poll, max_poll=10.0, backoff=1.5)
+    results['fixed_5s'] = run_children(durations, args, initial_poll=5.0, max_poll=5.0, backoff=1.0)
+    results['fixed_60s'] = {
+        'seconds_estimate': 60 * math.ceil(args.children / args.max_concurrency),
+        'sequential_seconds_estimate': 60 * args.children
+    }
+    results['speedup_vs_fixed_60s'] = round(results['fixed_60s']['seconds_estimate'] / results['adaptive']['seconds'], 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark of the customer feature store (prediction_service/feature_store.py).
+
+Materializes --customers synthetic customers, then reports:
+- write_seconds / disk_bytes: snapshot materialization
+- open_ms / open_rss_delta_bytes: opening the memory-mapped snapshot
+- get_us: single customer lookups (what /predict does), p50/p99/max over
+  random known and unknown ids, next to a pandas .loc lookup on an indexed
+  DataFrame
+- get_many_us_per_row / fill_us_per_row: batch lookups (what batch scoring does)
+- refresh: merged snapshot of --updated customers while a reader thread keeps
+  looking customers up; swap time, lookups served during the swap and errors
+
+Usage (from the repository root):
+    python -m benchmarks.feature_store --customers 10000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.batch_scoring import make_customers
+from mlops_demo.prediction_service.feature_store import FeatureStore, write_snapshot
+from mlops_demo.utils.features import FEATURE_NAMES, ID_COLUMN
+from mlops_demo.utils.profiling import current_rss_bytes
+
+
+def percentiles(samples_ns):
+    samples = np.asarray(samples_ns) / 1000
+    return {
+        'p50': round(float(np.percentile(samples, 50)), 2),
+        'p99': round(float(np.percentile(samples, 99)), 2),
+        'max': round(float(samples.max()), 2)
+    }
+
+
+def time_lookups(lookup, ids):
+    samples = []
+    for customer_id in ids:
+        start = time.perf_counter_ns()
+        lookup(customer_id)
+        samples.append(time.perf_counter_ns() - start)
+    return percentiles(samples)
+
+
+def disk_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, files in os.walk(path) for name in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--customers', type=int, default=10_000_000)
+    parser.add_argument('--lookups', type=int, default=100_000)
+    parser.add_argument('--batch', type=int, default=1000, help='ids per get_many / fill call')
+    parser.add_argument('--updated', type=int, default=100_000, help='customers changed by the refresh')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = make_customers(args.customers)
+    ids = df[ID_COLUMN].to_numpy()
+    # 10% of the lookups ask for customers the store does not know
+    lookup_ids = rng.integers(0, int(args.customers * 1.1), args.lookups).tolist()
+    results = {'customers': args.customers, 'features': len(FEATURE_NAMES)}
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        meta = write_snapshot(root, ids, df[FEATURE_NAMES].to_numpy(), FEATURE_NAMES, merge=False)
+        results['write_seconds'] = round(time.perf_counter() - start, 3)
+        results['disk_bytes'] = disk_bytes(root)
+        results['layout'] = meta['layout']
+
+        rss = current_rss_bytes()
+        start = time.perf_counter()
+        store = FeatureStore(root, check_interval=1.0)
+        store.refresh(force=True)
+        results['open_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        results['open_rss_delta_bytes'] = current_rss_bytes() - rss
+
+        indexed = df.set_index(ID_COLUMN)[FEATURE_NAMES]
+        known = [i for i in lookup_ids[:10_000] if i < args.customers]
+        results['get_us'] = {
+            'feature_store': time_lookups(store.get, lookup_ids),
+            'pandas_loc': time_lookups(lambda i: indexed.loc[i].to_dict(), known)
+        }
+
+        batches = [lookup_ids[i:i + args.batch] for i in range(0, len(lookup_ids), args.batch)]
+        start = time.perf_counter()
+        for batch in batches:
+            store.get_many(batch)
+        results['get_many_us_per_row'] = round((time.perf_counter() - start) / len(lookup_ids) * 1e6, 3)
+        frames = [pd.DataFrame({ID_COLUMN: batch}) for batch in batches]
+        start = time.perf_counter()
+        for frame in frames:
+            store.fill(frame)
+        results['fill_us_per_row'] = round((time.perf_counter() - start) / len(lookup_ids) * 1e6, 3)
+        del df, indexed
+
+        # Refresh under load: a reader keeps serving lookups while the snapshot is swapped
+        updated = rng.choice(args.customers, args.updated, replace=False)
+        new_features = rng.normal(size=(args.updated, len(FEATURE_NAMES))).astype(np.float32)
+        reader = FeatureStore(root, check_interval=0.01)
+        served = {'lookups': 0, 'errors': 0}
+        stop = threading.Event()
+
+        def serve():
+            while not stop.is_set():
+                try:
+                    reader.get(int(updated[served['lookups'] % args.updated]))
+                    served['lookups'] += 1
+                except Exception:
+                    served['errors'] += 1
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        start = time.perf_counter()
+        meta = write_snapshot(root, updated, new_features, FEATURE_NAMES, merge=True)
+        write_seconds = time.perf_counter() - start
+        time.sleep(0.1)
+        stop.set()
+        thread.join()
+        reader.refresh(force=True)
+        value = reader.get(int(updated[0]))
+        results['refresh'] = {
+            'updated_customers': args.updated,
+            'write_seconds': round(write_seconds, 3),
+            'rows': meta['rows'],
+            'lookups_during_refresh': served['lookups'],
+            'errors': served['errors'],
+            'reader_on_new_snapshot': reader.meta['snapshot'] == meta['snapshot'],
+            'updated_value_served': bool(np.allclose(list(value.values()), new_features[0]))
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark the vectorized Imputer against the legacy per-column implementation
+of fill_missing_values_with_median.
+
+Usage (from the repository root):
+    python -m benchmarks.imputation --rows 1000000 --cols 100
+"""
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from mlops_demo.utils.imputation import Imputer
+
+
+def legacy_fill_missing_values_with_median(df):
+    """Original transformers/fill_in_missing_values.py implementation"""
+    for col in df.columns:
+        values = sorted(df[col].dropna().tolist())
+        median_value = values[math.floor(len(values) / 2)]
+        df[[col]] = df[[col]].fillna(median_value)
+    return df
+
+
+def make_frame(rows, cols, missing_rate, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.normal(size=(rows, cols))
+    values[rng.random((rows, cols)) < missing_rate] = np.nan
+    return pd.DataFrame(values, columns=[f'f{i}' for i in range(cols)])
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--cols', type=int, default=100)
+    parser.add_argument('--missing-rate', type=float, default=0.1)
+    parser.add_argument('--chunk-size', type=int, default=100_000)
+    parser.add_argument('--skip-legacy', action='store_true', help='legacy run takes minutes at 1M x 100')
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, args.cols, args.missing_rate)
+    results = {'rows': args.rows, 'cols': args.cols, 'missing_rate': args.missing_rate}
+
+    exact = df.median()
+    for n_jobs in (1, -1):
+        frame = df.copy()
+        imputer = Imputer(strategy='median', n_jobs=n_jobs)
+        _, seconds = timed(lambda: imputer.fit_transform(frame))
+        results[f'vectorized_median_n_jobs_{n_jobs}_s'] = round(seconds, 3)
+        assert not frame.isna().any().any()
+        assert np.allclose(pd.Series(imputer.statistics_), exact)
+
+    for strategy in ('mean', 'mode'):
+        frame = df.copy()
+        _, seconds = timed(lambda: Imputer(strategy=strategy).fit_transform(frame))
+        results[f'vectorized_{strategy}_s'] = round(seconds, 3)
+
+    chunks = [df.iloc[i:i + args.chunk_size].copy() for i in range(0, len(df), args.chunk_size)]
+    imputer = Imputer(strategy='median')
+    _, seconds = timed(lambda: imputer.fit_chunks(chunks))
+    results['chunked_median_fit_s'] = round(seconds, 3)
+    results['chunked_median_max_abs_error'] = float(np.max(np.abs(pd.Series(imputer.statistics_) - exact)))
+
+    if not args.skip_legacy:
+        frame = df.copy()
+        _, seconds = timed(lambda: legacy_fill_missing_values_with_median(frame))
+        results['legacy_median_s'] = round(seconds, 3)
+        results['speedup'] = round(seconds / results['vectorized_median_n_jobs_-1_s'], 1)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
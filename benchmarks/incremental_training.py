@@ -0,0 +1,114 @@
+"""
+Compare incremental warm-start retraining with full retraining over a
+simulated sequence of daily data drops.
+
+Each day a new partition of customers arrives. The full strategy refits a
+RandomForest on the whole history; the incremental strategy appends trees
+fitted on the new partition only (sliding window over partitions), exactly as
+transformers/model_training.py does with training_mode='incremental'.
+
+Usage (from the repository root):
+    python -m benchmarks.incremental_training --days 14 --rows-per-day 20000
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+from mlops_demo.utils.incremental_training import warm_start_update
+
+
+def make_daily_drops(days, rows_per_day, test_rows, drift, seed=42):
+    """Synthetic churn-like data split into daily partitions plus a holdout from the last day"""
+    X, y = make_classification(
+        n_samples=days * rows_per_day + test_rows,
+        n_features=10,
+        n_informative=8,
+        n_redundant=2,
+        n_clusters_per_class=1,
+        random_state=seed
+    )
+    # Slow covariate drift: later days are shifted along the first features
+    day_index = np.minimum(np.arange(len(y)) // rows_per_day, days - 1)
+    X[:, :3] += drift * day_index[:, None]
+    partitions = [
+        (X[d * rows_per_day:(d + 1) * rows_per_day], y[d * rows_per_day:(d + 1) * rows_per_day])
+        for d in range(days)
+    ]
+    return partitions, (X[days * rows_per_day:], y[days * rows_per_day:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--days', type=int, default=14)
+    parser.add_argument('--rows-per-day', type=int, default=20_000)
+    parser.add_argument('--test-rows', type=int, default=20_000)
+    parser.add_argument('--n-estimators', type=int, default=100)
+    parser.add_argument('--max-depth', type=int, default=10)
+    parser.add_argument('--trees-per-partition', type=int, default=25)
+    parser.add_argument('--window-partitions', type=int, default=7)
+    parser.add_argument('--drift', type=float, default=0.02)
+    args = parser.parse_args()
+
+    partitions, (X_test, y_test) = make_daily_drops(
+        args.days, args.rows_per_day, args.test_rows, args.drift
+    )
+
+    # Day 0: both strategies start from the same full model
+    X0, y0 = partitions[0]
+    base = RandomForestClassifier(
+        n_estimators=args.n_estimators, max_depth=args.max_depth, random_state=42, n_jobs=-1
+    ).fit(X0, y0)
+    incremental_model = base
+    tree_partitions = [['day_0', args.n_estimators]]
+
+    history = []
+    for day in range(1, args.days):
+        X_hist = np.concatenate([p[0] for p in partitions[:day + 1]])
+        y_hist = np.concatenate([p[1] for p in partitions[:day + 1]])
+
+        start = time.perf_counter()
+        full_model = RandomForestClassifier(
+            n_estimators=args.n_estimators, max_depth=args.max_depth, random_state=42, n_jobs=-1
+        ).fit(X_hist, y_hist)
+        full_seconds = time.perf_counter() - start
+
+        X_day, y_day = partitions[day]
+        start = time.perf_counter()
+        incremental_model, tree_partitions, _ = warm_start_update(
+            incremental_model, X_day, y_day,
+            partition=f'day_{day}',
+            tree_partitions=tree_partitions,
+            trees_per_partition=args.trees_per_partition,
+            window_partitions=args.window_partitions
+        )
+        incremental_seconds = time.perf_counter() - start
+
+        history.append({
+            'day': day,
+            'history_rows': len(y_hist),
+            'full_seconds': round(full_seconds, 3),
+            'incremental_seconds': round(incremental_seconds, 3),
+            'full_auc': round(roc_auc_score(y_test, full_model.predict_proba(X_test)[:, 1]), 4),
+            'incremental_auc': round(roc_auc_score(y_test, incremental_model.predict_proba(X_test)[:, 1]), 4),
+            'incremental_trees': len(incremental_model.estimators_)
+        })
+        print(json.dumps(history[-1]))
+
+    summary = {
+        'config': vars(args),
+        'total_full_seconds': round(sum(h['full_seconds'] for h in history), 3),
+        'total_incremental_seconds': round(sum(h['incremental_seconds'] for h in history), 3),
+        'final_full_auc': history[-1]['full_auc'] if history else None,
+        'final_incremental_auc': history[-1]['incremental_auc'] if history else None,
+        'days': history
+    }
+    print(json.dumps({k: v for k, v in summary.items() if k != 'days'}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Compare the model backends of transformers/model_training.py.
+
+For each backend and row count, trains on synthetic churn-like data with the
+backend's default hyperparameters and reports training time, pickled model
+size, single-row and batch inference latency and test AUC.
+
+Usage (from the repository root):
+    python -m benchmarks.model_backends --rows 100000,1000000 --backends random_forest,hist_gradient_boosting
+"""
+import argparse
+import io
+import json
+import time
+
+import joblib
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.metrics import roc_auc_score
+
+from mlops_demo.utils.model_backends import BACKENDS, get_backend
+
+
+def make_data(rows, test_rows, seed=42):
+    X, y = make_classification(
+        n_samples=rows + test_rows,
+        n_features=10,
+        n_informative=8,
+        n_redundant=2,
+        n_clusters_per_class=1,
+        flip_y=0.05,
+        random_state=seed
+    )
+    return X[:rows], y[:rows], X[rows:], y[rows:]
+
+
+def single_row_latency(model, X, n_calls):
+    """Median/p99 latency of predict_proba on one row, as the prediction service does"""
+    timings = []
+    for i in range(n_calls):
+        row = X[i % len(X)][None, :]
+        start = time.perf_counter()
+        model.predict_proba(row)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 99) * 1000
+
+
+def benchmark(backend_name, X_train, y_train, X_test, y_test, n_calls):
+    backend = get_backend(backend_name)
+    model = backend.build(dict(backend.default_hyperparameters), n_jobs=-1)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    proba = model.predict_proba(X_test)[:, 1]
+    batch_seconds = time.perf_counter() - start
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    p50_ms, p99_ms = single_row_latency(model, X_test, n_calls)
+
+    return {
+        'backend': backend_name,
+        'model_type': backend.model_type,
+        'rows': len(y_train),
+        'fit_seconds': round(fit_seconds, 3),
+        'model_bytes': buffer.tell(),
+        'batch_rows_per_second': round(len(y_test) / batch_seconds),
+        'single_row_p50_ms': round(p50_ms, 3),
+        'single_row_p99_ms': round(p99_ms, 3),
+        'test_auc': round(roc_auc_score(y_test, proba), 4)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='100000,1000000')
+    parser.add_argument('--backends', default=','.join(BACKENDS))
+    parser.add_argument('--test-rows', type=int, default=50_000)
+    parser.add_argument('--latency-calls', type=int, default=500)
+    args = parser.parse_args()
+
+    results = []
+    for rows in (int(r) for r in args.rows.split(',')):
+        X_train, y_train, X_test, y_test = make_data(rows, args.test_rows)
+        for backend_name in args.backends.split(','):
+            results.append(benchmark(backend_name, X_train, y_train, X_test, y_test, args.latency_calls))
+            print(json.dumps(results[-1]), flush=True)
+
+    print(f"\n{'backend':<24} {'rows':>10} {'fit s':>9} {'model MB':>9} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'batch rows/s':>13} {'AUC':>7}")
+    for r in results:
+        print(f"{r['backend']:<24} {r['rows']:>10} {r['fit_seconds']:>9.2f} "
+              f"{r['model_bytes'] / 2**20:>9.2f} {r['single_row_p50_ms']:>8.2f} "
+              f"{r['single_row_p99_ms']:>8.2f} {r['batch_rows_per_second']:>13} {r['test_auc']:>7.4f}")
+
+
+if __name__ == '__main__':
+    main()
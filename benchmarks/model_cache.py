@@ -0,0 +1,108 @@
+"""
+Benchmark of the shared model cache (mlops_demo/utils/model_cache.py).
+
+Simulates API-triggered runs of the prediction blocks, each in a process
+forked from a long-lived parent like Mage's scheduler, and reports the model
+lookup time per run:
+- per_run_load: the blocks before the cache (latest.json + both pickles)
+- cold: get_model in runs forked from a parent that never warmed the cache
+- warm: runs forked after model_cache.warm()
+- after_promotion: runs forked after another version was promoted and the
+  parent's watcher reloaded it
+
+Usage (from the repository root):
+    python -m benchmarks.model_cache --runs 20
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import joblib
+
+from benchmarks.batch_scoring import make_registry
+from mlops_demo.utils import model_cache
+
+
+def legacy_lookup(registry_path):
+    with open(os.path.join(registry_path, 'latest.json')) as f:
+        latest_info = json.load(f)
+    joblib.load(os.path.join(latest_info['path'], 'model.pkl'))
+    joblib.load(os.path.join(latest_info['path'], 'scaler.pkl'))
+    return latest_info['version']
+
+
+def cached_lookup(registry_path):
+    return model_cache.get_model(registry_path)[0]['version']
+
+
+def _run(lookup, registry_path, queue):
+    start = time.perf_counter()
+    version = lookup(registry_path)
+    queue.put(((time.perf_counter() - start) * 1000, version))
+
+
+def forked_runs(lookup, registry_path, runs):
+    """Model lookup time (ms) of `runs` pipeline runs, each in a forked process"""
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    timings, versions = [], set()
+    for _ in range(runs):
+        process = context.Process(target=_run, args=(lookup, registry_path, queue))
+        process.start()
+        ms, version = queue.get()
+        process.join()
+        timings.append(ms)
+        versions.add(version)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'versions': sorted(versions)
+    }
+
+
+def promote_copy(registry_path, version):
+    """Serve a copy of the current version under another name (latest.json only)"""
+    with open(os.path.join(registry_path, 'latest.json')) as f:
+        current = json.load(f)
+    path = os.path.join(registry_path, version)
+    shutil.copytree(current['path'], path)
+    tmp_path = os.path.join(registry_path, '.latest.json')
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': version, 'path': path}, f)
+    os.replace(tmp_path, os.path.join(registry_path, 'latest.json'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--backend', default='random_forest')
+    parser.add_argument('--train-rows', type=int, default=200_000, help='training rows of the served model (its size)')
+    parser.add_argument('--watch-seconds', type=float, default=0.5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='model_cache_') as root:
+        registry = os.path.join(root, 'registry')
+        make_registry(registry, args.backend, train_rows=args.train_rows)
+        model_bytes = os.path.getsize(os.path.join(registry, 'v_benchmark', 'model.pkl'))
+
+        results = {'backend': args.backend, 'model_bytes': model_bytes, 'runs': args.runs}
+        results['per_run_load'] = forked_runs(legacy_lookup, registry, args.runs)
+        results['cold'] = forked_runs(cached_lookup, registry, args.runs)
+
+        model_cache.warm(registry, watch_seconds=args.watch_seconds)
+        results['warm'] = forked_runs(cached_lookup, registry, args.runs)
+
+        promote_copy(registry, 'v_benchmark_2')
+        time.sleep(args.watch_seconds * 3 + 2)
+        results['after_promotion'] = forked_runs(cached_lookup, registry, args.runs)
+        results['parent_cache'] = model_cache.cache_info()
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Load test of admission control in the prediction service (prediction_service/admission.py).
+
+Measures the service's capacity (sequential /predict requests), then offers
+open-loop load at multiples of it (--load) for --seconds, against a fresh
+service per run:
+- off: ADMISSION_MAX_IN_FLIGHT=0, every request is accepted and queues in
+  the server's threads
+- on: the default controller, requests carry X-Deadline-Ms and
+  X-Request-Start (time spent in the socket backlog counts against the
+  deadline), /health is served on ADMIN_PORT
+A probe polls GET /health during each run. Reports, per load level, admitted
+(200) latency p50/p99, shed requests (429/503) and how fast they were
+answered, client timeouts, /health p99 and the service's /admission counters.
+
+Usage (from the repository root):
+    python -m benchmarks.prediction_admission --load 0.5,1,2,4 --seconds 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.batch_scoring import make_registry
+from benchmarks.pipeline_runner import REPO_ROOT
+from benchmarks.prediction_cold_start import REQUEST, SERVICE_DIR, service_env
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    samples = sorted(samples)
+    return round(samples[min(int(q * len(samples)), len(samples) - 1)], 1)
+
+
+def send(url, headers, timeout, stamp=False):
+    """(status, latency ms); status 0 for a client timeout or connection error"""
+    if stamp:
+        headers = {**headers, 'X-Request-Start': f't={time.time() * 1000:.0f}'}
+    request = urllib.request.Request(
+        f'{url}/predict', data=json.dumps(REQUEST).encode(),
+        headers={'Content-Type': 'application/json', **headers}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, (time.perf_counter() - start) * 1000
+
+
+class Service:
+    """The prediction service in a fresh process, ready once /health answers"""
+
+    def __init__(self, env, port):
+        self.url = f'http://127.0.0.1:{port}'
+        self.admin_url = f"http://127.0.0.1:{env['ADMIN_PORT']}" if env.get('ADMIN_PORT') else self.url
+        self.process = subprocess.Popen(
+            [sys.executable, 'app.py'], cwd=os.path.join(REPO_ROOT, SERVICE_DIR), env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 120
+        while True:
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError('Prediction service did not start')
+            try:
+                urllib.request.urlopen(f'{self.admin_url}/health', timeout=1).read()
+                break
+            except (urllib.error.URLError, OSError):
+                time.sleep(0.05)
+
+    def get(self, path):
+        with urllib.request.urlopen(f'{self.admin_url}{path}', timeout=10) as response:
+            return json.loads(response.read())
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+def measure_capacity(service, requests=100):
+    for _ in range(10):
+        send(service.url, {}, 10)
+    start = time.perf_counter()
+    for _ in range(requests):
+        send(service.url, {}, 10)
+    return requests / (time.perf_counter() - start)
+
+
+def offer_load(service, rate, seconds, headers, timeout, max_clients, stamp):
+    results = []
+    health = []
+    stop = threading.Event()
+
+    def probe():
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                urllib.request.urlopen(f'{service.admin_url}/health', timeout=timeout).read()
+                health.append((time.perf_counter() - start) * 1000)
+            except (urllib.error.URLError, OSError):
+                health.append(timeout * 1000)
+            stop.wait(0.05)
+
+    def one():
+        results.append(send(service.url, headers, timeout, stamp))
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    total = int(rate * seconds)
+    with ThreadPoolExecutor(max_workers=max_clients) as pool:
+        start = time.perf_counter()
+        for i in range(total):
+            # Open loop: requests leave on schedule whatever the responses
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one)
+    stop.set()
+    prober.join()
+
+    admitted = [ms for status, ms in results if status == 200]
+    shed = [ms for status, ms in results if status in (429, 503)]
+    return {
+        'offered_rps': round(rate, 1),
+        'sent': total,
+        'admitted': len(admitted),
+        'shed_429': sum(status == 429 for status, _ in results),
+        'shed_503': sum(status == 503 for status, _ in results),
+        'timeouts': sum(status == 0 for status, _ in results),
+        'errors': sum(status not in (0, 200, 429, 503) for status, _ in results),
+        'admitted_ms': {'p50': percentile(admitted, 0.5), 'p99': percentile(admitted, 0.99)},
+        'shed_ms_p50': percentile(shed, 0.5),
+        'health_ms_p99': percentile(health, 0.99)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--load', default='0.5,1,2,4', help='offered load, as multiples of the measured capacity')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--deadline-ms', type=float, default=500, help='X-Deadline-Ms sent with admission on')
+    parser.add_argument('--timeout', type=float, default=10, help='client timeout (seconds)')
+    parser.add_argument('--max-clients', type=int, default=1000, help='concurrent client connections')
+    parser.add_argument('--backend', default='random_forest')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--admin-port', type=int, default=5002, help='ADMIN_PORT of the service with admission on')
+    args = parser.parse_args()
+    loads = [float(load) for load in args.load.split(',')]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = os.path.join(tmp, 'registry')
+        make_registry(registry, args.backend)
+        env = service_env(tmp, registry, args.port)
+
+        service = Service(env, args.port)
+        capacity = measure_capacity(service)
+        service.stop()
+        results = {'backend': args.backend, 'capacity_rps': round(capacity, 1), 'seconds': args.seconds}
+
+        modes = {
+            'off': ({'ADMISSION_MAX_IN_FLIGHT': '0'}, {}, False),
+            'on': ({'ADMIN_PORT': str(args.admin_port)}, {'X-Deadline-Ms': str(args.deadline_ms)}, True)
+        }
+        for mode, (mode_env, headers, stamp) in modes.items():
+            results[mode] = []
+            for load in loads:
+                service = Service({**env, **mode_env}, args.port)
+                try:
+                    run = offer_load(service, capacity * load, args.seconds, headers, args.timeout, args.max_clients, stamp)
+                    run['load'] = load
+                    if mode == 'on':
+                        stats = service.get('/admission')
+                        run['admission'] = {
+                            key: stats.get(key) for key in ('shed', 'queue_time_ms', 'upstream_time_ms', 'service_time_ms')
+                        }
+                finally:
+                    service.stop()
+                results[mode].append(run)
+                print(f"{mode} x{load}: admitted p99 {run['admitted_ms']['p99']} ms, "
+                      f"shed {run['shed_429'] + run['shed_503']}, timeouts {run['timeouts']}", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
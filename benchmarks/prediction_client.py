@@ -0,0 +1,144 @@
+"""
+Benchmark of the prediction client (mlops_demo/utils/prediction_client.py).
+
+Compares with the predict.py script the online_prediction pipeline used to
+generate (eager pandas/sklearn imports, both pickles reloaded on every call):
+- import time, in a fresh interpreter
+- first call latency (model loading included) and steady-state latency of a
+  single prediction
+- batch_predict over N customers
+Each side runs in its own fresh interpreter against the same registry.
+
+Usage (from the repository root):
+    python -m benchmarks.prediction_client --batch-rows 1000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.batch_scoring import make_customers, make_registry
+from mlops_demo.utils.features import FEATURE_NAMES
+
+# predict.py as generated before the client existed (registry path made configurable)
+LEGACY_PREDICT = '''import joblib
+import json
+import os
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+REGISTRY_PATH = os.environ['BENCH_REGISTRY_PATH']
+
+def predict_churn(input_data):
+    try:
+        latest_path = os.path.join(REGISTRY_PATH, 'latest.json')
+        with open(latest_path, 'r') as f:
+            latest_info = json.load(f)
+        model = joblib.load(os.path.join(latest_info['path'], 'model.pkl'))
+        scaler = joblib.load(os.path.join(latest_info['path'], 'scaler.pkl'))
+        feature_names = %r
+        df = pd.DataFrame([input_data])
+        for feature in feature_names:
+            if feature not in df.columns:
+                df[feature] = 0
+        X_scaled = scaler.transform(df[feature_names])
+        prediction = model.predict(X_scaled)[0]
+        probability = model.predict_proba(X_scaled)[0]
+        return {
+            'input_data': input_data,
+            'prediction': int(prediction),
+            'probability': {'no_churn': float(probability[0]), 'churn': float(probability[1])},
+            'risk_level': 'High' if probability[1] > 0.7 else 'Medium' if probability[1] > 0.3 else 'Low',
+            'model_version': latest_info['version'],
+            'prediction_timestamp': datetime.now().isoformat(),
+            'status': 'success'
+        }
+    except Exception as e:
+        return {'error': str(e), 'status': 'error'}
+
+def batch_predict(data_list):
+    return [predict_churn(customer_data) for customer_data in data_list]
+''' % (FEATURE_NAMES,)
+
+# Runs in a fresh interpreter: import, first call, steady state, batch
+MEASURE = '''
+import json, os, statistics, sys, time
+start = time.perf_counter()
+module = __import__(sys.argv[1], fromlist=['predict_churn'])
+import_ms = (time.perf_counter() - start) * 1000
+with open(sys.argv[2]) as f:
+    customers = json.load(f)
+registry_path = os.environ['BENCH_REGISTRY_PATH']
+kwargs = {} if sys.argv[1] == 'legacy_predict' else {'registry_path': registry_path}
+
+start = time.perf_counter()
+first = module.predict_churn(customers[0], **kwargs)
+first_ms = (time.perf_counter() - start) * 1000
+assert first['status'] == 'success', first
+
+timings = []
+for customer in customers[1:1 + int(sys.argv[3])]:
+    start = time.perf_counter()
+    module.predict_churn(customer, **kwargs)
+    timings.append((time.perf_counter() - start) * 1000)
+
+batch = customers[:int(sys.argv[4])]
+start = time.perf_counter()
+results = module.batch_predict(batch, **kwargs)
+batch_ms = (time.perf_counter() - start) * 1000
+print(json.dumps({
+    'import_ms': round(import_ms, 2),
+    'first_call_ms': round(first_ms, 1),
+    'steady_state_ms': round(statistics.median(timings), 3),
+    'batch_ms': round(batch_ms, 1),
+    'batch_rows_per_second': round(len(batch) / batch_ms * 1000),
+    'churn': [r['probability']['churn'] for r in results[:100]]
+}))
+'''
+
+
+def measure(module, root, env, calls, batch_rows):
+    completed = subprocess.run(
+        [sys.executable, '-c', MEASURE, module, os.path.join(root, 'customers.json'), str(calls), str(batch_rows)],
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', default='random_forest')
+    parser.add_argument('--calls', type=int, default=50, help='single predictions timed after the first one')
+    parser.add_argument('--batch-rows', type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='prediction_client_') as root:
+        registry = os.path.join(root, 'registry')
+        make_registry(registry, args.backend)
+        customers = make_customers(max(args.batch_rows, args.calls + 1), seed=3)[FEATURE_NAMES]
+        with open(os.path.join(root, 'customers.json'), 'w') as f:
+            json.dump(customers.astype('float64').to_dict('records'), f)
+        with open(os.path.join(root, 'legacy_predict.py'), 'w') as f:
+            f.write(LEGACY_PREDICT)
+
+        env = dict(
+            os.environ,
+            BENCH_REGISTRY_PATH=registry,
+            PYTHONPATH=os.pathsep.join([root, os.getcwd(), os.environ.get('PYTHONPATH', '')])
+        )
+        results = {'backend': args.backend, 'batch_rows': args.batch_rows}
+        for name, module in (('generated_predict', 'legacy_predict'),
+                             ('prediction_client', 'mlops_demo.utils.prediction_client')):
+            results[name] = measure(module, root, env, args.calls, args.batch_rows)
+
+        # Same model, same scaling: the two sides must agree
+        legacy, client = results['generated_predict'].pop('churn'), results['prediction_client'].pop('churn')
+        assert max(abs(a - b) for a, b in zip(legacy, client)) < 1e-5
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
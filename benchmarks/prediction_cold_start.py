@@ -0,0 +1,187 @@
+"""
+Cold-start benchmark of the prediction service (prediction_service/app.py).
+
+Starts the service as a fresh process (`python app.py`, like the container's
+CMD) on a synthetic registry and reports, per run:
+- first_prediction_seconds: process start -> first successful POST /predict,
+  polling every --poll-ms
+- first_request_ms / next_request_ms_p50: latency of that first prediction and
+  of the --requests following ones
+- boot: the imports / preload split reported by /health (when the service
+  reports it)
+and once per service the import profile of `import app` (python -X
+importtime): cumulative import time, the heaviest modules app.py imports and
+whether pandas / sklearn are loaded before the first request.
+
+--compare-rev REV runs the same measurements on the service as of REV
+(git archive), e.g. the commit before a cold-start change.
+
+Newer scikit-learn releases import pandas themselves (sklearn.utils.fixes), so
+run the benchmark with an interpreter holding prediction_service/requirements.txt
+to measure what the container pays.
+
+Usage (from the repository root):
+    python -m benchmarks.prediction_cold_start --runs 5 --compare-rev HEAD~1
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.batch_scoring import make_registry
+from benchmarks.pipeline_runner import REPO_ROOT
+
+SERVICE_DIR = os.path.join('mlops_demo', 'prediction_service')
+REQUEST = {'account_age': 12, 'monthly_charges': 70.0, 'total_charges': 840.0, 'support_calls': 2}
+
+
+def service_env(tmp, registry, port):
+    return {
+        **os.environ,
+        'LATEST_INFO_PATH': os.path.join(registry, 'latest.json'),
+        'PREDICTION_HISTORY_PATH': os.path.join(tmp, 'prediction_history'),
+        'FEATURE_STORE_PATH': os.path.join(tmp, 'feature_store'),
+        'PORT': str(port)
+    }
+
+
+def import_profile(service_path, env, top=8):
+    """Cumulative time of `import app` and its heaviest direct imports"""
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app, sys; print(",".join(sorted(sys.modules)))'],
+        cwd=service_path, env=env, capture_output=True, text=True, check=True
+    )
+    modules = set(process.stdout.strip().split(','))
+    # Children are listed before their parent, indented by two more spaces
+    children, app_imports, app_us = [], [], 0
+    for line in process.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((name.strip(), int(cumulative)))
+        elif depth == 0:
+            if name.strip() == 'app':
+                app_imports, app_us = children, int(cumulative)
+            children = []
+    heaviest = sorted(app_imports, key=lambda entry: -entry[1])[:top]
+    return {
+        'import_app_ms': round(app_us / 1000, 1),
+        'heaviest_ms': {name: round(us / 1000, 1) for name, us in heaviest},
+        'pandas_imported': 'pandas' in modules,
+        'sklearn_imported': 'sklearn' in modules
+    }
+
+
+def post(url, payload, timeout=5):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return response.status, json.loads(response.read())
+
+
+def cold_start(service_path, env, port, requests, poll_seconds, timeout):
+    url = f'http://127.0.0.1:{port}'
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, 'app.py'], cwd=service_path, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'Service exited with code {process.returncode} before serving')
+            if time.perf_counter() - start > timeout:
+                raise RuntimeError(f'No successful prediction after {timeout}s')
+            sent = time.perf_counter()
+            try:
+                status, _ = post(f'{url}/predict', REQUEST)
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(poll_seconds)
+                continue
+            if status == 200:
+                break
+        done = time.perf_counter()
+        latencies = []
+        for _ in range(requests):
+            sent_next = time.perf_counter()
+            post(f'{url}/predict', REQUEST)
+            latencies.append((time.perf_counter() - sent_next) * 1000)
+        with urllib.request.urlopen(f'{url}/health', timeout=5) as response:
+            boot = json.loads(response.read()).get('boot')
+        return {
+            'first_prediction_seconds': round(done - start, 3),
+            'first_request_ms': round((done - sent) * 1000, 1),
+            'next_request_ms_p50': round(statistics.median(latencies), 2) if latencies else None,
+            'boot': boot
+        }
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure(service_path, tmp, registry, args):
+    env = service_env(tmp, registry, args.port)
+    runs = [
+        cold_start(service_path, env, args.port, args.requests, args.poll_ms / 1000, args.timeout)
+        for _ in range(args.runs)
+    ]
+    first = [run['first_prediction_seconds'] for run in runs]
+    return {
+        'import_profile': import_profile(service_path, env),
+        'first_prediction_seconds': {
+            'p50': round(statistics.median(first), 3), 'min': min(first), 'max': max(first)
+        },
+        'runs': runs
+    }
+
+
+def checkout_service(rev, root):
+    """The prediction service as of a git revision"""
+    os.makedirs(root)
+    archive = os.path.join(root, 'service.tar')
+    subprocess.run(['git', 'archive', '-o', archive, rev, SERVICE_DIR], cwd=REPO_ROOT, check=True)
+    with tarfile.open(archive) as tar:
+        tar.extractall(root)
+    os.remove(archive)
+    return os.path.join(root, SERVICE_DIR)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='cold starts per service')
+    parser.add_argument('--requests', type=int, default=50, help='predictions timed after the first one')
+    parser.add_argument('--backend', default='random_forest')
+    parser.add_argument('--compare-rev', help='also measure the service as of this git revision')
+    parser.add_argument('--port', type=int, default=5000, help='older services always listen on 5000')
+    parser.add_argument('--poll-ms', type=float, default=10)
+    parser.add_argument('--timeout', type=float, default=120)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = os.path.join(tmp, 'registry')
+        make_registry(registry, args.backend)
+        results = {'backend': args.backend, 'runs': args.runs}
+        if args.compare_rev:
+            baseline_path = checkout_service(args.compare_rev, os.path.join(tmp, 'baseline'))
+            results['baseline'] = {'rev': args.compare_rev, **measure(baseline_path, tmp, registry, args)}
+        results['current'] = measure(os.path.join(REPO_ROOT, SERVICE_DIR), tmp, registry, args)
+        if args.compare_rev:
+            before = results['baseline']['first_prediction_seconds']['p50']
+            after = results['current']['first_prediction_seconds']['p50']
+            results['first_prediction_speedup'] = round(before / after, 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark of the served prediction history (prediction_service/prediction_history.py).
+
+Ingests N synthetic predictions spread over several model versions and days,
+then answers the same aggregate questions three ways:
+- rollups: the /predictions/* queries (SQLite rollups)
+- parquet: scanning the raw Parquet records with pandas
+- json: parsing JSON records, as lineage.json history had to be
+Also reports the per-request cost of record() (the /predict path).
+
+Usage (from the repository root):
+    python -m benchmarks.prediction_history --rows 2000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from mlops_demo.prediction_service.prediction_history import PredictionHistory
+from mlops_demo.utils.features import FEATURE_NAMES
+
+
+def synthetic_predictions(rows, versions, days, users, seed=0):
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    probability = rng.beta(0.6, 0.9, rows).astype('float32')
+    df = pd.DataFrame({
+        'ts': pd.to_datetime(start) + pd.to_timedelta(np.sort(rng.uniform(0, days * 86400, rows)), unit='s'),
+        'model_version': np.array([f'v_2024010{i + 1}_000000' for i in range(versions)])[
+            np.minimum((np.arange(rows) * versions) // rows, versions - 1)],
+        'user_id': np.char.add('user_', rng.integers(0, users, rows).astype(str)),
+        'source': 'predict',
+        'prediction': (probability > 0.5).astype('int8'),
+        'churn_probability': probability,
+        'risk_level': np.where(probability > 0.7, 'High', np.where(probability > 0.3, 'Medium', 'Low')),
+    })
+    for name in FEATURE_NAMES:
+        df[name] = rng.normal(size=rows).astype('float32')
+    return df
+
+
+def timed(function, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--versions', type=int, default=3)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--users', type=int, default=50_000)
+    parser.add_argument('--flush-rows', type=int, default=10_000, help='records per flush during ingestion')
+    args = parser.parse_args()
+
+    df = synthetic_predictions(args.rows, args.versions, args.days, args.users)
+    version = df['model_version'].iloc[-1]
+
+    with tempfile.TemporaryDirectory(prefix='prediction_history_') as root:
+        history = PredictionHistory(os.path.join(root, 'history'), feature_names=FEATURE_NAMES)
+
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.flush_rows):
+            history.record_frame(df.iloc[offset:offset + args.flush_rows])
+        ingest_seconds = time.perf_counter() - start
+
+        single = PredictionHistory(os.path.join(root, 'single'), feature_names=FEATURE_NAMES, flush_rows=1000)
+        sample = df.head(20_000).to_dict('records')
+        start = time.perf_counter()
+        for r in sample:
+            single.record(
+                r['model_version'], r['churn_probability'], r['prediction'], r['risk_level'],
+                features={name: r[name] for name in FEATURE_NAMES}, user_id=r['user_id'], timestamp=r['ts']
+            )
+        single.flush()
+        record_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+        json_path = os.path.join(root, 'history.jsonl')
+        df.assign(ts=df['ts'].astype(str)).to_json(json_path, orient='records', lines=True)
+
+        def parquet_hourly():
+            raw = pd.read_parquet(os.path.join(history.data_path, f'model_version={version}'),
+                                  columns=['ts', 'prediction'])
+            return raw.groupby(raw['ts'].dt.floor('h'))['prediction'].mean()
+
+        def json_hourly():
+            counts = {}
+            with open(json_path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    if record['model_version'] == version:
+                        c = counts.setdefault(record['ts'][:13], [0, 0])
+                        c[0] += 1
+                        c[1] += record['prediction']
+            return {hour: churn / n for hour, (n, churn) in counts.items()}
+
+        questions = {
+            'churn rate per hour (1 version)': (
+                lambda: history.stats(version=version, group_by='hour'), parquet_hourly, json_hourly),
+            'totals per risk level (all)': (lambda: history.stats(), None, None),
+            'churn rate per day (all)': (lambda: history.stats(group_by='day'), None, None),
+            'probability histogram (7 days)': (
+                lambda: history.histogram(since=(datetime(2024, 1, 1) + timedelta(days=args.days - 7)).isoformat()),
+                None, None),
+            'top 20 users (1 version)': (lambda: history.top_users(version, limit=20), None, None),
+            'top 20 users (all versions)': (lambda: history.top_users(limit=20), None, None),
+        }
+
+        data_bytes = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(history.data_path) for f in files)
+        results = {
+            'rows': args.rows,
+            'ingest_rows_per_second': round(args.rows / ingest_seconds),
+            'record_us_per_prediction': round(record_us, 1),
+            'parquet_bytes': data_bytes,
+            'json_bytes': os.path.getsize(json_path),
+            'rollup_bytes': os.path.getsize(history.rollups_path),
+            'queries_ms': {}
+        }
+        for name, (rollup, parquet, as_json) in questions.items():
+            _, seconds = timed(rollup)
+            timings = {'rollups': round(seconds * 1000, 2)}
+            if parquet:
+                timings['parquet'] = round(timed(parquet, repeats=2)[1] * 1000, 1)
+            if as_json:
+                timings['json'] = round(timed(as_json, repeats=1)[1] * 1000, 1)
+            results['queries_ms'][name] = timings
+
+        # Same answer whichever way it is computed
+        rollup_rates = {g['key']: g['churn_rate'] for g in history.stats(version=version, group_by='hour')}
+        scanned = parquet_hourly()
+        assert all(abs(rollup_rates[ts.strftime('%Y-%m-%dT%H')] - rate) < 1e-9 for ts, rate in scanned.items())
+
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark of coalesced prediction runs (mlops_demo/utils/prediction_queue.py).
+
+Queues synthetic prediction requests and drains them through the dispatcher,
+each run being a fresh Python process that scores its batch (the `score`
+command, i.e. a pipeline run without Mage's own scheduling overhead):
+- per_request: one run per request (max_batch_size=1), like triggering
+  asynch_prediction_pipeline for every prediction
+- batched: runs of up to --batch-size requests
+Reports requests per second and end-to-end latency (enqueue -> result).
+
+Usage (from the repository root):
+    python -m benchmarks.prediction_queue --per-request 40 --requests 20000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from benchmarks.batch_scoring import make_customers, make_registry
+from mlops_demo.utils.features import FEATURE_NAMES
+from mlops_demo.utils.prediction_queue import LOCAL_COMMAND, Dispatcher, PredictionQueue, command_launcher
+
+
+def drain(queue_path, inputs, max_batch_size, max_in_flight, max_wait_seconds=0.2):
+    queue = PredictionQueue(queue_path)
+    launch = command_launcher(LOCAL_COMMAND, stdout=subprocess.DEVNULL)
+    dispatcher = Dispatcher(queue, launch, max_batch_size=max_batch_size, max_wait_seconds=max_wait_seconds,
+                            max_in_flight=max_in_flight)
+    start = time.perf_counter()
+    request_ids = queue.enqueue_many(inputs)
+    while True:
+        dispatcher.poll()
+        stats = queue.stats()['requests']
+        if stats.get('done', 0) + stats.get('failed', 0) == len(request_ids):
+            break
+        time.sleep(0.01)
+    seconds = time.perf_counter() - start
+    for _, process in launch.running:
+        process.wait()
+
+    results = queue.results(request_ids)
+    latencies = sorted(entry['latency_ms'] for entry in results.values())
+    return {
+        'requests': len(request_ids),
+        'runs': dispatcher.launched,
+        'failed': sum(entry['status'] == 'failed' for entry in results.values()),
+        'seconds': round(seconds, 2),
+        'requests_per_second': round(len(request_ids) / seconds, 1),
+        'latency_ms_p50': round(statistics.median(latencies), 1),
+        'latency_ms_max': round(latencies[-1], 1)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--per-request', type=int, default=40, help='requests for the one-run-per-request case')
+    parser.add_argument('--requests', type=int, default=20_000, help='requests for the batched case')
+    parser.add_argument('--batch-size', type=int, default=2000)
+    parser.add_argument('--max-in-flight', type=int, default=max(2, os.cpu_count() or 1))
+    parser.add_argument('--backend', default='random_forest')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='prediction_queue_') as root:
+        # Runs are separate processes: point them at this registry and queue
+        os.environ['USER_CODE_PATH'] = root
+        make_registry(os.path.join(root, 'mlops_demo', 'model_registry'), args.backend)
+        customers = make_customers(max(args.requests, args.per_request), seed=4)[FEATURE_NAMES]
+        inputs = customers.astype('float64').to_dict('records')
+
+        results = {'backend': args.backend, 'max_in_flight': args.max_in_flight}
+        for name, count, batch_size in (('per_request', args.per_request, 1),
+                                        ('batched', args.requests, args.batch_size)):
+            queue_path = os.path.join(root, f'{name}.db')
+            os.environ['PREDICTION_QUEUE_PATH'] = queue_path
+            results[name] = drain(queue_path, inputs[:count], batch_size, args.max_in_flight)
+        results['speedup'] = round(
+            results['batched']['requests_per_second'] / results['per_request']['requests_per_second'], 1)
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark of cached source ingestion (mlops_demo/utils/source_cache.py).
+
+Serves a Titanic-shaped CSV from a local HTTP stand-in that honours ETag and
+Last-Modified, then times the load_titanic path per run:
+- legacy: pd.read_csv(url), a full download and parse every run
+- cold: empty cache, download + parse + typed Parquet copy
+- warm: 304 revalidation + Parquet read
+- offline: no request at all, Parquet read
+- changed: the server file changed, download + parse again
+Reports seconds, bytes transferred and the status of each run.
+
+Usage (from the repository root):
+    python -m benchmarks.source_cache --rows 1000000
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from mlops_demo.utils.source_cache import SourceCache
+
+
+def make_titanic(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    age = rng.normal(30, 14, rows).clip(0.4, 80).round(1)
+    age[rng.random(rows) < 0.2] = np.nan
+    return pd.DataFrame({
+        'PassengerId': np.arange(1, rows + 1),
+        'Survived': rng.integers(0, 2, rows),
+        'Pclass': rng.integers(1, 4, rows),
+        'Name': [f'Passenger, Mr. {i}' for i in range(rows)],
+        'Sex': rng.choice(['male', 'female'], rows),
+        'Age': age,
+        'SibSp': rng.integers(0, 5, rows),
+        'Parch': rng.integers(0, 4, rows),
+        'Ticket': rng.integers(100000, 999999, rows).astype(str),
+        'Fare': rng.exponential(30, rows).round(4),
+        'Cabin': np.where(rng.random(rows) < 0.77, None, 'C85'),
+        'Embarked': rng.choice(['S', 'C', 'Q'], rows)
+    })
+
+
+class SourceServer:
+    """Single-file HTTP server with ETag / Last-Modified revalidation"""
+
+    def __init__(self, path):
+        self.path = path
+        self.requests = 0
+        self.bytes_sent = 0
+        self.refresh()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                etag = self.headers.get('If-None-Match')
+                since = self.headers.get('If-Modified-Since')
+                not_modified = etag == server.etag if etag else (
+                    since is not None and parsedate_to_datetime(since).timestamp() >= int(server.mtime)
+                )
+                if not_modified:
+                    self.send_response(304)
+                    self.send_header('ETag', server.etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv')
+                self.send_header('Content-Length', str(server.size))
+                self.send_header('ETag', server.etag)
+                self.send_header('Last-Modified', formatdate(server.mtime, usegmt=True))
+                self.end_headers()
+                with open(server.path, 'rb') as f:
+                    while chunk := f.read(1024 * 1024):
+                        self.wfile.write(chunk)
+                server.bytes_sent += server.size
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_port}/titanic.csv'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def refresh(self):
+        with open(self.path, 'rb') as f:
+            self.etag = '"' + hashlib.sha256(f.read()).hexdigest()[:16] + '"'
+        self.mtime = os.path.getmtime(self.path)
+        self.size = os.path.getsize(self.path)
+
+
+def run(server, load):
+    requests, sent = server.requests, server.bytes_sent
+    start = time.perf_counter()
+    df, record = load()
+    return {
+        'seconds': round(time.perf_counter() - start, 4),
+        'requests': server.requests - requests,
+        'bytes_transferred': server.bytes_sent - sent,
+        'rows': len(df),
+        **({'status': record['status'], 'parsed': record['parsed']} if record else {})
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000, help='passengers in the served CSV (the real file has 891)')
+    parser.add_argument('--format', default='parquet', choices=['parquet', 'feather'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'titanic.csv')
+        make_titanic(args.rows).to_csv(csv_path, index=False)
+        server = SourceServer(csv_path)
+
+        def cached(offline=False):
+            cache = SourceCache(root=os.path.join(tmp, 'cache'), offline=offline)
+            return lambda: cache.read_csv(server.url, format=args.format)
+
+        results = {'rows': args.rows, 'csv_bytes': server.size, 'format': args.format}
+        results['legacy'] = run(server, lambda: (pd.read_csv(server.url), None))
+        results['cold'] = run(server, cached())
+        results['warm'] = run(server, cached())
+        results['offline'] = run(server, cached(offline=True))
+
+        make_titanic(args.rows, seed=1).to_csv(csv_path, index=False)
+        server.refresh()
+        results['changed'] = run(server, cached())
+        results['warm_speedup'] = round(results['legacy']['seconds'] / results['warm']['seconds'], 1)
+        server.httpd.shutdown()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
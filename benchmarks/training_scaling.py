@@ -0,0 +1,214 @@
+"""
+Scaling benchmark for the demo_mlops training pipeline.
+
+Runs make_dataset -> data_preproecessing -> model_training -> model_registry
+outside the Mage UI for a ladder of row counts and core counts. Each
+configuration runs in a fresh subprocess (pinned to N cores, writing to a
+scratch USER_CODE_PATH) and records per-block wall/CPU time, peak RSS and
+artifact sizes. Runs are appended to a JSON history and compared with the
+previous run to flag regressions.
+
+Usage (from the repository root):
+    python -m benchmarks.training_scaling --rows 10000,100000,1000000,10000000 --cores 1,4
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from benchmarks.pipeline_runner import REPO_ROOT
+
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, 'benchmarks', 'results', 'training_scaling.json')
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total
+
+
+def run_child(rows, cores, streaming, result_file):
+    """Executed inside the per-configuration subprocess"""
+    cpus = sorted(os.sched_getaffinity(0))[:cores] if hasattr(os, 'sched_getaffinity') else None
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+    # Imports happen after pinning so thread pools size themselves to the budget
+    from benchmarks.pipeline_runner import run_training_pipeline
+    from mlops_demo.utils import paths
+
+    artifacts = {}
+
+    def on_block(block_uuid, output):
+        if block_uuid == 'data_preproecessing' and isinstance(output, dict) and output.get('array_paths'):
+            artifacts['preprocessed_arrays_bytes'] = sum(
+                os.path.getsize(p) for p in output['array_paths'].values()
+            )
+
+    variables = {'n_samples': rows, 'use_cache': False}
+    if streaming:
+        variables['streaming'] = True
+    blocks = run_training_pipeline(variables, on_block=on_block)
+
+    for name, path in (('model_bytes', paths.MODEL_PATH), ('scaler_bytes', paths.SCALER_PATH)):
+        if os.path.exists(path):
+            artifacts[name] = os.path.getsize(path)
+    with open(os.path.join(paths.REGISTRY_PATH, 'latest.json')) as f:
+        artifacts['registry_version_bytes'] = _dir_size(json.load(f)['path'])
+
+    with open(result_file, 'w') as f:
+        json.dump({
+            'rows': rows,
+            'cores': cores,
+            'streaming': streaming,
+            'status': 'ok',
+            'total_wall_seconds': round(sum(b['wall_seconds'] for b in blocks), 4),
+            'peak_rss_bytes': max(b['peak_rss_bytes'] for b in blocks),
+            'blocks': blocks,
+            'artifacts': artifacts
+        }, f)
+
+
+def run_configuration(rows, cores, streaming, timeout):
+    with tempfile.TemporaryDirectory(prefix='training_scaling_') as workdir:
+        result_file = os.path.join(workdir, 'result.json')
+        env = {**os.environ, 'USER_CODE_PATH': workdir, 'PYTHONPATH': REPO_ROOT}
+        env.update({name: str(cores) for name in THREAD_ENV_VARS})
+        command = [
+            sys.executable, '-m', 'benchmarks.training_scaling', '--child',
+            '--rows', str(rows), '--cores', str(cores), '--result-file', result_file
+        ]
+        if streaming:
+            command.append('--streaming')
+        try:
+            process = subprocess.run(
+                command, cwd=REPO_ROOT, env=env, timeout=timeout,
+                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+            )
+        except subprocess.TimeoutExpired:
+            return {'rows': rows, 'cores': cores, 'streaming': streaming, 'status': 'timeout'}
+        if process.returncode != 0 or not os.path.exists(result_file):
+            return {
+                'rows': rows, 'cores': cores, 'streaming': streaming, 'status': 'failed',
+                'returncode': process.returncode, 'stderr_tail': process.stderr[-2000:]
+            }
+        with open(result_file) as f:
+            return json.load(f)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def find_regressions(previous, current, threshold):
+    """Compare matching (rows, cores, streaming, block) entries with the previous run"""
+    def index(run):
+        entries = {}
+        for result in run.get('results', []):
+            if result.get('status') != 'ok':
+                continue
+            key = (result['rows'], result['cores'], result.get('streaming', False))
+            for block in result['blocks']:
+                entries[key + (block['block'],)] = block
+        return entries
+
+    before, after = index(previous), index(current)
+    regressions = []
+    for key, block in after.items():
+        if key not in before:
+            continue
+        for metric in ('wall_seconds', 'peak_rss_bytes'):
+            old, new = before[key][metric], block[metric]
+            # Ignore sub-100ms timings, they are dominated by noise
+            if metric == 'wall_seconds' and max(old, new) < 0.1:
+                continue
+            if old > 0 and new / old > threshold:
+                regressions.append({
+                    'rows': key[0], 'cores': key[1], 'streaming': key[2], 'block': key[3],
+                    'metric': metric, 'previous': old, 'current': new, 'ratio': round(new / old, 2)
+                })
+    return regressions
+
+
+def print_table(results):
+    print(f"{'rows':>10} {'cores':>5} {'block':<20} {'wall s':>9} {'cpu s':>9} {'peak RSS MB':>12}")
+    for result in results:
+        if result.get('status') != 'ok':
+            print(f"{result['rows']:>10} {result['cores']:>5} {result['status']}")
+            continue
+        for block in result['blocks']:
+            print(f"{result['rows']:>10} {result['cores']:>5} {block['block']:<20} "
+                  f"{block['wall_seconds']:>9.3f} {block['cpu_seconds']:>9.3f} "
+                  f"{block['peak_rss_bytes'] / 2**20:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='10000,100000,1000000,10000000')
+    parser.add_argument('--cores', default='1,' + str(os.cpu_count() or 1))
+    parser.add_argument('--streaming', action='store_true', help='use the out-of-core preprocessing path')
+    parser.add_argument('--timeout', type=int, default=3600, help='seconds per configuration')
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--label', default=None, help='free-form label stored with the run')
+    parser.add_argument('--threshold', type=float, default=1.2, help='regression ratio vs previous run')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(int(args.rows), int(args.cores), args.streaming, args.result_file)
+        return
+
+    rows_ladder = [int(r) for r in args.rows.split(',')]
+    core_ladder = sorted({min(int(c), os.cpu_count() or 1) for c in args.cores.split(',')})
+
+    results = []
+    for rows in rows_ladder:
+        for cores in core_ladder:
+            print(f"▶ rows={rows} cores={cores}", flush=True)
+            results.append(run_configuration(rows, cores, args.streaming, args.timeout))
+
+    run = {
+        'timestamp': datetime.now().isoformat(),
+        'git_commit': git_commit(),
+        'label': args.label,
+        'results': results
+    }
+
+    history = []
+    if os.path.exists(args.history):
+        with open(args.history) as f:
+            history = json.load(f)
+    previous = history[-1] if history else {}
+    run['regressions'] = find_regressions(previous, run, args.threshold)
+    history.append(run)
+    os.makedirs(os.path.dirname(args.history), exist_ok=True)
+    with open(args.history, 'w') as f:
+        json.dump(history, f, indent=2)
+
+    print_table(results)
+    print(f"\nHistory: {args.history} ({len(history)} runs)")
+    if run['regressions']:
+        print(f"⚠️  {len(run['regressions'])} regression(s) vs {previous.get('git_commit', 'previous run')}:")
+        for r in run['regressions']:
+            print(f"   rows={r['rows']} cores={r['cores']} {r['block']} {r['metric']}: "
+                  f"{r['previous']} -> {r['current']} (x{r['ratio']})")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("✅ No regressions vs previous run")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,29 @@
 import pandas as pd
 
 from mage_ai.shared.parsers import convert_matrix_to_dataframe
+from mlops_demo.utils.column_summary import summarize
 
-
+# make_dataset emits (DataFrame, column summary): render from the summary, whose
+# size does not depend on the row count. Other upstreams get summarized here.
+summary = None
 if isinstance(df_1, list) and len(df_1) >= 1:
-    item = df_1[0]
-    if isinstance(item, pd.Series):
-        item = item.to_frame()
-    elif not isinstance(item, pd.DataFrame):
-        item = convert_matrix_to_dataframe(item)
-    df_1 = item
+    if len(df_1) >= 2 and isinstance(df_1[1], dict) and 'columns' in df_1[1]:
+        summary = df_1[1]
+    else:
+        item = df_1[0]
+        if isinstance(item, pd.Series):
+            item = item.to_frame()
+        elif not isinstance(item, pd.DataFrame):
+            item = convert_matrix_to_dataframe(item)
+        df_1 = item
+if summary is None:
+    summary = summarize(df_1)
+
+col = 'account_age' if 'account_age' in summary['columns'] else next(iter(summary['columns']))
+histogram = summary['columns'][col]['histogram']
+edges = histogram['edges']
+x = [f"{low:g}-{high:g}" for low, high in zip(edges[:-1], edges[1:])]
+y = histogram['counts']
 
-columns = df_1.columns
-col = list(filter(lambda x: df_1[x].dtype == float or df_1[x].dtype == int, columns))[0]
-x = df_1[col]
+# Uniform row sample (at most a few hundred rows) for scatter-style charts
+sample = pd.DataFrame(summary['sample']['rows'], columns=summary['sample']['columns'])
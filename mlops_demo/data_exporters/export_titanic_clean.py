@@ -4,13 +4,35 @@ from pandas import DataFrame
 if 'data_exporter' not in globals():
     from mage_ai.data_preparation.decorators import data_exporter
 
+EXPORT_FORMATS = ('csv', 'parquet', 'feather')
+
 
 @data_exporter
 def export_data_to_file(df: DataFrame, **kwargs) -> None:
     """
     Template for exporting data to filesystem.
 
+    Variables:
+    - export_format: csv (default), parquet or feather (typed, columnar)
+    - export_columns: list or comma-separated names, only these are written
+
     Docs: https://docs.mage.ai/design/data-loading#example-loading-data-from-a-file
     """
-    filepath = 'titanic_clean.csv'
-    FileIO().export(df, filepath)
+    export_format = kwargs.get('export_format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{export_format}', expected one of {EXPORT_FORMATS}")
+    columns = kwargs.get('export_columns')
+    if isinstance(columns, str):
+        columns = [column.strip() for column in columns.split(',') if column.strip()]
+    if columns:
+        missing = [column for column in columns if column not in df.columns]
+        if missing:
+            raise ValueError(f"Cannot export unknown columns {missing}")
+        df = df[columns]
+
+    filepath = kwargs.get('export_path', f'titanic_clean.{export_format}')
+    if export_format == 'feather':
+        # Not a FileIO format; Feather needs a default index
+        df.reset_index(drop=True).to_feather(filepath)
+    else:
+        FileIO().export(df, filepath)
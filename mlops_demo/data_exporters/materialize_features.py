@@ -0,0 +1,41 @@
+if 'data_exporter' not in globals():
+    from mage_ai.data_preparation.decorators import data_exporter
+if 'test' not in globals():
+    from mage_ai.data_preparation.decorators import test
+
+from mlops_demo.prediction_service.feature_store import FeatureStore, write_snapshot
+from mlops_demo.utils.features import FEATURE_NAMES, ID_COLUMN
+from mlops_demo.utils.paths import FEATURE_STORE_PATH
+from mlops_demo.utils.variables import as_bool
+
+
+@data_exporter
+def materialize_features(df, *args, **kwargs) -> dict:
+    """
+    Materialize the latest feature vector of every customer into the feature
+    store (mlops_demo/prediction_service/feature_store.py), so /predict and
+    batch scoring can score a bare customer_id.
+
+    Variables: feature_store_merge (default True: customers absent from this
+    run keep their previous vector), feature_store_keep (snapshots kept, 3).
+    """
+    meta = write_snapshot(
+        FEATURE_STORE_PATH,
+        df[ID_COLUMN].to_numpy(),
+        df[FEATURE_NAMES].to_numpy(),
+        FEATURE_NAMES,
+        merge=as_bool(kwargs.get('feature_store_merge'), default=True),
+        keep=int(kwargs.get('feature_store_keep', 3)),
+        meta={'data_version': (df.attrs.get('data_metadata') or {}).get('version')}
+    )
+
+    print(f"✅ Feature store snapshot {meta['snapshot']}: {meta['rows']:,} customers ({meta['layout']} layout)")
+    return meta
+
+
+@test
+def test_output(output, *args) -> None:
+    store = FeatureStore(FEATURE_STORE_PATH)
+    store.refresh(force=True)
+    assert store.meta['snapshot'] == output['snapshot'], 'Snapshot is not the current one'
+    print("✅ Feature store validation passed")
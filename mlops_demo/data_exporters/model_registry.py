@@ -4,60 +4,116 @@ if 'data_exporter' not in globals():
 import json
 import os
 from datetime import datetime
-import joblib
 import subprocess
 
+from mlops_demo.utils.artifact_store import ArtifactStore
+from mlops_demo.utils.block_cache import BlockCache, cache_status, make_cache_key, source_fingerprint
+from mlops_demo.utils.paths import FEATURE_PROFILE_PATH, IMPUTATION_PATH, REGISTRY_PATH, SCALER_PATH, USER_CODE_PATH
+from mlops_demo.utils.profiling import profiled, running_record, summarize_performance
+from mlops_demo.utils.registry_catalog import RegistryCatalog
+from mlops_demo.utils.registry_retention import RetentionPolicy, apply as apply_retention
+from mlops_demo.utils.variables import as_bool
+
 @data_exporter
+@profiled('model_registry')
 def register_model(metrics: dict, *args, **kwargs) -> None:
     """
     Register model in a versioned model registry with full lineage tracking
     """
     # Create model registry directory
-    registry_path = '/home/src/mlops_demo/model_registry'
+    registry_path = REGISTRY_PATH
     os.makedirs(registry_path, exist_ok=True)
     
+    # Index versions registered before the catalog existed
+    catalog = RegistryCatalog()
+    catalog.ensure_indexed()
+    
+    # An unchanged training output has already been registered: promote
+    # that version again instead of creating a duplicate
+    cache = BlockCache()
+    cache_key = make_cache_key(
+        'model_registry',
+        metrics.get('fingerprint'),
+        source_fingerprint('data_exporters/model_registry.py')
+    )
+    entry = cache.get(cache_key) if as_bool(kwargs.get('use_cache'), default=True) and metrics.get('fingerprint') else None
+    if entry:
+        registered = cache.load(entry, 'registration')
+        if os.path.exists(os.path.join(registered['path'], 'lineage.json')):
+            reuse_registered_version(
+                catalog,
+                registered,
+                {**metrics.get('cache', {}), **cache_status('model_registry', cache_key, hit=True)}
+            )
+            return
+    
     # Create model version
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     version = f"v_{timestamp}"
-    
-    # Load the trained model
-    model = joblib.load(metrics['model_path'])
-    scaler = joblib.load('/home/src/mlops_demo/models/scaler.pkl')
+    # Incremental retrains can register several versions within one second
+    suffix = 1
+    while os.path.exists(os.path.join(registry_path, version)):
+        version = f"v_{timestamp}_{suffix}"
+        suffix += 1
     
     # Create version directory
     version_path = os.path.join(registry_path, version)
     os.makedirs(version_path, exist_ok=True)
     
-    # Save model artifacts
-    joblib.dump(model, os.path.join(version_path, 'model.pkl'))
-    joblib.dump(scaler, os.path.join(version_path, 'scaler.pkl'))
+    # Store artifacts by content hash and hardlink them into the version:
+    # bytes are copied (compressed per artifact type), never unpickled, and an
+    # unchanged scaler is stored only once. Imputation values fitted at
+    # preprocessing time are used by serving for missing features, the
+    # feature profile as the reference of its drift monitor.
+    store = ArtifactStore(compression=kwargs.get('artifact_compression'))
+    manifest = store.add_version_artifacts(version_path, {
+        'model.pkl': (metrics['model_path'], 'model'),
+        'scaler.pkl': (SCALER_PATH, 'scaler'),
+        'imputation.json': (IMPUTATION_PATH, 'imputation'),
+        'feature_profile.json': (FEATURE_PROFILE_PATH, 'profile')
+    })
+    imputation_path = os.path.join(version_path, 'imputation.json') if 'imputation.json' in manifest else None
+    profile_path = os.path.join(version_path, 'feature_profile.json') if 'feature_profile.json' in manifest else None
     
     # Get git information for code lineage
     git_info = get_git_info()
     
     # Get data metadata from pipeline context if available
-    data_metadata = None
+    data_metadata = metrics.get('data_metadata')
     if 'data_metadata' in kwargs:
         data_metadata = kwargs.get('data_metadata')
     
+    # Cost of each block of this run; the registry's own record stops here
+    performance = dict(metrics.get('performance', {}))
+    if running_record():
+        performance['model_registry'] = running_record()
+    
     # Create comprehensive lineage information
     lineage = {
         "version": version,
         "timestamp": datetime.now().isoformat(),
-        "model_type": "RandomForestClassifier",
+        "model_type": metrics.get('model_type', 'RandomForestClassifier'),
+        "model_backend": metrics.get('model_backend', 'random_forest'),
+        "model_params": metrics.get('model_params'),
         "status": "registered",
+        "training_mode": metrics.get('training_mode', 'full'),
+        "parent_version": (metrics.get('incremental') or {}).get('parent_version'),
+        "incremental": metrics.get('incremental'),
         "metrics": {
             "accuracy": metrics['accuracy'],
             "auc_score": metrics['auc_score'],
             "training_samples": metrics.get('training_samples', 'unknown'),
-            "test_samples": metrics.get('test_samples', 'unknown')
+            "test_samples": metrics.get('test_samples', 'unknown'),
+            "training_seconds": metrics.get('training_seconds')
         },
         "feature_importance": metrics['feature_importance'],
-        "hyperparameters": {
+        "hyperparameters": metrics.get('hyperparameters', {
             "n_estimators": 100,
             "max_depth": 10,
             "random_state": 42
-        },
+        }),
+        "hyperparameter_search": metrics.get('hyperparameter_search'),
+        "dtype_policy": metrics.get('dtype_policy'),
         "code_lineage": {
             "git_commit": git_info.get('commit'),
             "git_branch": git_info.get('branch'),
@@ -75,13 +131,24 @@ def register_model(metrics: dict, *args, **kwargs) -> None:
         ],
         "artifacts": {
             "model_path": os.path.join(version_path, 'model.pkl'),
-            "scaler_path": os.path.join(version_path, 'scaler.pkl')
+            "scaler_path": os.path.join(version_path, 'scaler.pkl'),
+            "imputation_path": imputation_path,
+            "feature_profile_path": profile_path,
+            "store": {
+                name: {k: entry[k] for k in ('sha256', 'object', 'compression', 'bytes', 'stored_bytes', 'deduplicated')}
+                for name, entry in manifest.items()
+            }
         },
         "predictions": {
             "count": 0,
             "last_prediction_time": None,
             "history": []
-        }
+        },
+        "cache": {
+            **metrics.get('cache', {}),
+            **cache_status('model_registry', cache_key, hit=False)
+        },
+        "performance": summarize_performance(performance)
     }
     
     # Save lineage information
@@ -93,8 +160,10 @@ def register_model(metrics: dict, *args, **kwargs) -> None:
     registry_entry = {
         'version': version,
         'timestamp': timestamp,
-        'model_type': 'RandomForestClassifier',
+        'model_type': metrics.get('model_type', 'RandomForestClassifier'),
+        'model_backend': metrics.get('model_backend', 'random_forest'),
         'status': 'registered',
+        'parent_version': (metrics.get('incremental') or {}).get('parent_version'),
         'metrics': {
             'accuracy': metrics['accuracy'],
             'auc_score': metrics['auc_score']
@@ -110,22 +179,48 @@ def register_model(metrics: dict, *args, **kwargs) -> None:
     with open(os.path.join(version_path, 'metadata.json'), 'w') as f:
         json.dump(registry_entry, f, indent=2)
     
-    # Update latest model pointer
-    latest_path = os.path.join(registry_path, 'latest.json')
-    with open(latest_path, 'w') as f:
-        json.dump({
-            'version': version,
-            'path': version_path,
-            'updated_at': timestamp
-        }, f, indent=2)
+    # Index the version and serve it (also rewrites latest.json atomically)
+    catalog.register(lineage, version_path)
+    catalog.promote(version)
+    
+    cache.put(cache_key, objects={'registration': {'version': version, 'path': version_path}},
+              meta={'block': 'model_registry'})
     
     print(f"✅ Model registered successfully!")
     print(f"   Version: {version}")
     print(f"   Registry path: {version_path}")
     print(f"   Accuracy: {metrics['accuracy']:.4f}")
     print(f"   AUC Score: {metrics['auc_score']:.4f}")
-    print(f"   Git Commit: {git_info.get('commit', 'unknown')[:8]}")
+    print(f"   Git Commit: {(git_info.get('commit') or 'unknown')[:8]}")
     print(f"   Lineage: {lineage_path}")
+    
+    # Optional retention policy, e.g. retention='keep_last=20,max_size=2GB'
+    policy = RetentionPolicy.parse(kwargs.get('retention') or os.environ.get('REGISTRY_RETENTION'))
+    if policy and policy.active:
+        report = apply_retention(policy, catalog)
+        print(f"🧹 Retention: {len(report['deleted'])} old versions removed, "
+              f"{report['reclaimed_bytes'] / 1024 / 1024:.1f}MB reclaimed")
+
+def reuse_registered_version(catalog, registered, cache_info):
+    """Serve an already registered version again and record the cache hit"""
+    version = registered['version']
+    version_path = registered['path']
+    
+    lineage_path = os.path.join(version_path, 'lineage.json')
+    with open(lineage_path, 'r') as f:
+        lineage = json.load(f)
+    lineage['cache'] = cache_info
+    lineage['last_cache_hit'] = datetime.now().isoformat()
+    with open(lineage_path, 'w') as f:
+        json.dump(lineage, f, indent=2)
+    
+    catalog.register(lineage, version_path)
+    catalog.promote(version)
+    
+    print(f"♻️  Registry cache hit: model unchanged, reusing {version}")
+    print(f"   Registry path: {version_path}")
+    statuses = ', '.join(f"{block}={info['status']}" for block, info in cache_info.items())
+    print(f"   Cache: {statuses}")
 
 def get_git_info():
     """Extract git information for code lineage tracking"""
@@ -139,7 +234,7 @@ def get_git_info():
         # Get current commit hash
         commit = subprocess.check_output(
             ['git', 'rev-parse', 'HEAD'],
-            cwd='/home/src',
+            cwd=USER_CODE_PATH,
             stderr=subprocess.DEVNULL
         ).decode().strip()
         git_info['commit'] = commit
@@ -147,7 +242,7 @@ def get_git_info():
         # Get current branch
         branch = subprocess.check_output(
             ['git', 'rev-parse', '--abbrev-ref', 'HEAD'],
-            cwd='/home/src',
+            cwd=USER_CODE_PATH,
             stderr=subprocess.DEVNULL
         ).decode().strip()
         git_info['branch'] = branch
@@ -155,7 +250,7 @@ def get_git_info():
         # Check if there are uncommitted changes
         status = subprocess.check_output(
             ['git', 'status', '--porcelain'],
-            cwd='/home/src',
+            cwd=USER_CODE_PATH,
             stderr=subprocess.DEVNULL
         ).decode().strip()
         git_info['status'] = 'clean' if not status else 'dirty'
@@ -167,7 +262,7 @@ def get_git_info():
 
 @test
 def test_output(*args) -> None:
-    registry_path = '/home/src/mlops_demo/model_registry'
+    registry_path = REGISTRY_PATH
     latest_path = os.path.join(registry_path, 'latest.json')
     assert os.path.exists(latest_path), 'Model registration failed'
     
@@ -184,5 +279,8 @@ def test_output(*args) -> None:
     assert 'code_lineage' in lineage, 'Code lineage missing'
     assert 'data_lineage' in lineage, 'Data lineage missing'
     
+    served = RegistryCatalog().current()
+    assert served and served['version'] == latest['version'], 'Catalog and latest.json disagree'
+    
     print("✅ Model registry validation passed")
     print(f"✅ Lineage tracking validation passed")
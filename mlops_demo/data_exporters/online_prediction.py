@@ -1,112 +1,35 @@
 if 'data_exporter' not in globals():
     from mage_ai.data_preparation.decorators import data_exporter
+if 'test' not in globals():
+    from mage_ai.data_preparation.decorators import test
 
-
-import joblib
-import json
 import os
-from datetime import datetime
+
+from mlops_demo.utils.prediction_client import predict_churn
 
 @data_exporter
 def create_prediction_utility(metrics: dict, *args, **kwargs) -> None:
     """
     Create a simple prediction utility function
     """
-    # Create prediction utility code
-    prediction_code = f'''import joblib
+    # predict.py is a thin entry point: the prediction code lives in
+    # mlops_demo/utils/prediction_client.py (lazy imports, cached model)
+    prediction_code = '''"""
+Churn prediction helpers, generated by the online_prediction pipeline.
+See mlops_demo/utils/prediction_client.py.
+"""
 import json
 import os
-import numpy as np
-import pandas as pd
-from datetime import datetime
+import sys
 
-def predict_churn(input_data):
-    """
-    Simple prediction function for churn prediction
-    """
-    try:
-        # Load latest model from registry
-        registry_path = '/home/src/mlops_demo/model_registry'
-        latest_path = os.path.join(registry_path, 'latest.json')
-        
-        if not os.path.exists(latest_path):
-            return {{
-                'error': 'No trained model found. Please run the training pipeline first.',
-                'status': 'error'
-            }}
-        
-        with open(latest_path, 'r') as f:
-            latest_info = json.load(f)
-        
-        # Load model and scaler
-        model_path = os.path.join(latest_info['path'], 'model.pkl')
-        scaler_path = os.path.join(latest_info['path'], 'scaler.pkl')
-        
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-        
-        # Feature names
-        feature_names = [
-            'account_age', 'monthly_charges', 'total_charges', 'num_services',
-            'customer_service_calls', 'contract_length', 'payment_method_score',
-            'usage_frequency', 'support_tickets', 'satisfaction_score'
-        ]
-        
-        # Prepare input data
-        df = pd.DataFrame([input_data])
-        
-        # Ensure all features are present
-        for feature in feature_names:
-            if feature not in df.columns:
-                df[feature] = 0
-        
-        # Select and order features
-        X = df[feature_names].values
-        
-        # Scale features
-        X_scaled = scaler.transform(X)
-        
-        # Make prediction
-        prediction = model.predict(X_scaled)[0]
-        probability = model.predict_proba(X_scaled)[0]
-        
-        result = {{
-            'input_data': input_data,
-            'prediction': int(prediction),
-            'prediction_label': 'Will Churn' if prediction == 1 else 'Will Not Churn',
-            'probability': {{
-                'no_churn': float(probability[0]),
-                'churn': float(probability[1])
-            }},
-            'confidence': float(max(probability)),
-            'risk_level': 'High' if probability[1] > 0.7 else 'Medium' if probability[1] > 0.3 else 'Low',
-            'model_version': latest_info['version'],
-            'prediction_timestamp': datetime.now().isoformat(),
-            'status': 'success'
-        }}
-        
-        return result
-        
-    except Exception as e:
-        return {{
-            'error': str(e),
-            'status': 'error'
-        }}
+# Make the mlops_demo package importable when run from this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-def batch_predict(data_list):
-    """
-    Make predictions for multiple customers
-    """
-    results = []
-    for i, customer_data in enumerate(data_list):
-        print(f"Processing customer {{i+1}}/{{len(data_list)}}...")
-        result = predict_churn(customer_data)
-        results.append(result)
-    return results
+from mlops_demo.utils.prediction_client import PredictionClient, batch_predict, predict_churn
 
 if __name__ == "__main__":
     # Test the function
-    test_data = {{
+    test_data = {
         "account_age": 36,
         "monthly_charges": 120.0,
         "total_charges": 4320.0,
@@ -117,7 +40,7 @@ if __name__ == "__main__":
         "usage_frequency": 0.4,
         "support_tickets": 3,
         "satisfaction_score": 0.2
-    }}
+    }
     
     print("Testing Prediction Function...")
     print("=" * 50)
@@ -218,7 +141,6 @@ print("💡 Usage: from predict import predict_churn")
     print(f"")
     print(f"🔍 Quick test...")
     try:
-        exec(open(utility_path).read())
         test_data = {
             "account_age": 36,
             "monthly_charges": 120.0,
@@ -231,7 +153,6 @@ print("💡 Usage: from predict import predict_churn")
             "support_tickets": 3,
             "satisfaction_score": 0.2
         }
-        # Note: predict_churn function is now available in local scope
         result = predict_churn(test_data)
         if result['status'] == 'success':
             print(f"✅ Test prediction successful!")
@@ -0,0 +1,54 @@
+if 'data_loader' not in globals():
+    from mage_ai.data_preparation.decorators import data_loader
+if 'test' not in globals():
+    from mage_ai.data_preparation.decorators import test
+
+import json
+import os
+
+from mlops_demo.utils.batch_scoring import DEFAULT_CHUNK_SIZE, score_source
+from mlops_demo.utils.paths import BATCH_SCORES_PATH, FEATURE_STORE_PATH
+from mlops_demo.utils.variables import as_bool
+
+@data_loader
+def batch_score(*args, **kwargs):
+    """
+    Score a customer file (CSV or Parquet) with the served model.
+
+    Variables: input_path (required), output_path, chunk_size, n_jobs,
+    resume (default True: chunks already scored by an interrupted run of the
+    same input and model version are skipped), use_feature_store (default
+    True: the input may hold bare customer_ids, missing features are read
+    from the feature store).
+    """
+    input_path = kwargs.get('input_path')
+    if not input_path:
+        raise ValueError("Set the 'input_path' variable to the CSV or Parquet file to score")
+
+    print(f"🔮 Batch scoring {input_path}...")
+    summary = score_source(
+        input_path,
+        kwargs.get('output_path', BATCH_SCORES_PATH),
+        chunk_size=int(kwargs.get('chunk_size', DEFAULT_CHUNK_SIZE)),
+        n_jobs=int(kwargs['n_jobs']) if kwargs.get('n_jobs') else None,
+        resume=as_bool(kwargs.get('resume'), default=True),
+        feature_store_path=FEATURE_STORE_PATH if as_bool(kwargs.get('use_feature_store'), default=True) else None
+    )
+
+    print(f"✅ Scored {summary['rows_scored']:,} rows with {summary['model_version']}")
+    if summary['rows_skipped']:
+        print(f"   Resumed: {summary['rows_skipped']:,} rows already scored")
+    print(f"   Throughput: {summary['rows_per_second'] or 0:,} rows/s ({summary['n_jobs']} workers)")
+    print(f"   Risk levels: {summary['risk_levels']}")
+    if summary['feature_snapshot']:
+        print(f"   Feature snapshot: {summary['feature_snapshot']} "
+              f"({summary['customers_not_found']:,} customers not found)")
+    print(f"   Output: {summary['output_path']}")
+    return summary
+
+@test
+def test_output(output, *args) -> None:
+    assert output['rows_scored'] + output['rows_skipped'] > 0, 'No rows scored'
+    with open(os.path.join(output['output_path'], '_SUCCESS')) as f:
+        assert json.load(f)['model_version'] == output['model_version'], 'Run not completed'
+    print("✅ Batch scoring validation passed")
@@ -0,0 +1,61 @@
+if 'data_loader' not in globals():
+    from mage_ai.data_preparation.decorators import data_loader
+if 'test' not in globals():
+    from mage_ai.data_preparation.decorators import test
+
+import json
+
+from mlops_demo.utils.fan_out import MageTriggerAPI, fan_out, select_best
+from mlops_demo.utils.variables import as_bool
+
+@data_loader
+def fan_out_trigger(*args, **kwargs):
+    """
+    Run a child pipeline once per variables set and aggregate its outputs.
+
+    Variables: child_pipeline (required), child_variables (list of variables
+    dicts, or a JSON string) or partitions (one run per value, passed as
+    `partition_variable`, default 'partition'), max_concurrency (default 4),
+    initial_poll_interval (0.25 s), max_poll_interval (10 s), poll_timeout,
+    error_on_failure (default True), metric / metric_mode to pick the best child.
+    """
+    child_pipeline = kwargs.get('child_pipeline')
+    if not child_pipeline:
+        raise ValueError("Set the 'child_pipeline' variable to the UUID of the pipeline to fan out")
+
+    child_variables = kwargs.get('child_variables')
+    if isinstance(child_variables, str):
+        child_variables = json.loads(child_variables)
+    if child_variables is None:
+        partition_variable = kwargs.get('partition_variable', 'partition')
+        child_variables = [{partition_variable: value} for value in kwargs.get('partitions') or []]
+    if not child_variables:
+        raise ValueError("Set 'child_variables' or 'partitions' to at least one child run")
+
+    max_concurrency = int(kwargs.get('max_concurrency', 4))
+    print(f"🚀 Fanning out {len(child_variables)} runs of {child_pipeline} ({max_concurrency} at a time)...")
+    result = fan_out(
+        MageTriggerAPI(),
+        child_pipeline,
+        child_variables,
+        max_concurrency=max_concurrency,
+        initial_poll=float(kwargs.get('initial_poll_interval', 0.25)),
+        max_poll=float(kwargs.get('max_poll_interval', 10)),
+        timeout=float(kwargs['poll_timeout']) if kwargs.get('poll_timeout') else None,
+        error_on_failure=as_bool(kwargs.get('error_on_failure'), default=True)
+    )
+
+    print(f"✅ {result['completed']}/{len(child_variables)} child runs completed in {result['seconds']:.1f}s")
+    print(f"   Median child run: {result['child_seconds_p50']}s, {result['status_calls']} status checks")
+    if kwargs.get('metric'):
+        best = select_best(result, kwargs['metric'], kwargs.get('metric_mode', 'max'))
+        result['best'] = best and {'index': best['index'], 'variables': best['variables'], 'run_id': best['run_id']}
+        if best:
+            print(f"🏆 Best {kwargs['metric']}: child {best['index']} {best['variables']}")
+    return result
+
+@test
+def test_output(output, *args) -> None:
+    assert output['children'], 'No child runs'
+    assert output['completed'] + output['failed'] == len(output['children']), 'Unaccounted child runs'
+    print("✅ Fan-out validation passed")
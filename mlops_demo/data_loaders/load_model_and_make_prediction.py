@@ -7,17 +7,27 @@ if 'test' not in globals():
     from mage_ai.data_preparation.decorators import test
 
 
-import joblib
-import json
-import os
-import numpy as np
+import time
+
 import pandas as pd
 
+from mlops_demo.utils.batch_scoring import score_frame
+from mlops_demo.utils.model_cache import get_model
+from mlops_demo.utils.prediction_queue import PredictionQueue, score_batch
+
 @data_loader
 def predict_churn(*args, **kwargs):
     """
-    Load model and make predictions via API trigger
+    Load model and make predictions via API trigger.
+    With the `batch_id` variable (runs launched by the prediction queue
+    dispatcher), scores every queued request of that batch instead.
     """
+    if kwargs.get('batch_id'):
+        summary = score_batch(PredictionQueue(), kwargs['batch_id'])
+        print(f"📦 Batch {summary['batch_id']}: {summary['scored']} scored, {summary['failed']} failed"
+              f" in {summary.get('seconds', 0) * 1000:.1f} ms (model {summary.get('model_cache', '-')})")
+        return summary
+    
     # Get prediction data from API call variables
     if 'input_data' in kwargs:
         input_data = kwargs['input_data']
@@ -36,65 +46,44 @@ def predict_churn(*args, **kwargs):
             "satisfaction_score": 0.6
         }
     
-    # Load latest model from registry
-    registry_path = '/home/src/mlops_demo/model_registry'
-    latest_path = os.path.join(registry_path, 'latest.json')
-    
-    if not os.path.exists(latest_path):
-        raise Exception("No trained model found. Please run the training pipeline first.")
-    
-    with open(latest_path, 'r') as f:
-        latest_info = json.load(f)
-    
-    # Load model and scaler
-    model_path = os.path.join(latest_info['path'], 'model.pkl')
-    scaler_path = os.path.join(latest_info['path'], 'scaler.pkl')
-    
-    model = joblib.load(model_path)
-    scaler = joblib.load(scaler_path)
+    # Served model from the process-wide cache (warmed by the scheduler);
+    # raises if no model has been trained yet
+    start = time.perf_counter()
+    model, cache_hit = get_model()
+    model_ms = (time.perf_counter() - start) * 1000
     
-    # Feature names (should match training)
-    feature_names = [
-        'account_age', 'monthly_charges', 'total_charges', 'num_services',
-        'customer_service_calls', 'contract_length', 'payment_method_score',
-        'usage_frequency', 'support_tickets', 'satisfaction_score'
-    ]
-    
-    # Prepare input data
-    df = pd.DataFrame([input_data])
-    
-    # Ensure all features are present
-    for feature in feature_names:
-        if feature not in df.columns:
-            df[feature] = 0
-    
-    # Select and order features
-    X = df[feature_names].values
-    
-    # Scale features
-    X_scaled = scaler.transform(X)
-    
-    # Make prediction
-    prediction = model.predict(X_scaled)[0]
-    probability = model.predict_proba(X_scaled)[0]
+    # Missing features are imputed like the prediction service does
+    scores = score_frame(model['scorer'], pd.DataFrame([input_data]))
+    churn_probability = float(scores['churn_probability'].iloc[0])
+    predict_ms = (time.perf_counter() - start) * 1000 - model_ms
     
     result = {
         'customer_data': input_data,
-        'prediction': int(prediction),
+        'prediction': int(scores['prediction'].iloc[0]),
         'probability': {
-            'no_churn': float(probability[0]),
-            'churn': float(probability[1])
+            'no_churn': 1 - churn_probability,
+            'churn': churn_probability
         },
-        'risk_level': 'High' if probability[1] > 0.7 else 'Medium' if probability[1] > 0.3 else 'Low',
-        'model_version': latest_info['version'],
-        'prediction_timestamp': pd.Timestamp.now().isoformat()
+        'risk_level': str(scores['risk_level'].iloc[0]),
+        'model_version': model['version'],
+        'prediction_timestamp': pd.Timestamp.now().isoformat(),
+        'timing': {
+            'model_cache': 'hit' if cache_hit else 'load',
+            'model_ms': round(model_ms, 3),
+            'predict_ms': round(predict_ms, 3)
+        }
     }
     
+    print(f"⏱️ Model {result['timing']['model_cache']}: {model_ms:.2f} ms, prediction: {predict_ms:.2f} ms")
     print(f"Prediction made: {result}")
     return result
 
 @test
 def test_output(output, *args) -> None:
+    if 'batch_id' in output:
+        assert output['scored'] + output['failed'] == output['requests'], 'Batch requests left unscored'
+        print("✅ Batch prediction validation passed")
+        return
     assert 'prediction' in output, 'Prediction missing'
     assert 'probability' in output, 'Probability missing'
     assert 'risk_level' in output, 'Risk level missing'
@@ -1,22 +1,34 @@
-import io
-import pandas as pd
-import requests
 from pandas import DataFrame
 
+from mlops_demo.utils.source_cache import SourceCache
+from mlops_demo.utils.variables import as_bool
+
 if 'data_loader' not in globals():
     from mage_ai.data_preparation.decorators import data_loader
 if 'test' not in globals():
     from mage_ai.data_preparation.decorators import test
 
+TITANIC_URL = 'https://raw.githubusercontent.com/datasciencedojo/datasets/master/titanic.csv?raw=True'
+
 
 @data_loader
 def load_data_from_api(**kwargs) -> DataFrame:
     """
-    Template for loading data from API
+    Load the Titanic CSV through the local source cache
+    (mlops_demo/utils/source_cache.py): the download is revalidated with
+    ETag/Last-Modified and the CSV is parsed once, repeat runs read the typed
+    Parquet copy. Set the `offline` variable (or SOURCE_CACHE_OFFLINE=1) to
+    run from the cached copy without network.
     """
-    url = 'https://raw.githubusercontent.com/datasciencedojo/datasets/master/titanic.csv?raw=True'
+    url = kwargs.get('titanic_url', TITANIC_URL)
+    # Unset: SOURCE_CACHE_OFFLINE decides
+    cache = SourceCache(offline=as_bool(kwargs.get('offline'), default=None))
+    df, record = cache.read_csv(url, format=kwargs.get('parsed_format', 'parquet'))
+    df.attrs['source_cache'] = record
 
-    return pd.read_csv(url)
+    print(f"✅ Loaded {len(df)} rows: source {record['status']}, parsed copy {record['parsed']} "
+          f"({record['seconds']:.3f}s)")
+    return df
 
 
 @test
@@ -7,20 +7,29 @@ import json
 from sklearn.datasets import make_classification
 from datetime import datetime
 
+from mlops_demo.utils.column_summary import summarize
+from mlops_demo.utils.features import FEATURE_NAMES, TARGET_COLUMN, apply_dtype_policy
+from mlops_demo.utils.profiling import profiled
+
 if 'data_loader' not in globals():
     from mage_ai.data_preparation.decorators import data_loader
 if 'test' not in globals():
     from mage_ai.data_preparation.decorators import test
 
 @data_loader
+@profiled('make_dataset')
 def load_customer_data(*args, **kwargs):
     """
     Generate synthetic customer data for churn prediction
     Includes data versioning with SHA256 hashing for lineage tracking
+    Columns are downcast to the compact dtypes of mlops_demo/utils/features.py
+    
+    Returns two outputs: the DataFrame and a constant-size summary of its
+    columns (histograms, quantiles, row sample) that chart blocks render from.
     """
     # Generate synthetic dataset
     X, y = make_classification(
-        n_samples=1000,
+        n_samples=int(kwargs.get('n_samples', 1000)),
         n_features=10,
         n_informative=8,
         n_redundant=2,
@@ -29,11 +38,7 @@ def load_customer_data(*args, **kwargs):
     )
     
     # Create DataFrame with meaningful column names
-    feature_names = [
-        'account_age', 'monthly_charges', 'total_charges', 'num_services',
-        'customer_service_calls', 'contract_length', 'payment_method_score',
-        'usage_frequency', 'support_tickets', 'satisfaction_score'
-    ]
+    feature_names = FEATURE_NAMES
     
     df = pd.DataFrame(X, columns=feature_names)
     df['customer_id'] = range(1, len(df) + 1)
@@ -44,6 +49,7 @@ def load_customer_data(*args, **kwargs):
     df['monthly_charges'] = np.abs(df['monthly_charges'] * 50 + 100)  # dollars
     df['total_charges'] = df['monthly_charges'] * df['account_age']
     df['num_services'] = np.abs(df['num_services']).astype(int) % 10 + 1
+    apply_dtype_policy(df)
     
     # Calculate data hash for versioning
     data_hash = hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values).hexdigest()
@@ -62,12 +68,15 @@ def load_customer_data(*args, **kwargs):
         "features": feature_names,
         "target": "churn",
         "churn_rate": float(df['churn'].mean()),
+        "memory_bytes": int(df.memory_usage(index=False).sum()),
         "data_shape": list(df.shape)
     }
     
     # Store data metadata in kwargs for downstream blocks
     if 'data_metadata' not in kwargs:
         kwargs['data_metadata'] = data_metadata
+    # kwargs do not reach the next block: carry it on the frame as well
+    df.attrs['data_metadata'] = data_metadata
     
     print(f"✅ Loaded {len(df)} customer records")
     print(f"   Data Version: {data_version}")
@@ -75,12 +84,17 @@ def load_customer_data(*args, **kwargs):
     print(f"   Churn rate: {df['churn'].mean():.2%}")
     print(f"   Shape: {df.shape}")
     
-    # Return DataFrame with metadata attached
-    return df
+    # Chart blocks read this summary instead of the full frame
+    column_summary = summarize(df, columns=feature_names + [TARGET_COLUMN])
+    
+    # Return DataFrame with metadata attached, and its summary as a second output
+    return df, column_summary
 
 @test
 def test_output(output, *args) -> None:
     assert output is not None, 'Data loading failed'
     assert len(output) > 0, 'No data loaded'
     assert 'churn' in output.columns, 'Target variable missing'
+    if args:
+        assert args[0]['rows'] == len(output), 'Column summary does not cover the data'
     print(f"✅ Data validation passed: {len(output)} records loaded")
@@ -4,11 +4,12 @@ if 'test' not in globals():
     from mage_ai.data_preparation.decorators import test
 
 
-import joblib
-import json
-import os
+import time
+
 import pandas as pd
-import numpy as np
+
+from mlops_demo.utils.batch_scoring import score_frame
+from mlops_demo.utils.model_cache import get_model
 
 @data_loader
 def predict_customer_churn(*args, **kwargs):
@@ -33,44 +34,17 @@ def predict_customer_churn(*args, **kwargs):
     print(f"Input data: {input_data}")
     
     try:
-        # Load latest model
-        registry_path = '/home/src/mlops_demo/model_registry'
-        latest_file = os.path.join(registry_path, 'latest.json')
-        
-        with open(latest_file, 'r') as f:
-            latest_info = json.load(f)
-        
-        model_path = os.path.join(latest_info['path'], 'model.pkl')
-        scaler_path = os.path.join(latest_info['path'], 'scaler.pkl')
-        
-        # Load model and scaler
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
-        
-        # Prepare features
-        feature_names = [
-            'account_age', 'monthly_charges', 'total_charges', 'num_services',
-            'customer_service_calls', 'contract_length', 'payment_method_score',
-            'usage_frequency', 'support_tickets', 'satisfaction_score'
-        ]
-        
-        # Create dataframe
-        df = pd.DataFrame([input_data])
-        
-        # Fill missing features with 0
-        for feature in feature_names:
-            if feature not in df.columns:
-                df[feature] = 0
-        
-        # Select features in correct order
-        X = df[feature_names].values
-        
-        # Scale features
-        X_scaled = scaler.transform(X)
+        # Served model from the process-wide cache (warmed by the scheduler)
+        start = time.perf_counter()
+        model, cache_hit = get_model()
+        model_ms = (time.perf_counter() - start) * 1000
         
-        # Make prediction
-        prediction = model.predict(X_scaled)[0]
-        probabilities = model.predict_proba(X_scaled)[0]
+        # Missing features are imputed like the prediction service does
+        scores = score_frame(model['scorer'], pd.DataFrame([input_data]))
+        churn_probability = float(scores['churn_probability'].iloc[0])
+        prediction = int(scores['prediction'].iloc[0])
+        probabilities = [1 - churn_probability, churn_probability]
+        predict_ms = (time.perf_counter() - start) * 1000 - model_ms
         
         # Create result
         result = {
@@ -80,9 +54,14 @@ def predict_customer_churn(*args, **kwargs):
             'churn_probability': float(probabilities[1]),
             'stay_probability': float(probabilities[0]),
             'confidence': float(max(probabilities)),
-            'risk_level': 'High' if probabilities[1] > 0.7 else 'Medium' if probabilities[1] > 0.3 else 'Low',
-            'model_version': latest_info['version'],
-            'timestamp': str(pd.Timestamp.now())
+            'risk_level': str(scores['risk_level'].iloc[0]),
+            'model_version': model['version'],
+            'timestamp': str(pd.Timestamp.now()),
+            'timing': {
+                'model_cache': 'hit' if cache_hit else 'load',
+                'model_ms': round(model_ms, 3),
+                'predict_ms': round(predict_ms, 3)
+            }
         }
         
         # Print results clearly
@@ -95,6 +74,7 @@ def predict_customer_churn(*args, **kwargs):
         print(f"Churn Probability: {result['churn_probability']:.1%}")
         print(f"Confidence: {result['confidence']:.1%}")
         print(f"Model Version: {result['model_version']}")
+        print(f"⏱️ Model {result['timing']['model_cache']}: {model_ms:.2f} ms, prediction: {predict_ms:.2f} ms")
         print("="*50)
         
         return result
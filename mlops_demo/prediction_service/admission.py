@@ -0,0 +1,194 @@
+"""
+Admission control in front of the scoring path.
+
+At most `max_in_flight` requests score at once; up to `max_queue` more wait
+for a slot, in arrival order (priority "high" ahead of "normal"), anything
+beyond is rejected at once with 429. Every request has a deadline (its
+budget, X-Deadline-Ms, or `default_deadline`, minus the time it spent before
+reaching the service when the client or a proxy sets X-Request-Start):
+- a request whose budget is already spent (or, all slots being busy, too
+  short to score it) is rejected on arrival with 503, before any scoring
+  work: past saturation, requests mostly wait in the socket backlog and
+  server threads, where no queue length shows it
+- a request whose expected wait plus service time already exceeds it is
+  rejected on arrival with 503 (the expected wait comes from the queue ahead
+  of it and a moving average of the service time)
+- a request still queued when there is no time left to score it before its
+  deadline leaves the queue with 503
+Rejections carry Retry-After, the time the current backlog needs to drain, so
+a burst is shed in microseconds instead of timing out together later.
+
+Only the scoring routes go through the controller: /health and the metrics
+routes never queue behind predictions (and with ADMIN_PORT set, app.py serves
+them on a listener of their own, away from /predict's connection backlog).
+
+Kept next to app.py because the prediction service does not ship mlops_demo.
+"""
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+PRIORITIES = ("high", "normal")
+# Weight of the latest request in the moving average of the service time
+SERVICE_TIME_ALPHA = 0.1
+# Recent queue times kept for the percentiles of stats()
+QUEUE_TIME_SAMPLES = 10_000
+
+
+class Rejected(Exception):
+    """Request shed before scoring"""
+
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("event", "admitted")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.admitted = False
+
+
+class AdmissionController:
+    """
+    Bounded in-flight limit and deadline-aware queue; max_in_flight=0
+    disables admission control (every request is admitted at once).
+    """
+
+    def __init__(self, max_in_flight=4, max_queue=32, default_deadline=1.0):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.default_deadline = default_deadline
+        self._in_flight = 0
+        self._queues = {priority: deque() for priority in PRIORITIES}
+        # Moving average of the time a request holds its slot (seconds)
+        self._service_time = 0.0
+        self._admitted = 0
+        self._completed = 0
+        self._shed = {"queue_full": 0, "deadline_unmeetable": 0, "deadline_expired": 0}
+        self._queue_times = deque(maxlen=QUEUE_TIME_SAMPLES)
+        self._queue_time_sum = 0.0
+        self._upstream_times = deque(maxlen=QUEUE_TIME_SAMPLES)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_in_flight > 0
+
+    def _queued(self):
+        return sum(len(queue) for queue in self._queues.values())
+
+    def _drain_seconds(self, requests):
+        """Time for `requests` more requests to get through the slots"""
+        return requests * self._service_time / self.max_in_flight
+
+    def _reject(self, status, reason):
+        self._shed[reason] += 1
+        retry_after = max(1, math.ceil(self._drain_seconds(self._queued() + self._in_flight)))
+        return Rejected(status, reason, retry_after)
+
+    def _admit(self, queue_time):
+        self._admitted += 1
+        self._queue_times.append(queue_time)
+        self._queue_time_sum += queue_time
+
+    def acquire(self, deadline=None, priority="normal", upstream=0.0):
+        """
+        Take a scoring slot, waiting at most `deadline` seconds (default:
+        default_deadline) minus the `upstream` seconds the request already
+        waited. Returns the time spent queued; raises Rejected.
+        """
+        if not self.enabled:
+            return 0.0
+        if priority not in self._queues:
+            priority = "normal"
+        arrived = time.monotonic()
+        budget = (self.default_deadline if deadline is None else deadline) - upstream
+        with self._lock:
+            self._upstream_times.append(upstream)
+            # The service time estimate only sheds while slots are busy: their
+            # completions keep it current (a stale estimate cannot shed everything)
+            busy = self._in_flight >= self.max_in_flight
+            if budget <= 0 or (busy and budget <= self._service_time):
+                raise self._reject(503, "deadline_expired")
+            if self._in_flight < self.max_in_flight and not self._queued():
+                self._in_flight += 1
+                self._admit(0.0)
+                return 0.0
+            if self._queued() >= self.max_queue:
+                raise self._reject(429, "queue_full")
+            # Everything of this priority or higher is served first, plus one
+            # in-flight request finishing to free a slot
+            ahead = sum(len(self._queues[p]) for p in PRIORITIES[:PRIORITIES.index(priority) + 1])
+            if self._drain_seconds(ahead + 1) + self._service_time > budget:
+                raise self._reject(503, "deadline_unmeetable")
+            waiter = _Waiter()
+            self._queues[priority].append(waiter)
+            # Waiting longer would only start a request that cannot finish in time
+            wait = budget - self._service_time
+
+        waiter.event.wait(max(wait - (time.monotonic() - arrived), 0))
+        with self._lock:
+            # A slot handed over right after the timeout still counts
+            if not waiter.admitted:
+                self._queues[priority].remove(waiter)
+                raise self._reject(503, "deadline_expired")
+            queue_time = time.monotonic() - arrived
+            self._admit(queue_time)
+        return queue_time
+
+    def release(self, service_time):
+        """Give the slot back (to the next queued request, if any)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            # The first request seeds the average
+            alpha = SERVICE_TIME_ALPHA if self._completed else 1.0
+            self._service_time += alpha * (service_time - self._service_time)
+            self._completed += 1
+            for priority in PRIORITIES:
+                if self._queues[priority]:
+                    waiter = self._queues[priority].popleft()
+                    waiter.admitted = True
+                    waiter.event.set()
+                    return
+            self._in_flight -= 1
+
+    @contextmanager
+    def slot(self, deadline=None, priority="normal", upstream=0.0):
+        """Hold a scoring slot for the duration of the block; yields the queue time"""
+        queue_time = self.acquire(deadline, priority, upstream)
+        start = time.monotonic()
+        try:
+            yield queue_time
+        finally:
+            self.release(time.monotonic() - start)
+
+    def stats(self):
+        with self._lock:
+            queue_times = sorted(self._queue_times)
+            upstream_times = sorted(self._upstream_times)
+            stats = {
+                "enabled": self.enabled,
+                "max_in_flight": self.max_in_flight,
+                "max_queue": self.max_queue,
+                "default_deadline_ms": round(self.default_deadline * 1000, 1),
+                "in_flight": self._in_flight,
+                "queued": {priority: len(queue) for priority, queue in self._queues.items()},
+                "admitted": self._admitted,
+                "completed": self._completed,
+                "shed": dict(self._shed),
+                "service_time_ms": round(self._service_time * 1000, 3),
+                "queue_time_ms_mean": round(self._queue_time_sum / self._admitted * 1000, 3) if self._admitted else None
+            }
+        for name, samples in (("queue_time_ms", queue_times), ("upstream_time_ms", upstream_times)):
+            if samples:
+                stats[name] = {q: round(samples[min(int(f * len(samples)), len(samples) - 1)] * 1000, 3)
+                               for q, f in (("p50", 0.5), ("p99", 0.99), ("max", 1.0))}
+        return stats
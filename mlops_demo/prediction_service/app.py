@@ -1,18 +1,40 @@
+import time
+
+# Measured from the first line: /health reports the boot budget
+_BOOT_START = time.perf_counter()
+
+import atexit
+import functools
 import json
 import os
+import signal
+import sqlite3
+import sys
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request, jsonify
 import joblib
-import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from admission import AdmissionController, Rejected
+from drift_monitor import DriftMonitor
+from feature_store import FeatureStore
+from model_quality import ModelQuality, PredictionIndex
+from prediction_history import PredictionHistory
+
+_IMPORTS_DONE = time.perf_counter()
+
 app = Flask(__name__)
 
-# Global cache for model artifacts
-_model_cache = None
-_scaler_cache = None
-_version_cache = None
-_last_reload_time = None
+# Served version: {"version", "model", "scaler", "imputation", "dtype",
+# "loaded_at"}, replaced as a whole so a request never mixes two versions
+_served = None
+_drift_monitor = None
+_drift_version = None
+_load_lock = threading.Lock()
+_boot = {}
 
 FEATURE_NAMES = [
     "account_age",
@@ -28,53 +50,307 @@ FEATURE_NAMES = [
 ]
 
 
-def load_model():
+LATEST_INFO_PATH = os.environ.get(
+    "LATEST_INFO_PATH",
+    "/home/src/mlops_demo/model_registry/latest.json"
+)
+REGISTRY_CATALOG_PATH = os.environ.get(
+    "REGISTRY_CATALOG_PATH",
+    os.path.join(os.path.dirname(LATEST_INFO_PATH), "catalog.db")
+)
+
+# Served predictions (writable volume: the registry is mounted read-only)
+PREDICTION_HISTORY_PATH = os.environ.get(
+    "PREDICTION_HISTORY_PATH",
+    "/home/src/mlops_demo/prediction_history"
+)
+history = PredictionHistory(
+    PREDICTION_HISTORY_PATH,
+    feature_names=FEATURE_NAMES,
+    flush_rows=int(os.environ.get("PREDICTION_HISTORY_FLUSH_ROWS", 1000)),
+    flush_seconds=float(os.environ.get("PREDICTION_HISTORY_FLUSH_SECONDS", 5))
+)
+history.start_flusher()
+atexit.register(history.flush)
+
+# Ground-truth labels are joined to recent predictions (bounded index) and
+# rolled up per version and hour next to the history
+recent_predictions = PredictionIndex(
+    max_size=int(os.environ.get("FEEDBACK_INDEX_SIZE", 100_000)),
+    max_age_seconds=float(os.environ.get("FEEDBACK_MAX_AGE_SECONDS", 7 * 86400))
+)
+quality = ModelQuality(PREDICTION_HISTORY_PATH)
+
+# Latest features per customer, materialized by the training pipeline: a
+# request may send a bare customer_id (request features override stored ones)
+FEATURE_STORE_PATH = os.environ.get(
+    "FEATURE_STORE_PATH",
+    "/home/src/mlops_demo/feature_store"
+)
+feature_store = FeatureStore(
+    FEATURE_STORE_PATH,
+    check_interval=float(os.environ.get("FEATURE_STORE_CHECK_SECONDS", 5))
+)
+
+# Served features are binned per window against the version's training profile
+DRIFT_WINDOW_SECONDS = float(os.environ.get("DRIFT_WINDOW_SECONDS", 300))
+DRIFT_WINDOWS = int(os.environ.get("DRIFT_WINDOWS", 12))
+# Rows below which a feature's PSI is not read as drift
+DRIFT_MIN_ROWS = int(os.environ.get("DRIFT_MIN_ROWS", 100))
+
+# Bounded scoring concurrency and queue: bursts are shed with 429/503 and
+# Retry-After instead of piling up (ADMISSION_MAX_IN_FLIGHT=0 disables it)
+admission = AdmissionController(
+    max_in_flight=int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", 4)),
+    max_queue=int(os.environ.get("ADMISSION_MAX_QUEUE", 32)),
+    default_deadline=float(os.environ.get("ADMISSION_DEFAULT_DEADLINE_MS", 1000)) / 1000
+)
+
+
+def request_upstream_seconds():
     """
-    Dynamically load or reload model from latest.json
-    Returns: (model, scaler, version)
+    Time since X-Request-Start ("t=<epoch>" in seconds or milliseconds, as
+    set by nginx or a load balancer), 0 without the header
     """
-    global _model_cache, _scaler_cache, _version_cache, _last_reload_time
+    value = request.headers.get("X-Request-Start", "").removeprefix("t=")
+    try:
+        started = float(value)
+    except ValueError:
+        return 0.0
+    if started > 1e11:
+        started /= 1000
+    return max(time.time() - started, 0.0)
+
+
+def admission_controlled(view):
+    """
+    Run a scoring route behind the admission controller. Clients may send
+    X-Deadline-Ms (budget), X-Request-Start (send time) and X-Priority: high.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        deadline_ms = request.headers.get("X-Deadline-Ms", type=float)
+        try:
+            with admission.slot(
+                deadline_ms / 1000 if deadline_ms is not None else None,
+                request.headers.get("X-Priority", "normal"),
+                request_upstream_seconds()
+            ):
+                return view(*args, **kwargs)
+        except Rejected as e:
+            response = jsonify({"status": "error", "error": f"Request shed ({e.reason})"})
+            response.headers["Retry-After"] = str(e.retry_after)
+            return response, e.status
+    return wrapper
+
+
+def record_prediction(**record):
+    """Persist a served prediction; never fails the request"""
+    try:
+        history.record(**record)
+    except Exception as e:
+        app.logger.warning(f"Could not record prediction: {e}")
+
+
+def record_drift(data):
+    """Count a scored request in the drift monitor; never fails the request"""
+    if _drift_monitor is None:
+        return
+    try:
+        _drift_monitor.observe(data)
+    except Exception as e:
+        app.logger.warning(f"Could not record drift: {e}")
+
+
+def parse_customer_id(value):
+    """
+    Canonical form of a JSON customer_id ("42" for 42, 42.0 or "42"), the key
+    of both the feature store lookup and the feedback index; raises ValueError
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, str):
+        try:
+            value = int(value.strip())
+        except ValueError:
+            pass
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"customer_id must be an integer, got {value!r}")
+    return str(value)
+
+
+def load_drift_monitor(version_path):
+    """Monitor on the version's feature_profile.json (None for versions registered without one)"""
+    profile_path = os.path.join(version_path, "feature_profile.json")
+    if not os.path.exists(profile_path):
+        return None
+    try:
+        with open(profile_path, "r") as f:
+            profile = json.load(f)
+        features = [name for name in FEATURE_NAMES if name in profile["features"]]
+        return DriftMonitor(profile, features, window_seconds=DRIFT_WINDOW_SECONDS, windows=DRIFT_WINDOWS,
+                            min_rows=DRIFT_MIN_ROWS)
+    except Exception as e:
+        app.logger.warning(f"Drift monitoring disabled, unreadable profile {profile_path}: {e}")
+        return None
+
+
+def resolve_current_version():
+    """
+    Served version from the registry catalog: one primary-key lookup on a
+    read-only connection (the registry is mounted read-only). Falls back to
+    latest.json when the registry has no catalog yet.
+    Returns: {"version": ..., "path": ...}
+    """
+    if os.path.exists(REGISTRY_CATALOG_PATH):
+        conn = sqlite3.connect(f"file:{REGISTRY_CATALOG_PATH}?mode=ro", uri=True, timeout=5)
+        try:
+            row = conn.execute(
+                "SELECT v.version, v.path FROM served s JOIN versions v ON v.version = s.version "
+                "WHERE s.slot = 'current'"
+            ).fetchone()
+        finally:
+            conn.close()
+        if row:
+            return {"version": row[0], "path": row[1]}
+    
+    with open(LATEST_INFO_PATH, "r") as f:
+        return json.load(f)
+
+
+def version_path(version):
+    """Directory of a registered version (catalog, else next to latest.json)"""
+    if os.path.exists(REGISTRY_CATALOG_PATH):
+        conn = sqlite3.connect(f"file:{REGISTRY_CATALOG_PATH}?mode=ro", uri=True, timeout=5)
+        try:
+            row = conn.execute("SELECT path FROM versions WHERE version = ?", (version,)).fetchone()
+        finally:
+            conn.close()
+        if row:
+            return row[0]
+    return os.path.join(os.path.dirname(LATEST_INFO_PATH), version)
+
+
+def training_metrics(version):
+    """Metrics recorded in lineage at training time, None when unavailable"""
+    lineage_path = os.path.join(version_path(version), "lineage.json")
+    if not os.path.exists(lineage_path):
+        return None
+    with open(lineage_path, "r") as f:
+        metrics = json.load(f).get("metrics") or {}
+    return {key: metrics.get(key) for key in ("accuracy", "auc_score", "test_samples")}
+
+
+def _read_json(path):
+    """Parsed JSON file, {} when the version was registered without it"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def load_model(force=False):
+    """
+    Dynamically load or reload the served model version
+    Returns: {"version", "model", "scaler", "imputation", "dtype", "loaded_at"},
+    read once per request (a promotion swaps the whole dict)
+    
+    Artifacts are only read again when the served version changes (or with
+    force=True, see /reload); a new version's files are read in parallel.
+    """
+    global _served, _drift_monitor, _drift_version
     
     try:
-        # Read latest.json to get current model path
-        latest_info_path = os.environ.get(
-            "LATEST_INFO_PATH",
-            "/home/src/mlops_demo/model_registry/latest.json"
-        )
-        
-        with open(latest_info_path, "r") as f:
-            latest_info = json.load(f)
-        
-        # Construct paths to model and scaler
-        model_path = os.path.join(latest_info["path"], "model.pkl")
-        scaler_path = os.path.join(latest_info["path"], "scaler.pkl")
-        
-        # Load model and scaler
-        model = joblib.load(model_path)
-        scaler = joblib.load(scaler_path)
+        # Resolve the served version (catalog, or latest.json for older registries)
+        latest_info = resolve_current_version()
         version = latest_info["version"]
+        served = _served
+        if not force and served is not None and version == served["version"]:
+            return served
+        
+        with _load_lock:
+            # Another request may have loaded it while this one waited
+            served = _served
+            if not force and served is not None and version == served["version"]:
+                return served
+            
+            path = latest_info["path"]
+            with ThreadPoolExecutor(max_workers=5) as pool:
+                model = pool.submit(joblib.load, os.path.join(path, "model.pkl"))
+                scaler = pool.submit(joblib.load, os.path.join(path, "scaler.pkl"))
+                # Median imputation values fitted at training time (older versions have none)
+                imputation = pool.submit(_read_json, os.path.join(path, "imputation.json"))
+                # Serve with the dtype the model was trained on (recorded in lineage)
+                lineage = pool.submit(_read_json, os.path.join(path, "lineage.json"))
+                # A new version starts a new drift reference (and empty windows)
+                drift_monitor = pool.submit(load_drift_monitor, path) if version != _drift_version else None
+            
+            served = {
+                "version": version,
+                "model": model.result(),
+                "scaler": scaler.result(),
+                "imputation": imputation.result().get("values", {}),
+                "dtype": (lineage.result().get("dtype_policy") or {}).get("model_dtype", "float64"),
+                "loaded_at": datetime.now().isoformat()
+            }
+            if drift_monitor is not None:
+                _drift_monitor = drift_monitor.result()
+                _drift_version = version
+            # One assignment publishes the version to lock-free readers
+            _served = served
         
-        # Update cache
-        _model_cache = model
-        _scaler_cache = scaler
-        _version_cache = version
-        _last_reload_time = datetime.now().isoformat()
-        
-        return model, scaler, version
+        return served
     
     except Exception as e:
         raise Exception(f"Failed to load model: {str(e)}")
 
 
+def scale(scaler, X):
+    """
+    Scaled copy of the feature matrix. StandardScaler (what training fits)
+    is applied directly: scaler.transform validates and converts its input,
+    which costs more than the arithmetic on a single row.
+    """
+    from sklearn.preprocessing import StandardScaler
+    
+    if type(scaler) is StandardScaler:
+        X = X.copy()
+        if scaler.with_mean:
+            X -= scaler.mean_
+        if scaler.with_std:
+            X /= scaler.scale_
+        return X
+    return scaler.transform(X)
+
+
+def preload():
+    """
+    Load the served version before accepting requests, so the first
+    prediction does not pay for it; timings are reported by /health.
+    """
+    _boot["imports_seconds"] = round(_IMPORTS_DONE - _BOOT_START, 3)
+    start = time.perf_counter()
+    try:
+        load_model()
+        feature_store.refresh(force=True)
+    except Exception as e:
+        app.logger.warning(f"Nothing to preload yet: {e}")
+    _boot["preload_seconds"] = round(time.perf_counter() - start, 3)
+    # pandas is only needed when the prediction history is written: import it
+    # off the request path
+    threading.Thread(target=history.warm_up, daemon=True).start()
+
+
 @app.route("/health", methods=["GET"])
 def health():
     """Health check endpoint with current model version"""
     try:
-        model, scaler, version = load_model()
+        served = load_model()
         return jsonify({
             "status": "healthy",
-            "version": version,
-            "last_reload": _last_reload_time
+            "version": served["version"],
+            "last_reload": served["loaded_at"],
+            "boot": _boot
         })
     except Exception as e:
         return jsonify({
@@ -90,12 +366,12 @@ def reload():
     Useful after new model training completes
     """
     try:
-        model, scaler, version = load_model()
+        served = load_model(force=True)
         return jsonify({
             "status": "success",
-            "version": version,
+            "version": served["version"],
             "message": "Model reloaded successfully",
-            "reload_time": _last_reload_time
+            "reload_time": served["loaded_at"]
         })
     except Exception as e:
         return jsonify({
@@ -105,36 +381,79 @@ def reload():
 
 
 @app.route("/predict", methods=["POST"])
+@admission_controlled
 def predict():
     """
     Predict with automatic model reload
     Ensures always serving the latest model
+    
+    Send the ten features, or a customer_id whose features come from the
+    feature store (any feature also sent overrides the stored value).
     """
     try:
-        # Load/reload model before each prediction
-        model, scaler, version = load_model()
+        # Load/reload model before each prediction (one consistent version)
+        served = load_model()
+        model, version = served["model"], served["version"]
         
         # Parse input data
         data = request.get_json(force=True)
-        df = pd.DataFrame([data])
-        
-        # Ensure all features are present
-        for feature in FEATURE_NAMES:
-            if feature not in df.columns:
-                df[feature] = 0
+        user_id = data.pop("user_id", None)
+        customer_id = data.pop("customer_id", None)
+        snapshot = None
+        if customer_id is not None:
+            try:
+                customer_id = parse_customer_id(customer_id)
+            except ValueError as e:
+                return jsonify({"status": "error", "error": str(e)}), 400
+            stored, snapshot = feature_store.get(customer_id)
+            if stored is not None:
+                # A NaN stored value is a missing feature: imputed below
+                data = {**{name: value for name, value in stored.items() if value == value}, **data}
+            elif any(feature not in data for feature in FEATURE_NAMES):
+                return jsonify({
+                    "status": "error",
+                    "error": f"Unknown customer_id {customer_id}: send its features"
+                }), 404
+            else:
+                # Scored on the features sent, none come from the store
+                snapshot = None
+        
+        # Prepare features, imputing missing ones like the training pipeline
+        X = np.array(
+            [[data.get(feature, served["imputation"].get(feature, 0)) for feature in FEATURE_NAMES]],
+            dtype=served["dtype"]
+        )
+        X_scaled = scale(served["scaler"], X)
         
-        # Prepare features
-        X = df[FEATURE_NAMES]
-        X_scaled = scaler.transform(X)
+        # Raw request values: features the client left out count as missing
+        record_drift(data)
         
-        # Make prediction
-        prediction = model.predict(X_scaled)[0]
+        # Make prediction (one pass, the class is the most probable one for
+        # every registered backend)
         probability = model.predict_proba(X_scaled)[0]
+        prediction = model.classes_[probability.argmax()]
         
         # Determine risk level
         risk_level = "High" if probability[1] > 0.7 else "Medium" if probability[1] > 0.3 else "Low"
         
-        return jsonify({
+        # Remembered until its label arrives on /feedback (or it is evicted)
+        prediction_id = uuid.uuid4().hex
+        prediction_time = datetime.now().isoformat()
+        recent_predictions.add(
+            prediction_id, version, probability[1], prediction, prediction_time, user_id, customer_id
+        )
+        
+        record_prediction(
+            model_version=version,
+            churn_probability=probability[1],
+            prediction=prediction,
+            risk_level=risk_level,
+            features=dict(zip(FEATURE_NAMES, X[0].tolist())),
+            user_id=user_id
+        )
+        
+        response = {
+            "prediction_id": prediction_id,
             "prediction": int(prediction),
             "model_version": version,
             "probability": {
@@ -142,8 +461,12 @@ def predict():
                 "churn": float(probability[1])
             },
             "risk_level": risk_level,
-            "prediction_time": datetime.now().isoformat()
-        })
+            "prediction_time": prediction_time
+        }
+        if customer_id is not None:
+            response["customer_id"] = int(customer_id)
+            response["feature_snapshot"] = snapshot
+        return jsonify(response)
     
     except Exception as e:
         return jsonify({
@@ -156,15 +479,10 @@ def predict():
 def model_info():
     """Get current model metadata and lineage information"""
     try:
-        model, scaler, version = load_model()
-        
-        latest_info_path = os.environ.get(
-            "LATEST_INFO_PATH",
-            "/home/src/mlops_demo/model_registry/latest.json"
-        )
+        served = load_model()
+        version = served["version"]
         
-        with open(latest_info_path, "r") as f:
-            latest_info = json.load(f)
+        latest_info = resolve_current_version()
         
         # Try to load lineage if it exists
         version_path = latest_info.get("path", "")
@@ -178,8 +496,9 @@ def model_info():
         return jsonify({
             "version": version,
             "model_path": version_path,
+            "model_type": type(served["model"]).__name__,
             "lineage": lineage,
-            "last_reload": _last_reload_time
+            "last_reload": served["loaded_at"]
         })
     
     except Exception as e:
@@ -189,76 +508,164 @@ def model_info():
         }), 500
 
 
-if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
+@app.route("/drift", methods=["GET"])
+def drift():
+    """
+    Drift of served features against the training profile of the served version
+    e.g. /drift?windows=1 for the current window only (default: all kept windows)
+    """
+    try:
+        version = load_model()["version"]
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+    if _drift_monitor is None:
+        return jsonify({
+            "status": "error",
+            "message": f"No feature profile registered with {version}"
+        }), 404
+    return jsonify({
+        "status": "success",
+        "version": version,
+        **_drift_monitor.drift(windows=request.args.get("windows", type=int))
+    })
+
+
+@app.route("/admission", methods=["GET"])
+def admission_stats():
+    """In-flight and queued requests, shed and queue-time counters of /predict"""
+    return jsonify({"status": "success", **admission.stats()})
+
+
+@app.route("/feedback", methods=["POST"])
+def feedback():
+    """
+    Ground-truth labels of served predictions:
+    {"prediction_id": ..., "label": 0|1} (or "user_id" / "customer_id" for
+    the latest prediction of that user / customer), or {"feedback": [...]} for
+    several labels
+    """
+    data = request.get_json(force=True)
+    items = data.get("feedback", [data]) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return jsonify({"status": "error", "message": "Expected a feedback object or a list of them"}), 400
+    not_objects = [index for index, item in enumerate(items) if not isinstance(item, dict)]
+    if not_objects:
+        return jsonify({
+            "status": "error",
+            "message": f"Feedback items must be JSON objects (items {not_objects})"
+        }), 400
+    customer_ids = []
+    for item in items:
+        if item.get("label") not in (0, 1, True, False):
+            return jsonify({"status": "error", "message": f"Label must be 0 or 1: {item}"}), 400
+        if all(item.get(key) is None for key in ("prediction_id", "user_id", "customer_id")):
+            return jsonify({
+                "status": "error",
+                "message": f"prediction_id, user_id or customer_id required: {item}"
+            }), 400
+        try:
+            customer_ids.append(parse_customer_id(item["customer_id"]) if item.get("customer_id") is not None else None)
+        except ValueError as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+    
+    labelled, unmatched = [], []
+    for item, customer_id in zip(items, customer_ids):
+        served = recent_predictions.pop(item.get("prediction_id"), item.get("user_id"), customer_id)
+        if served is None:
+            unmatched.append(item.get("prediction_id") or item.get("user_id") or item.get("customer_id"))
+        else:
+            labelled.append((served, item["label"]))
+    if labelled:
+        quality.add(labelled)
+    return jsonify({
+        "status": "success",
+        "labelled": len(labelled),
+        "unmatched": unmatched
+    })
+
+
+@app.route("/quality", methods=["GET"])
+def model_quality():
+    """
+    Online accuracy, log-loss and AUC from labelled predictions, next to the
+    training metrics of each version
+    e.g. /quality?group_by=day&version=v_... (default: the served version)
+    """
+    group_by = request.args.get("group_by")
+    version = request.args.get("version")
+    if not version and group_by != "model_version":
+        version = resolve_current_version()["version"]
+    try:
+        groups = quality.summary(version, request.args.get("since"), request.args.get("until"), group_by)
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    versions = [group["key"] for group in groups] if group_by == "model_version" else [version]
+    return jsonify({
+        "status": "success",
+        "version": version,
+        "online": groups,
+        "training": {v: training_metrics(v) for v in versions},
+        "pending_predictions": len(recent_predictions)
+    })
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_logged_prediction(data):
+    """history.record() arguments of a /log-prediction payload; raises ValueError"""
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    prediction = data.get("prediction")
+    if prediction not in (0, 1):
+        raise ValueError(f"prediction must be 0 or 1, got {prediction!r}")
+    probability = data.get("probability")
+    if probability is None:
+        churn = np.nan
+    elif isinstance(probability, dict) and probability.get("churn") is None:
+        churn = np.nan
+    elif isinstance(probability, dict) and _is_number(probability["churn"]) and 0 <= probability["churn"] <= 1:
+        churn = probability["churn"]
+    else:
+        raise ValueError(f'probability must be {{"churn": <0..1>, ...}}, got {probability!r}')
+    features = data.get("input_features") or {}
+    if not isinstance(features, dict) or not all(_is_number(value) for value in features.values()):
+        raise ValueError("input_features must map feature names to numbers")
+    risk_level = data.get("risk_level") or "unknown"
+    if not isinstance(risk_level, str):
+        raise ValueError(f"risk_level must be a string, got {risk_level!r}")
+    user_id = data.get("user_id")
+    return {
+        "churn_probability": churn,
+        "prediction": int(prediction),
+        "risk_level": risk_level,
+        "features": {name: value for name, value in features.items() if name in FEATURE_NAMES},
+        "user_id": str(user_id) if user_id is not None else "unknown",
+    }
 
 
 @app.route("/log-prediction", methods=["POST"])
 def log_prediction():
     """
-    Log prediction back to model lineage for audit trail
-    Call this after making predictions to maintain lineage history
+    Log a prediction made elsewhere to the prediction history, under the
+    served model version (see /predictions/*)
     """
     try:
-        data = request.get_json(force=True)
-        
-        # Get current model version
-        latest_info_path = os.environ.get(
-            "LATEST_INFO_PATH",
-            "/home/src/mlops_demo/model_registry/latest.json"
-        )
-        
-        with open(latest_info_path, "r") as f:
-            latest_info = json.load(f)
-        
-        # Load lineage file
-        version_path = latest_info.get("path", "")
-        lineage_path = os.path.join(version_path, "lineage.json")
-        
-        if not os.path.exists(lineage_path):
-            return jsonify({
-                "status": "error",
-                "message": "Lineage file not found"
-            }), 404
-        
-        with open(lineage_path, "r") as f:
-            lineage = json.load(f)
-        
-        # Create prediction log entry
-        prediction_log = {
-            "timestamp": datetime.now().isoformat(),
-            "input_features": data.get("input_features", {}),
-            "prediction": data.get("prediction"),
-            "probability": data.get("probability"),
-            "risk_level": data.get("risk_level"),
-            "user_id": data.get("user_id", "unknown")
-        }
-        
-        # Update prediction count and history
-        if "predictions" not in lineage:
-            lineage["predictions"] = {
-                "count": 0,
-                "last_prediction_time": None,
-                "history": []
-            }
-        
-        lineage["predictions"]["count"] += 1
-        lineage["predictions"]["last_prediction_time"] = datetime.now().isoformat()
-        lineage["predictions"]["history"].append(prediction_log)
-        
-        # Keep only last 100 predictions to avoid file bloat
-        if len(lineage["predictions"]["history"]) > 100:
-            lineage["predictions"]["history"] = lineage["predictions"]["history"][-100:]
-        
-        # Save updated lineage
-        with open(lineage_path, "w") as f:
-            json.dump(lineage, f, indent=2)
+        record = parse_logged_prediction(request.get_json(force=True, silent=True))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    
+    try:
+        # The registry is mounted read-only: the history (its rollups) holds
+        # the prediction counts, lineage.json is left to the training pipeline
+        version = resolve_current_version()["version"]
+        history.record(model_version=version, source="log", **record)
         
         return jsonify({
             "status": "success",
             "message": "Prediction logged successfully",
-            "total_predictions": lineage["predictions"]["count"],
-            "model_version": latest_info["version"]
+            "model_version": version
         })
     
     except Exception as e:
@@ -272,13 +679,7 @@ def log_prediction():
 def get_lineage():
     """Get full lineage history for current model"""
     try:
-        latest_info_path = os.environ.get(
-            "LATEST_INFO_PATH",
-            "/home/src/mlops_demo/model_registry/latest.json"
-        )
-        
-        with open(latest_info_path, "r") as f:
-            latest_info = json.load(f)
+        latest_info = resolve_current_version()
         
         version_path = latest_info.get("path", "")
         lineage_path = os.path.join(version_path, "lineage.json")
@@ -303,3 +704,92 @@ def get_lineage():
             "status": "error",
             "message": str(e)
         }), 500
+
+
+def _query_args():
+    return {
+        "version": request.args.get("version"),
+        "since": request.args.get("since"),
+        "until": request.args.get("until")
+    }
+
+
+@app.route("/predictions/stats", methods=["GET"])
+def prediction_stats():
+    """
+    Aggregates over served predictions, from the rollups
+    e.g. /predictions/stats?version=v_...&since=2024-01-01&group_by=hour
+    """
+    try:
+        return jsonify({
+            "status": "success",
+            "groups": history.stats(
+                **_query_args(),
+                source=request.args.get("source"),
+                group_by=request.args.get("group_by")
+            ),
+            # Counts miss records until the next flush rebuilds the rollups
+            "rollups_stale": history.rollups_stale
+        })
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+
+
+@app.route("/predictions/histogram", methods=["GET"])
+def prediction_histogram():
+    """Distribution of served churn probabilities"""
+    return jsonify({
+        "status": "success",
+        **history.histogram(**_query_args(), source=request.args.get("source"))
+    })
+
+
+@app.route("/predictions/users", methods=["GET"])
+def prediction_users():
+    """Users with the most predictions"""
+    return jsonify({
+        "status": "success",
+        "users": history.top_users(request.args.get("version"), limit=request.args.get("limit", 20, type=int))
+    })
+
+
+@app.route("/predictions/records", methods=["GET"])
+def prediction_records():
+    """Raw records of one model version and day (reads a single partition)"""
+    version = request.args.get("version") or resolve_current_version()["version"]
+    date = request.args.get("date") or datetime.now().strftime("%Y-%m-%d")
+    try:
+        df = history.records(version, date, limit=request.args.get("limit", 100, type=int))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    return jsonify({
+        "status": "success",
+        "version": version,
+        "date": date,
+        "records": json.loads(df.to_json(orient="records", date_format="iso"))
+    })
+
+
+def serve_admin(port):
+    """
+    Same routes on a second listener, for /health and the metrics routes:
+    under a burst they do not wait in /predict's connection backlog
+    """
+    from werkzeug.serving import make_server
+    
+    server = make_server("0.0.0.0", port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def shutdown(signum, frame):
+    """SIGTERM (docker stop) skips atexit: write the buffered predictions first"""
+    history.flush()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    signal.signal(signal.SIGTERM, shutdown)
+    preload()
+    if os.environ.get("ADMIN_PORT"):
+        serve_admin(int(os.environ["ADMIN_PORT"]))
+    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)), threaded=True)
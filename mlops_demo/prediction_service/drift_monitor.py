@@ -0,0 +1,135 @@
+"""
+Streaming feature drift of served requests against the training data.
+
+The registry stores feature_profile.json with each version: per feature, the
+quantile bin cuts and training counts of each bin (built by
+mlops_demo/utils/feature_profile.py). observe() bins one scored row on the
+same cuts into preallocated counters (a bisect and a counter increment per
+feature, no per-request buffers). Counters are kept per time window in
+a ring of `windows` slots of `window_seconds`; drift() adds up the most recent
+windows and scores each feature against the training bins:
+- psi: population stability index, sum((served - train) * ln(served / train))
+- ks: largest gap between the served and training CDFs at the bin cuts
+A feature observed on fewer than `min_rows` rows is reported with status
+"insufficient_data" (a handful of requests fill a few bins: a large PSI
+that means nothing) and never counts as drifted.
+
+Kept next to app.py because the prediction service does not ship mlops_demo.
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+
+# Usual PSI reading: < 0.1 stable, 0.1-0.25 moderate shift, > 0.25 drift
+PSI_WARNING = 0.1
+PSI_DRIFT = 0.25
+# Share given to empty bins so PSI stays finite
+EPSILON = 1e-4
+DEFAULT_MIN_ROWS = 100
+
+
+class DriftMonitor:
+
+    def __init__(self, profile, feature_names=None, window_seconds=300, windows=12, min_rows=DEFAULT_MIN_ROWS):
+        features = profile["features"]
+        self.feature_names = list(feature_names or features)
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.min_rows = min_rows
+        self.cuts = [[float(cut) for cut in features[name]["cuts"]] for name in self.feature_names]
+        self.reference = []
+        for name in self.feature_names:
+            counts = features[name]["counts"]
+            total = sum(counts) or 1
+            self.reference.append([count / total for count in counts])
+
+        # Per window slot and feature: a counter per bin, then a missing-value counter.
+        # Each slot keeps (name, cuts, counters, missing index) tuples for observe().
+        self._slots = [
+            [(name, cuts, [0] * (len(cuts) + 2), len(cuts) + 1) for name, cuts in zip(self.feature_names, self.cuts)]
+            for _ in range(windows)
+        ]
+        self.rows = [0] * windows
+        self._slot_windows = [None] * windows
+        self._window = None
+        self._slot = 0
+        self._current = self._slots[0]
+        self._lock = threading.Lock()
+
+    def _rotate(self, window):
+        slot = window % self.windows
+        if self._slot_windows[slot] != window:
+            for _, _, counters, _ in self._slots[slot]:
+                counters[:] = [0] * len(counters)
+            self.rows[slot] = 0
+            self._slot_windows[slot] = window
+        self._window, self._slot, self._current = window, slot, self._slots[slot]
+
+    def observe(self, record, now=None):
+        """Count one request: {feature: value}, absent/None/NaN values count as missing"""
+        window = int((time.time() if now is None else now) // self.window_seconds)
+        with self._lock:
+            if window != self._window:
+                self._rotate(window)
+            for name, cuts, counters, missing in self._current:
+                value = record.get(name)
+                if value is None or value != value:
+                    counters[missing] += 1
+                else:
+                    counters[bisect_left(cuts, value)] += 1
+            self.rows[self._slot] += 1
+
+    def drift(self, windows=None, now=None):
+        """PSI and KS per feature over the last `windows` windows (default: all kept)"""
+        windows = min(windows or self.windows, self.windows)
+        current = int((time.time() if now is None else now) // self.window_seconds)
+        with self._lock:
+            slots = [
+                slot for slot, window in enumerate(self._slot_windows)
+                if window is not None and current - windows < window <= current
+            ]
+            totals = [[0] * (len(cuts) + 2) for cuts in self.cuts]
+            for slot in slots:
+                for total, (_, _, counters, _) in zip(totals, self._slots[slot]):
+                    for i, count in enumerate(counters):
+                        total[i] += count
+            rows = sum(self.rows[slot] for slot in slots)
+
+        features = {}
+        for name, total, reference in zip(self.feature_names, totals, self.reference):
+            observed, missing = total[:-1], total[-1]
+            n = sum(observed)
+            if n == 0:
+                features[name] = {"rows": 0, "missing": missing, "psi": None, "ks": None, "status": "no_data"}
+                continue
+            psi = ks = 0.0
+            served_cdf = train_cdf = 0.0
+            for count, expected in zip(observed, reference):
+                served_cdf += count / n
+                train_cdf += expected
+                ks = max(ks, abs(served_cdf - train_cdf))
+                actual, expected = max(count / n, EPSILON), max(expected, EPSILON)
+                psi += (actual - expected) * math.log(actual / expected)
+            if n < self.min_rows:
+                status = "insufficient_data"
+            else:
+                status = "drift" if psi > PSI_DRIFT else "warning" if psi > PSI_WARNING else "ok"
+            features[name] = {
+                "rows": n,
+                "missing": missing,
+                "psi": round(psi, 4),
+                "ks": round(ks, 4),
+                "status": status
+            }
+
+        scored = [f for f in features.values() if f["status"] not in ("no_data", "insufficient_data")]
+        return {
+            "window_seconds": self.window_seconds,
+            "windows": windows,
+            "min_rows": self.min_rows,
+            "rows": rows,
+            "max_psi": max((f["psi"] for f in scored), default=None),
+            "drifted_features": [name for name, f in features.items() if f["status"] == "drift"],
+            "features": features
+        }
@@ -0,0 +1,266 @@
+"""
+Memory-mapped store of the latest feature vector of every customer.
+
+The training pipeline materializes versioned snapshots (write_snapshot);
+/predict and batch scoring look customers up by customer_id (FeatureStore):
+
+    <root>/snapshots/<snapshot>/features.npy  float32 (slots, features)
+    <root>/snapshots/<snapshot>/present.npy   bool (slots,)
+    <root>/snapshots/<snapshot>/ids.npy       sorted customer ids (sparse layout only)
+    <root>/snapshots/<snapshot>/meta.json     feature names, layout, id range, rows
+    <root>/CURRENT                            name of the served snapshot
+
+Customer ids are dense in practice (make_dataset numbers them 1..n), so row
+`id - id_min` of the matrix is the customer: a lookup is one array index into
+pages the OS maps on demand, whatever the number of customers. Ids spread
+over more than SPARSE_FACTOR slots per customer are stored sorted and found by
+binary search instead.
+
+A refresh writes a complete new snapshot directory, then replaces CURRENT
+atomically (os.replace); readers notice the new CURRENT and swap their
+mappings in one assignment, in-flight lookups finish on the old snapshot
+(still mapped even once its files are removed).
+
+Kept next to app.py because the prediction service does not ship mlops_demo.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+STORE_FORMAT = 1
+CURRENT_FILE = "CURRENT"
+SNAPSHOTS_DIR = "snapshots"
+# Dense layout while the id range is at most this many times the row count
+SPARSE_FACTOR = 4
+DEFAULT_KEEP = 3
+
+
+def current_snapshot(root):
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _load_snapshot(root, snapshot):
+    path = os.path.join(root, SNAPSHOTS_DIR, snapshot)
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    def load(name):
+        # Plain ndarray views of the mappings: np.memmap item access is several times slower
+        return np.load(os.path.join(path, name), mmap_mode="r").view(np.ndarray)
+
+    features = load("features.npy")
+    ids = load("ids.npy") if meta["layout"] == "sparse" else None
+    return meta, features, load("present.npy"), ids
+
+
+def _full_snapshot(root, snapshot):
+    """(ids, features) of every customer of a snapshot, in memory"""
+    meta, features, present, ids = _load_snapshot(root, snapshot)
+    if ids is None:
+        slots = np.flatnonzero(present)
+        return slots + meta["id_min"], np.asarray(features[slots])
+    return np.asarray(ids), np.asarray(features)
+
+
+def write_snapshot(root, ids, features, feature_names, merge=True, keep=DEFAULT_KEEP, meta=None):
+    """
+    Materialize a snapshot of (customer id, feature vector) rows and make it
+    the current one. With merge=True customers absent from `ids` keep their
+    vector from the current snapshot; a customer listed several times keeps
+    its last row. Only the `keep` (at least 1) most recent snapshots stay on
+    disk. Returns the snapshot metadata.
+    """
+    if keep < 1:
+        raise ValueError(f"keep must be at least 1 (the current snapshot), got {keep}")
+    ids = np.asarray(ids, dtype=np.int64)
+    features = np.asarray(features, dtype=np.float32)
+    feature_names = list(feature_names)
+    if features.shape != (len(ids), len(feature_names)):
+        raise ValueError(f"Expected a ({len(ids)}, {len(feature_names)}) feature matrix, got {features.shape}")
+
+    previous = current_snapshot(root)
+    if merge and previous:
+        with open(os.path.join(root, SNAPSHOTS_DIR, previous, "meta.json")) as f:
+            previous_names = json.load(f)["feature_names"]
+        if previous_names == feature_names:
+            old_ids, old_features = _full_snapshot(root, previous)
+            ids = np.concatenate([old_ids, ids])
+            features = np.concatenate([old_features, features])
+
+    # Last occurrence of each id wins: unique on the reversed order
+    reversed_ids = ids[::-1]
+    unique_ids, positions = np.unique(reversed_ids, return_index=True)
+    features = features[::-1][positions]
+    rows = len(unique_ids)
+    id_min = int(unique_ids[0]) if rows else 0
+    span = int(unique_ids[-1]) - id_min + 1 if rows else 0
+    layout = "dense" if span <= max(SPARSE_FACTOR * rows, 1) else "sparse"
+
+    snapshot = datetime.now().strftime("s_%Y%m%d_%H%M%S_%f")
+    snapshots_path = os.path.join(root, SNAPSHOTS_DIR)
+    os.makedirs(snapshots_path, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=f".{snapshot}_", dir=snapshots_path)
+    try:
+        if layout == "dense":
+            matrix = np.lib.format.open_memmap(
+                os.path.join(staging, "features.npy"), mode="w+", dtype=np.float32, shape=(span, len(feature_names))
+            )
+            present = np.zeros(span, dtype=bool)
+            slots = unique_ids - id_min
+            matrix[slots] = features
+            present[slots] = True
+            matrix.flush()
+            del matrix
+        else:
+            np.save(os.path.join(staging, "features.npy"), features)
+            np.save(os.path.join(staging, "ids.npy"), unique_ids)
+            present = np.ones(rows, dtype=bool)
+        np.save(os.path.join(staging, "present.npy"), present)
+        snapshot_meta = {
+            "format": STORE_FORMAT,
+            "snapshot": snapshot,
+            "created_at": datetime.now().isoformat(),
+            "feature_names": feature_names,
+            "layout": layout,
+            "rows": rows,
+            "id_min": id_min,
+            "slots": span if layout == "dense" else rows,
+            **(meta or {})
+        }
+        with open(os.path.join(staging, "meta.json"), "w") as f:
+            json.dump(snapshot_meta, f, indent=2)
+        os.replace(staging, os.path.join(snapshots_path, snapshot))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # The swap readers observe: CURRENT names a complete snapshot, before and after
+    fd, pointer = tempfile.mkstemp(prefix=".current_", dir=root)
+    with os.fdopen(fd, "w") as f:
+        f.write(snapshot)
+    os.replace(pointer, os.path.join(root, CURRENT_FILE))
+
+    for name in sorted(n for n in os.listdir(snapshots_path) if n.startswith("s_"))[:-keep]:
+        shutil.rmtree(os.path.join(snapshots_path, name), ignore_errors=True)
+    return snapshot_meta
+
+
+class FeatureStore:
+    """
+    Reader of the current snapshot, picking up new snapshots on refresh().
+    A `snapshot` name pins the reader to that snapshot (e.g. for a batch run).
+    """
+
+    def __init__(self, root, check_interval=1.0, snapshot=None):
+        self.root = root
+        self.check_interval = check_interval
+        self.pinned = snapshot
+        # (meta, features, present, ids) swapped as a whole
+        self._snapshot = None
+        self._name = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    @property
+    def meta(self):
+        snapshot = self._snapshot
+        return snapshot[0] if snapshot else None
+
+    @property
+    def feature_names(self):
+        snapshot = self._snapshot
+        return snapshot[0]["feature_names"] if snapshot else []
+
+    def refresh(self, force=False):
+        """Open the current snapshot if it changed (at most every check_interval); True when swapped"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.check_interval:
+            return False
+        with self._lock:
+            self._checked_at = now
+            name = self.pinned or current_snapshot(self.root)
+            if name is None or name == self._name:
+                return False
+            self._snapshot = _load_snapshot(self.root, name)
+            self._name = name
+            return True
+
+    def _slots(self, snapshot, customer_ids):
+        meta, _, present, ids = snapshot
+        customer_ids = np.asarray(customer_ids, dtype=np.int64)
+        if ids is None:
+            slots = customer_ids - meta["id_min"]
+            inside = (slots >= 0) & (slots < len(present))
+        else:
+            slots = np.searchsorted(ids, customer_ids)
+            inside = slots < len(ids)
+            inside[inside] = ids[slots[inside]] == customer_ids[inside]
+        found = inside.copy()
+        found[inside] = present[slots[inside]]
+        return np.where(found, slots, 0), found
+
+    def get(self, customer_id):
+        """
+        ({feature: value} of one customer, or None when unknown; name of the
+        snapshot it was looked up in, None without a snapshot)
+        """
+        self.refresh()
+        snapshot = self._snapshot
+        if snapshot is None:
+            return None, None
+        meta, features, present, ids = snapshot
+        customer_id = int(customer_id)
+        if ids is None:
+            slot = customer_id - meta["id_min"]
+            if slot < 0 or slot >= len(present) or not present[slot]:
+                return None, meta["snapshot"]
+        else:
+            slot = int(np.searchsorted(ids, customer_id))
+            if slot >= len(ids) or ids[slot] != customer_id:
+                return None, meta["snapshot"]
+        return dict(zip(meta["feature_names"], features[slot].tolist())), meta["snapshot"]
+
+    def get_many(self, customer_ids):
+        """(float32 matrix in feature_names order, found mask); unknown rows are NaN"""
+        self.refresh()
+        snapshot = self._snapshot
+        customer_ids = np.asarray(customer_ids, dtype=np.int64)
+        if snapshot is None:
+            return np.full((len(customer_ids), 0), np.nan, dtype=np.float32), np.zeros(len(customer_ids), dtype=bool)
+        slots, found = self._slots(snapshot, customer_ids)
+        matrix = np.asarray(snapshot[1][slots], dtype=np.float32)
+        matrix[~found] = np.nan
+        return matrix, found
+
+    def fill(self, df, id_column="customer_id"):
+        """
+        Copy of df with the stored features of each row's customer wherever a
+        feature column is missing or NaN (values present in df override the
+        store). Returns (DataFrame, found mask).
+        """
+        import pandas as pd
+
+        if id_column not in df.columns:
+            return df, np.zeros(len(df), dtype=bool)
+        # Rows without an id are never found (-1 is not a customer)
+        matrix, found = self.get_many(df[id_column].fillna(-1).astype(np.int64).to_numpy())
+        names = self.feature_names
+        sent = [i for i, name in enumerate(names) if name in df.columns]
+        absent = [i for i, name in enumerate(names) if name not in df.columns]
+        df = df.copy()
+        for i in sent:
+            df[names[i]] = df[names[i]].where(df[names[i]].notna(), matrix[:, i])
+        if absent:
+            # One block for the columns the input does not have (the bare-id case)
+            stored = pd.DataFrame(matrix[:, absent], columns=[names[i] for i in absent], index=df.index)
+            df = pd.concat([df, stored], axis=1)
+        return df, found
@@ -0,0 +1,237 @@
+"""
+Online model quality from delayed ground-truth labels.
+
+/predict returns a prediction_id and remembers the prediction in a bounded
+in-memory index (PredictionIndex: the `max_size` most recent predictions no
+older than `max_age_seconds`, also reachable through the latest prediction of
+each user_id and of each customer_id). POST /feedback looks the served prediction up and adds the label
+to per (model version, hour of the prediction) accumulators in SQLite:
+- count, correct predictions and summed log-loss
+- positives and negatives per churn-probability bin, from which the AUC is
+  computed (pairs inside a bin count as ties: exact up to 1 / QUALITY_BINS)
+Every accumulator is a sum, so any range of hours or versions is answered from
+the rollup rows, never by rescanning predictions.
+
+Kept next to app.py because the prediction service does not ship mlops_demo.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+QUALITY_BINS = 100
+# Log-loss of a confident wrong prediction stays finite
+PROBABILITY_CLIP = 1e-15
+GROUP_BY = {
+    "hour": "hour",
+    "day": "substr(hour, 1, 10)",
+    "model_version": "model_version",
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS quality (
+    model_version TEXT NOT NULL,
+    hour TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    positives INTEGER NOT NULL,
+    log_loss_sum REAL NOT NULL,
+    PRIMARY KEY (model_version, hour)
+);
+CREATE INDEX IF NOT EXISTS idx_quality_hour ON quality (hour);
+CREATE TABLE IF NOT EXISTS score_bins (
+    model_version TEXT NOT NULL,
+    hour TEXT NOT NULL,
+    bin INTEGER NOT NULL CHECK (bin >= 0 AND bin < {QUALITY_BINS}),
+    positives INTEGER NOT NULL,
+    negatives INTEGER NOT NULL,
+    PRIMARY KEY (model_version, hour, bin)
+);
+"""
+
+
+class PredictionIndex:
+    """Bounded, insertion-ordered index of recently served predictions"""
+
+    def __init__(self, max_size=100_000, max_age_seconds=7 * 86400):
+        self.max_size = max_size
+        self.max_age_seconds = max_age_seconds
+        # prediction_id -> (monotonic time, model_version, churn_probability, prediction, timestamp, user_id,
+        #                   customer_id)
+        self._predictions = OrderedDict()
+        # ("user_id" | "customer_id", id) -> latest prediction_id
+        self._latest = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._predictions)
+
+    @staticmethod
+    def _keys(user_id, customer_id):
+        return [(name, value) for name, value in (("user_id", user_id), ("customer_id", customer_id))
+                if value is not None]
+
+    def add(self, prediction_id, model_version, churn_probability, prediction, timestamp, user_id=None,
+            customer_id=None):
+        entry = (time.monotonic(), model_version, float(churn_probability), int(prediction), timestamp, user_id,
+                 customer_id)
+        with self._lock:
+            self._predictions[prediction_id] = entry
+            for key in self._keys(user_id, customer_id):
+                self._latest[key] = prediction_id
+            while len(self._predictions) > self.max_size:
+                self._evict()
+
+    def _unlink(self, prediction_id, entry):
+        for key in self._keys(entry[5], entry[6]):
+            if self._latest.get(key) == prediction_id:
+                del self._latest[key]
+
+    def _evict(self):
+        self._unlink(*self._predictions.popitem(last=False))
+
+    def pop(self, prediction_id=None, user_id=None, customer_id=None):
+        """
+        Served prediction for a label: by prediction_id, else the latest one of
+        user_id, else the latest one of customer_id. Labelled predictions leave
+        the index (one label each). Returns a dict, or None when unknown or
+        evicted.
+        """
+        with self._lock:
+            oldest = time.monotonic() - self.max_age_seconds
+            while self._predictions and next(iter(self._predictions.values()))[0] < oldest:
+                self._evict()
+            if prediction_id is None:
+                keys = self._keys(user_id, customer_id)
+                prediction_id = self._latest.get(keys[0]) if keys else None
+            entry = self._predictions.pop(prediction_id, None) if prediction_id is not None else None
+            if entry is None:
+                return None
+            self._unlink(prediction_id, entry)
+        _, model_version, churn_probability, prediction, timestamp, user_id, customer_id = entry
+        return {
+            "prediction_id": prediction_id,
+            "model_version": model_version,
+            "churn_probability": churn_probability,
+            "prediction": prediction,
+            "timestamp": timestamp,
+            "user_id": user_id,
+            "customer_id": customer_id
+        }
+
+
+def auc_from_bins(positives, negatives):
+    """Probability that a churner scores above a non-churner (ties count half)"""
+    total_positives, total_negatives = sum(positives), sum(negatives)
+    if not total_positives or not total_negatives:
+        return None
+    below = 0
+    pairs = 0.0
+    for n_positive, n_negative in zip(positives, negatives):
+        pairs += n_positive * (below + n_negative / 2)
+        below += n_negative
+    return pairs / (total_positives * total_negatives)
+
+
+class ModelQuality:
+
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(root, "quality.db")
+        self._schema_ready = False
+
+    def connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, labelled):
+        """Add (served prediction dict from PredictionIndex.pop, label) pairs to the rollups"""
+        quality, bins = {}, {}
+        for served, label in labelled:
+            label = int(label)
+            if label not in (0, 1):
+                raise ValueError(f"Label must be 0 or 1, got {label}")
+            probability = min(max(served["churn_probability"], PROBABILITY_CLIP), 1 - PROBABILITY_CLIP)
+            key = (served["model_version"], served["timestamp"][:13])
+            n, correct, positives, log_loss_sum = quality.get(key, (0, 0, 0, 0.0))
+            quality[key] = (
+                n + 1,
+                correct + (served["prediction"] == label),
+                positives + label,
+                log_loss_sum - math.log(probability if label else 1 - probability)
+            )
+            bin_key = key + (min(int(served["churn_probability"] * QUALITY_BINS), QUALITY_BINS - 1),)
+            n_positive, n_negative = bins.get(bin_key, (0, 0))
+            bins[bin_key] = (n_positive + label, n_negative + 1 - label)
+
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO quality VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT DO UPDATE SET "
+                    "n = n + excluded.n, correct = correct + excluded.correct, "
+                    "positives = positives + excluded.positives, log_loss_sum = log_loss_sum + excluded.log_loss_sum",
+                    [key + values for key, values in quality.items()]
+                )
+                conn.executemany(
+                    "INSERT INTO score_bins VALUES (?, ?, ?, ?, ?) ON CONFLICT DO UPDATE SET "
+                    "positives = positives + excluded.positives, negatives = negatives + excluded.negatives",
+                    [key + values for key, values in bins.items()]
+                )
+        finally:
+            conn.close()
+        return len(labelled)
+
+    def summary(self, version=None, since=None, until=None, group_by=None):
+        """Accuracy, log-loss and AUC of labelled predictions, optionally grouped"""
+        if group_by is not None and group_by not in GROUP_BY:
+            raise ValueError(f"Cannot group by '{group_by}', expected one of {sorted(GROUP_BY)}")
+        key = GROUP_BY[group_by] if group_by else "'all'"
+        clauses, params = [], []
+        # Hour keys are 'YYYY-MM-DDTHH', comparable to any ISO prefix
+        for sql, value in (("model_version = ?", version), ("hour >= ?", since and since[:13]),
+                           ("hour < ?", until and until[:13])):
+            if value:
+                clauses.append(sql)
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+
+        conn = self.connect()
+        try:
+            totals = conn.execute(
+                f"SELECT {key} AS key, sum(n) AS n, sum(correct) AS correct, sum(positives) AS positives, "
+                f"sum(log_loss_sum) AS log_loss_sum FROM quality{where} GROUP BY key ORDER BY key", params
+            ).fetchall()
+            bins = conn.execute(
+                f"SELECT {key} AS key, bin, sum(positives) AS positives, sum(negatives) AS negatives "
+                f"FROM score_bins{where} GROUP BY key, bin", params
+            ).fetchall()
+        finally:
+            conn.close()
+
+        histograms = {}
+        for row in bins:
+            positives, negatives = histograms.setdefault(row["key"], ([0] * QUALITY_BINS, [0] * QUALITY_BINS))
+            positives[row["bin"]] = row["positives"]
+            negatives[row["bin"]] = row["negatives"]
+        groups = []
+        for row in totals:
+            positives, negatives = histograms.get(row["key"], ([], []))
+            groups.append({
+                "key": row["key"],
+                "labelled": row["n"],
+                "churn_rate": row["positives"] / row["n"],
+                "accuracy": row["correct"] / row["n"],
+                "log_loss": row["log_loss_sum"] / row["n"],
+                "auc_score": auc_from_bins(positives, negatives)
+            })
+        return groups
+
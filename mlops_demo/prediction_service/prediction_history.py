@@ -0,0 +1,447 @@
+"""
+Columnar store of served predictions with incrementally maintained rollups.
+
+Raw records are appended as Parquet files partitioned by model version and day:
+
+    <root>/data/model_version=v_.../date=YYYY-MM-DD/part-<ns>-<pid>.parquet
+
+Predictions are buffered in memory and written every `flush_rows` records or
+`flush_seconds` (checked on each record, and by a background thread once
+start_flusher() is called, so a quiet service still writes its last ones).
+A batch whose Parquet write fails goes back to the buffer for the next flush;
+once written, a batch whose rollup update fails leaves a ROLLUPS_STALE marker
+and the next flush rebuilds the rollups from Parquet. Each flush also adds the batch to SQLite rollups (per hour:
+counts per risk level, predicted churns, probability sum, probability
+histogram; per model version: counts per user), so aggregate queries read a few
+thousand rollup rows whatever the number of predictions.
+
+pandas is only imported when a batch is written or records are read, so
+importing this module stays off the service's cold-start path.
+
+Kept next to app.py because the prediction service does not ship mlops_demo.
+
+    python prediction_history.py compact   # merge the part files of past days
+    python prediction_history.py rebuild   # recompute rollups from Parquet
+"""
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+HISTOGRAM_BINS = 20
+# Present while the rollups miss written records (a rollup update failed)
+STALE_MARKER = "ROLLUPS_STALE"
+# Registry version names (v_YYYYMMDD_HHMMSS): the only partition names records() reads
+VERSION_PATTERN = re.compile(r"v_\w+")
+RECORD_COLUMNS = ("ts", "model_version", "user_id", "source", "prediction", "churn_probability", "risk_level")
+GROUP_BY = {
+    "hour": "hour",
+    "day": "substr(hour, 1, 10)",
+    "model_version": "model_version",
+    "risk_level": "risk_level",
+    "source": "source",
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS hourly (
+    model_version TEXT NOT NULL,
+    hour TEXT NOT NULL,
+    source TEXT NOT NULL,
+    risk_level TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    churn_predicted INTEGER NOT NULL,
+    probability_n INTEGER NOT NULL,
+    probability_sum REAL NOT NULL,
+    PRIMARY KEY (model_version, hour, source, risk_level)
+);
+CREATE INDEX IF NOT EXISTS idx_hourly_hour ON hourly (hour);
+CREATE TABLE IF NOT EXISTS histogram (
+    model_version TEXT NOT NULL,
+    hour TEXT NOT NULL,
+    source TEXT NOT NULL,
+    bin INTEGER NOT NULL CHECK (bin >= 0 AND bin < {HISTOGRAM_BINS}),
+    n INTEGER NOT NULL,
+    PRIMARY KEY (model_version, hour, source, bin)
+);
+CREATE INDEX IF NOT EXISTS idx_histogram_hour ON histogram (hour);
+CREATE TABLE IF NOT EXISTS users (
+    model_version TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    n INTEGER NOT NULL,
+    last_prediction TEXT NOT NULL,
+    PRIMARY KEY (model_version, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_users_n ON users (model_version, n);
+"""
+
+
+class PredictionHistory:
+
+    def __init__(self, root, feature_names=(), flush_rows=1000, flush_seconds=5.0):
+        self.root = root
+        # Every part file gets the same columns, whatever a record carries
+        self.columns = list(RECORD_COLUMNS) + list(feature_names)
+        self.data_path = os.path.join(root, "data")
+        self.rollups_path = os.path.join(root, "rollups.db")
+        self.stale_marker_path = os.path.join(root, STALE_MARKER)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        # One batch written (Parquet, then rollups) at a time
+        self._write_lock = threading.Lock()
+        self._schema_ready = False
+
+    def connect(self):
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(self.rollups_path, timeout=30)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ------------------------------------------------------------------ write
+
+    def record(self, model_version, churn_probability, prediction, risk_level,
+               features=None, user_id=None, source="predict", timestamp=None):
+        """Buffer one served prediction (flushed in batches)"""
+        row = {
+            "ts": timestamp or datetime.now(),
+            "model_version": model_version,
+            "user_id": user_id if user_id is not None else "unknown",
+            "source": source,
+            "prediction": int(prediction),
+            "churn_probability": float(churn_probability),
+            "risk_level": risk_level,
+            **{name: float(value) for name, value in (features or {}).items()},
+        }
+        with self._lock:
+            self._buffer.append(row)
+            due = (len(self._buffer) >= self.flush_rows
+                   or time.monotonic() - self._last_flush >= self.flush_seconds)
+        if due:
+            self.flush()
+
+    def start_flusher(self):
+        """Flush the buffer once it is `flush_seconds` old, from a daemon thread"""
+        def run():
+            while True:
+                time.sleep(self.flush_seconds)
+                with self._lock:
+                    due = self._buffer and time.monotonic() - self._last_flush >= self.flush_seconds
+                if due:
+                    try:
+                        self.flush()
+                    except Exception as e:
+                        print(f"Prediction history flush failed: {e}", file=sys.stderr)
+
+        threading.Thread(target=run, name="history-flusher", daemon=True).start()
+
+    def record_frame(self, df):
+        """Append already-built records (same columns as record()) in one flush"""
+        self.flush()
+        self._write(df)
+
+    def warm_up(self):
+        """Import what a flush needs ahead of the first one (from a background thread)"""
+        import pandas
+        import pyarrow.parquet
+
+    @property
+    def rollups_stale(self):
+        """True while the rollups miss records already written to Parquet"""
+        return os.path.exists(self.stale_marker_path)
+
+    def flush(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+        if rows:
+            import pandas as pd
+
+            try:
+                self._write(pd.DataFrame(rows))
+            except Exception:
+                # Nothing was written: keep the rows, ahead of newer ones, for the next flush
+                with self._lock:
+                    self._buffer = rows + self._buffer
+                raise
+        return len(rows)
+
+    def _write(self, df):
+        """Write a batch to Parquet (all partitions or none), then add it to the rollups"""
+        import pandas as pd
+
+        df = df.reindex(columns=self.columns)
+        df["ts"] = pd.to_datetime(df["ts"])
+        df["user_id"] = df["user_id"].fillna("unknown").astype(str)
+        df["prediction"] = df["prediction"].astype("int8")
+        df["churn_probability"] = df["churn_probability"].astype("float32")
+        feature_columns = self.columns[len(RECORD_COLUMNS):]
+        df[feature_columns] = df[feature_columns].astype("float32")
+
+        day = df["ts"].dt.strftime("%Y-%m-%d")
+        with self._write_lock:
+            staged = []
+            try:
+                for (version, date), part in df.groupby([df["model_version"], day], sort=False):
+                    staged.append(self._stage_partition(part.drop(columns=["model_version"]), version, date))
+            except Exception:
+                for tmp_path, _ in staged:
+                    os.remove(tmp_path)
+                raise
+            for tmp_path, path in staged:
+                os.replace(tmp_path, path)
+
+            # The records are written: from here on a failure only affects the rollups
+            try:
+                if self.rollups_stale:
+                    self.rebuild_rollups()
+                else:
+                    self._update_rollups(df)
+            except Exception as e:
+                open(self.stale_marker_path, "a").close()
+                print(f"Prediction history rollups are stale, rebuilt on the next flush: {e}", file=sys.stderr)
+
+    def _stage_partition(self, df, version, date):
+        """Write a partition file under a hidden name; returns (staged path, final path)"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        directory = os.path.join(self.data_path, f"model_version={version}", f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{time.time_ns()}-{os.getpid()}-{threading.get_ident()}.parquet"
+        # Dot-prefixed files are skipped by Parquet dataset readers until renamed
+        tmp_path = os.path.join(directory, f".{name}")
+        table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+        try:
+            pq.write_table(table, tmp_path, compression="zstd")
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path, os.path.join(directory, name)
+
+    def _update_rollups(self, df):
+        import pandas as pd
+
+        hour = df["ts"].dt.strftime("%Y-%m-%dT%H")
+        keys = [df["model_version"], hour.rename("hour"), df["source"], df["risk_level"]]
+        hourly = df.assign(churn=df["prediction"] == 1).groupby(keys).agg(
+            n=("prediction", "size"),
+            churn_predicted=("churn", "sum"),
+            probability_n=("churn_probability", "count"),
+            probability_sum=("churn_probability", "sum"),
+        ).reset_index()
+
+        # Logged predictions may come without a probability
+        known = df["churn_probability"].notna()
+        bins = np.clip((df.loc[known, "churn_probability"].to_numpy() * HISTOGRAM_BINS).astype(int),
+                       0, HISTOGRAM_BINS - 1)
+        histogram = df[known].groupby(
+            [key[known] for key in keys[:3]] + [pd.Series(bins, index=df.index[known], name="bin")]
+        ).size()
+        histogram = histogram.rename("n").reset_index()
+
+        users = df.groupby([df["model_version"], df["user_id"]]).agg(
+            n=("prediction", "size"), last_prediction=("ts", "max")
+        ).reset_index()
+        users["last_prediction"] = users["last_prediction"].dt.strftime("%Y-%m-%dT%H:%M:%S.%f")
+
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO hourly VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT DO UPDATE SET n = n + excluded.n, "
+                    "churn_predicted = churn_predicted + excluded.churn_predicted, "
+                    "probability_n = probability_n + excluded.probability_n, "
+                    "probability_sum = probability_sum + excluded.probability_sum",
+                    hourly[["model_version", "hour", "source", "risk_level", "n", "churn_predicted",
+                            "probability_n", "probability_sum"]].itertuples(index=False, name=None),
+                )
+                conn.executemany(
+                    "INSERT INTO histogram VALUES (?, ?, ?, ?, ?) ON CONFLICT DO UPDATE SET n = n + excluded.n",
+                    histogram[["model_version", "hour", "source", "bin", "n"]].itertuples(index=False, name=None),
+                )
+                conn.executemany(
+                    "INSERT INTO users VALUES (?, ?, ?, ?) ON CONFLICT DO UPDATE SET n = n + excluded.n, "
+                    "last_prediction = max(last_prediction, excluded.last_prediction)",
+                    users[["model_version", "user_id", "n", "last_prediction"]].itertuples(index=False, name=None),
+                )
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------ query
+
+    @staticmethod
+    def _where(column, version=None, since=None, until=None, source=None):
+        clauses, params = [], []
+        # Hour keys are 'YYYY-MM-DDTHH', comparable to any ISO prefix
+        for sql, value in (("model_version = ?", version), (f"{column} >= ?", since and since[:13]),
+                           (f"{column} < ?", until and until[:13]), ("source = ?", source)):
+            if value:
+                clauses.append(sql)
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def stats(self, version=None, since=None, until=None, source=None, group_by=None):
+        """Counts, predicted churn rate, mean probability and risk mix, optionally grouped"""
+        if group_by is not None and group_by not in GROUP_BY:
+            raise ValueError(f"Cannot group by '{group_by}', expected one of {sorted(GROUP_BY)}")
+        key = GROUP_BY[group_by] if group_by else "'all'"
+        where, params = self._where("hour", version, since, until, source)
+        sql = (
+            f"SELECT {key} AS key, risk_level, sum(n) AS n, sum(churn_predicted) AS churn_predicted, "
+            f"sum(probability_n) AS probability_n, sum(probability_sum) AS probability_sum FROM hourly{where} GROUP BY key, risk_level ORDER BY key"
+        )
+        self.flush()
+        conn = self.connect()
+        try:
+            rows = conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+        groups = {}
+        for row in rows:
+            group = groups.setdefault(row["key"], {"key": row["key"], "count": 0, "churn_predicted": 0,
+                                                   "probability_n": 0, "probability_sum": 0.0,
+                                                   "risk_levels": {}})
+            group["count"] += row["n"]
+            group["churn_predicted"] += row["churn_predicted"]
+            group["probability_n"] += row["probability_n"]
+            group["probability_sum"] += row["probability_sum"]
+            group["risk_levels"][row["risk_level"]] = row["n"]
+        for group in groups.values():
+            probability_n, probability_sum = group.pop("probability_n"), group.pop("probability_sum")
+            group["churn_rate"] = group["churn_predicted"] / group["count"]
+            group["mean_churn_probability"] = probability_sum / probability_n if probability_n else None
+        return list(groups.values())
+
+    def histogram(self, version=None, since=None, until=None, source=None):
+        """Distribution of served churn probabilities"""
+        where, params = self._where("hour", version, since, until, source)
+        self.flush()
+        conn = self.connect()
+        try:
+            rows = conn.execute(f"SELECT bin, sum(n) AS n FROM histogram{where} GROUP BY bin", params).fetchall()
+        finally:
+            conn.close()
+        counts = [0] * HISTOGRAM_BINS
+        for row in rows:
+            counts[row["bin"]] = row["n"]
+        edges = np.linspace(0, 1, HISTOGRAM_BINS + 1).round(4).tolist()
+        return {"bin_edges": edges, "counts": counts, "count": sum(counts)}
+
+    def top_users(self, version=None, limit=20):
+        """Users with the most predictions since the history started (per version: index scan)"""
+        self.flush()
+        conn = self.connect()
+        try:
+            if version:
+                rows = conn.execute(
+                    "SELECT user_id, n, last_prediction FROM users WHERE model_version = ? "
+                    "ORDER BY n DESC LIMIT ?", (version, int(limit))
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT user_id, sum(n) AS n, max(last_prediction) AS last_prediction FROM users "
+                    "GROUP BY user_id ORDER BY n DESC LIMIT ?", (int(limit),)
+                ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def records(self, version, date, limit=100):
+        """Most recent raw records of one partition (model version, day); raises ValueError"""
+        import pandas as pd
+
+        # Both name a directory: nothing else may reach the path
+        if not VERSION_PATTERN.fullmatch(version):
+            raise ValueError(f"Invalid model version '{version}'")
+        try:
+            valid_date = datetime.strptime(date, "%Y-%m-%d").strftime("%Y-%m-%d") == date
+        except ValueError:
+            valid_date = False
+        if not valid_date:
+            raise ValueError(f"Invalid date '{date}', expected YYYY-MM-DD")
+        self.flush()
+        directory = os.path.join(self.data_path, f"model_version={version}", f"date={date}")
+        if not os.path.isdir(directory):
+            return pd.DataFrame()
+        df = pd.read_parquet(directory)
+        return df.sort_values("ts", ascending=False).head(limit)
+
+    # ------------------------------------------------------------ maintenance
+
+    def partitions(self):
+        if not os.path.isdir(self.data_path):
+            return
+        for version_dir in sorted(os.listdir(self.data_path)):
+            for date_dir in sorted(os.listdir(os.path.join(self.data_path, version_dir))):
+                yield version_dir.split("=", 1)[1], date_dir.split("=", 1)[1], \
+                    os.path.join(self.data_path, version_dir, date_dir)
+
+    def compact(self):
+        """Merge the part files of every past day into one file per partition"""
+        import pyarrow.parquet as pq
+
+        today = datetime.now().strftime("%Y-%m-%d")
+        compacted = 0
+        for version, date, directory in self.partitions():
+            parts = sorted(f for f in os.listdir(directory) if f.startswith("part-"))
+            if date >= today or len(parts) < 2:
+                continue
+            table = pq.read_table([os.path.join(directory, f) for f in parts])
+            name = f"part-{time.time_ns()}-{os.getpid()}-compacted.parquet"
+            pq.write_table(table, os.path.join(directory, f".{name}"), compression="zstd")
+            os.replace(os.path.join(directory, f".{name}"), os.path.join(directory, name))
+            for f in parts:
+                os.remove(os.path.join(directory, f))
+            compacted += 1
+        return compacted
+
+    def rebuild_rollups(self):
+        """Recompute every rollup from the Parquet files (e.g. after a crash mid-flush)"""
+        import pandas as pd
+
+        conn = self.connect()
+        try:
+            with conn:
+                for table in ("hourly", "histogram", "users"):
+                    conn.execute(f"DELETE FROM {table}")
+        finally:
+            conn.close()
+        rows = 0
+        for version, date, directory in self.partitions():
+            df = pd.read_parquet(directory)
+            df["model_version"] = version
+            self._update_rollups(df)
+            rows += len(df)
+        if self.rollups_stale:
+            os.remove(self.stale_marker_path)
+        return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the served prediction history")
+    parser.add_argument("command", choices=("compact", "rebuild"))
+    parser.add_argument("--root", default=os.environ.get(
+        "PREDICTION_HISTORY_PATH", "/home/src/mlops_demo/prediction_history"))
+    args = parser.parse_args()
+
+    history = PredictionHistory(args.root)
+    if args.command == "compact":
+        print(f"Compacted {history.compact()} partitions")
+    else:
+        print(f"Rebuilt rollups from {history.rebuild_rollups()} records")
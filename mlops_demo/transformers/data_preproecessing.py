@@ -5,6 +5,30 @@ from pandas import DataFrame
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.model_selection import train_test_split
 
+from mlops_demo.utils.block_cache import (
+    BlockCache, cache_status, dataframe_fingerprint, make_cache_key, source_fingerprint
+)
+from mlops_demo.utils.features import (
+    COLUMN_DTYPES, ID_COLUMN, MODEL_DTYPE, TARGET_COLUMN, dtype_policy
+)
+from mlops_demo.utils.feature_profile import build_profile, save_profile
+from mlops_demo.utils.incremental_training import load_registered_model
+from mlops_demo.utils.paths import (
+    FEATURE_PROFILE_PATH, IMPUTATION_PATH, MODELS_PATH, PREPROCESSED_PATH, SCALER_PATH
+)
+from mlops_demo.utils.profiling import profiled
+from mlops_demo.utils.streaming_preprocessing import (
+    DEFAULT_CHUNK_SIZE, preprocess_streaming, save_imputation_values,
+    source_fingerprint as file_source_fingerprint
+)
+from mlops_demo.utils.variables import as_bool
+
+CACHED_FILES = {
+    'scaler.pkl': SCALER_PATH,
+    'imputation.json': IMPUTATION_PATH,
+    'feature_profile.json': FEATURE_PROFILE_PATH
+}
+
 if 'transformer' not in globals():
     from mage_ai.data_preparation.decorators import transformer
 if 'test' not in globals():
@@ -12,31 +36,104 @@ if 'test' not in globals():
 
 
 @transformer
+@profiled('data_preproecessing')
 def preprocess_data(df: DataFrame, *args, **kwargs) -> dict:
     """
     Preprocess customer data for ML training
+    
+    Set the `streaming` variable (or `source_path` to a CSV/Parquet file) to
+    process the data chunk by chunk instead of materializing it in memory.
+    With `training_mode` = 'incremental' the registered model's scaler and
+    imputation values are reused so new trees see identically scaled features.
+    Features are scaled and handed to training as MODEL_DTYPE (float32).
     """
     # Create preprocessing directory
-    os.makedirs('/home/src/mlops_demo/models', exist_ok=True)
+    os.makedirs(MODELS_PATH, exist_ok=True)
+    
+    test_size = kwargs.get('test_size', 0.2)
+    random_state = kwargs.get('random_state', 42)
+    source_path = kwargs.get('source_path')
+    streaming = as_bool(kwargs.get('streaming')) or bool(source_path)
+    chunk_size = int(kwargs.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    params = {'test_size': test_size, 'random_state': random_state, 'dtype_policy': dtype_policy()}
+    if streaming:
+        params.update({'streaming': True, 'chunk_size': chunk_size})
+    
+    parent = None
+    if kwargs.get('training_mode') == 'incremental':
+        if streaming:
+            raise ValueError('Incremental training is not supported with streaming preprocessing')
+        parent = load_registered_model(with_model=False)
+        if parent:
+            params.update({'training_mode': 'incremental', 'parent_version': parent['version']})
+    
+    # Short-circuit to cached output when data, code and parameters are unchanged
+    cache = BlockCache()
+    cache_key = make_cache_key(
+        'data_preproecessing',
+        file_source_fingerprint(source_path) if source_path else dataframe_fingerprint(df),
+        source_fingerprint('transformers/data_preproecessing.py'),
+        params
+    )
+    entry = cache.get(cache_key) if as_bool(kwargs.get('use_cache'), default=True) else None
+    if entry:
+        output = cache.load(entry, 'output')
+        arrays = output.get('array_paths', {}).values()
+        if all(os.path.exists(path) for path in arrays):
+            cache.restore_file(entry, 'scaler.pkl', SCALER_PATH)
+            cache.restore_file(entry, 'imputation.json', IMPUTATION_PATH)
+            cache.restore_file(entry, 'feature_profile.json', FEATURE_PROFILE_PATH)
+            output['cache'] = cache_status('data_preproecessing', cache_key, hit=True)
+            print(f"♻️  Preprocessing cache hit: {cache_key[:12]}")
+            return output
+    
+    if streaming:
+        output = preprocess_streaming_data(
+            source_path or df, cache_key, test_size, random_state, chunk_size,
+            n_jobs=int(kwargs.get('n_jobs', 1)),
+            dtype=MODEL_DTYPE
+        )
+        if not source_path:
+            output['data_metadata'] = df.attrs.get('data_metadata')
+        # The train/test memmaps are only deleted when this entry is evicted
+        cache.put(cache_key, objects={'output': output},
+                  files=CACHED_FILES,
+                  meta={'block': 'data_preproecessing'},
+                  attached=[os.path.join(PREPROCESSED_PATH, cache_key)])
+        output['cache'] = cache_status('data_preproecessing', cache_key, hit=False)
+        return output
     
     # Separate features and target
-    feature_cols = [col for col in df.columns if col not in ['customer_id', 'churn']]
+    feature_cols = [col for col in df.columns if col not in [ID_COLUMN, TARGET_COLUMN]]
     X = df[feature_cols]
-    y = df['churn']
+    y = df[TARGET_COLUMN].astype(COLUMN_DTYPES[TARGET_COLUMN])
+    
+    # Reference distribution of the raw features, registered for drift monitoring
+    save_profile(build_profile(X, feature_cols), FEATURE_PROFILE_PATH)
     
     # Handle missing values
-    X = X.fillna(X.median())
+    medians = X.median()
+    if parent and parent['imputation']:
+        medians = medians.copy()
+        medians.update(parent['imputation']['values'])
+    X = X.fillna(medians).astype(MODEL_DTYPE)
+    save_imputation_values(feature_cols, medians.values, IMPUTATION_PATH)
     
     # Scale features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    if parent:
+        scaler = parent['scaler']
+        X_scaled = scaler.transform(X)
+        print(f"Reusing scaler of registered model {parent['version']}")
+    else:
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
     
     # Save the scaler for later use
-    joblib.dump(scaler, '/home/src/mlops_demo/models/scaler.pkl')
+    joblib.dump(scaler, SCALER_PATH)
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(
-        X_scaled, y, test_size=0.2, random_state=42, stratify=y
+        X_scaled, y, test_size=test_size, random_state=random_state, stratify=y
     )
     
     print(f"Training set: {X_train.shape[0]} samples")
@@ -45,31 +142,94 @@ def preprocess_data(df: DataFrame, *args, **kwargs) -> dict:
     
     # Convert numpy arrays to lists for JSON serialization
     # But keep the original arrays for ML training
-    return {
+    output = {
         'X_train': X_train.tolist(),
         'X_test': X_test.tolist(),
         'y_train': y_train.tolist(),
         'y_test': y_test.tolist(),
         'feature_names': feature_cols,
-        'scaler_path': '/home/src/mlops_demo/models/scaler.pkl',
+        'scaler_path': SCALER_PATH,
         'data_shapes': {
             'X_train_shape': X_train.shape,
             'X_test_shape': X_test.shape,
             'y_train_shape': y_train.shape,
             'y_test_shape': y_test.shape
-        }
+        },
+        # Content address of this output, used as upstream fingerprint downstream
+        'fingerprint': cache_key,
+        'preprocessing_params': params,
+        'dtype_policy': dtype_policy(),
+        'imputation_path': IMPUTATION_PATH,
+        'feature_profile_path': FEATURE_PROFILE_PATH,
+        'data_metadata': df.attrs.get('data_metadata')
+    }
+    
+    cache.put(cache_key, objects={'output': output},
+              files=CACHED_FILES,
+              meta={'block': 'data_preproecessing'})
+    output['cache'] = cache_status('data_preproecessing', cache_key, hit=False)
+    
+    return output
+
+def preprocess_streaming_data(source, cache_key, test_size, random_state, chunk_size, n_jobs=1,
+                              dtype=MODEL_DTYPE):
+    """
+    Out-of-core variant: mergeable moments and median sketches instead of
+    X.median()/fit_transform, and train/test arrays written as .npy memmaps
+    that the training block loads lazily.
+    """
+    result = preprocess_streaming(
+        source,
+        os.path.join(PREPROCESSED_PATH, cache_key),
+        test_size=test_size,
+        random_state=random_state,
+        chunk_size=chunk_size,
+        n_jobs=n_jobs,
+        dtype=dtype
+    )
+    feature_cols = result['feature_names']
+    
+    joblib.dump(result['scaler'], SCALER_PATH)
+    save_imputation_values(feature_cols, result['imputation_values'], IMPUTATION_PATH)
+    save_profile(result['feature_profile'], FEATURE_PROFILE_PATH)
+    
+    shapes = result['shapes']
+    print(f"Streamed {result['rows']} rows in chunks of {chunk_size}")
+    print(f"Training set: {shapes['X_train_shape'][0]} samples")
+    print(f"Test set: {shapes['X_test_shape'][0]} samples")
+    print(f"Features: {len(feature_cols)}")
+    
+    return {
+        'array_paths': result['paths'],
+        'feature_names': feature_cols,
+        'scaler_path': SCALER_PATH,
+        'imputation_path': IMPUTATION_PATH,
+        'feature_profile_path': FEATURE_PROFILE_PATH,
+        'data_shapes': shapes,
+        'fingerprint': cache_key,
+        'preprocessing_params': {
+            'test_size': test_size,
+            'random_state': random_state,
+            'streaming': True,
+            'chunk_size': chunk_size,
+            'dtype_policy': dtype_policy()
+        },
+        'dtype_policy': dtype_policy()
     }
 
 @test
 def test_output(output, *args) -> None:
     assert output is not None, 'Output is None'
     assert isinstance(output, dict), 'Output should be a dictionary'
-    assert 'X_train' in output, 'Training features missing'
-    assert 'y_train' in output, 'Training target missing'
-    assert 'X_test' in output, 'Test features missing'
-    assert 'y_test' in output, 'Test target missing'
     assert 'data_shapes' in output, 'Data shapes missing'
     
+    # Streaming output references .npy files instead of carrying the arrays
+    arrays = output.get('array_paths') or output
+    assert 'X_train' in arrays, 'Training features missing'
+    assert 'y_train' in arrays, 'Training target missing'
+    assert 'X_test' in arrays, 'Test features missing'
+    assert 'y_test' in arrays, 'Test target missing'
+    
     # Check data shapes using the stored shape info
     shapes = output['data_shapes']
     assert shapes['X_train_shape'][0] > 0, 'No training data'
@@ -78,8 +238,9 @@ def test_output(output, *args) -> None:
     assert shapes['y_test_shape'][0] > 0, 'No test labels'
     
     # Check that data is in list format (JSON serializable)
-    assert isinstance(output['X_train'], list), 'X_train should be a list'
-    assert isinstance(output['y_train'], list), 'y_train should be a list'
+    if 'array_paths' not in output:
+        assert isinstance(output['X_train'], list), 'X_train should be a list'
+        assert isinstance(output['y_train'], list), 'y_train should be a list'
     
     print(f"✅ Preprocessing validation passed")
     print(f"   Training samples: {shapes['X_train_shape'][0]}")
@@ -1,5 +1,6 @@
 from pandas import DataFrame
-import math
+
+from mlops_demo.utils.imputation import Imputer
 
 if 'transformer' not in globals():
     from mage_ai.data_preparation.decorators import transformer
@@ -7,15 +8,11 @@ if 'test' not in globals():
     from mage_ai.data_preparation.decorators import test
 
 def select_number_columns(df: DataFrame) -> DataFrame:
-    return df[['Age', 'Fare', 'Parch', 'Pclass', 'SibSp', 'Survived']]
+    return df[['Age', 'Fare', 'Parch', 'Pclass', 'SibSp', 'Survived']].copy()
 
 
 def fill_missing_values_with_median(df: DataFrame) -> DataFrame:
-    for col in df.columns:
-        values = sorted(df[col].dropna().tolist())
-        median_value = values[math.floor(len(values) / 2)]
-        df[[col]] = df[[col]].fillna(median_value)
-    return df
+    return Imputer(strategy='median').fit_transform(df)
 
 
 @transformer
@@ -33,8 +30,12 @@ def transform_df(df: DataFrame, *args, **kwargs) -> DataFrame:
         DataFrame: Transformed data frame
     """
     # Specify your transformation logic here
+    strategy = kwargs.get('imputation_strategy', 'median')
+    if strategy == 'median':
+        return fill_missing_values_with_median(select_number_columns(df))
 
-    return fill_missing_values_with_median(select_number_columns(df))
+    imputer = Imputer(strategy=strategy, fill_value=kwargs.get('imputation_fill_value'))
+    return imputer.fit_transform(select_number_columns(df))
 
 
 @test
@@ -43,3 +44,4 @@ def test_output(df) -> None:
     Template code for testing the output of the block.
     """
     assert df is not None, 'The output is undefined'
+    assert not df.isna().any().any(), 'Missing values remain after imputation'
@@ -3,34 +3,154 @@ if 'transformer' not in globals():
 if 'test' not in globals():
     from mage_ai.data_preparation.decorators import test
 
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, roc_auc_score
 import joblib
 import json
 import os
+import time
+
+from mlops_demo.utils.block_cache import BlockCache, cache_status, make_cache_key, source_fingerprint
+from mlops_demo.utils.features import MODEL_DTYPE
+from mlops_demo.utils.hyperparameter_search import candidate_configs, successive_halving_search
+from mlops_demo.utils.incremental_training import (
+    initial_tree_partitions, load_registered_model, warm_start_update
+)
+from mlops_demo.utils.model_backends import get_backend, model_params
+from mlops_demo.utils.paths import METRICS_PATH, MODEL_PATH
+from mlops_demo.utils.profiling import profiled
+from mlops_demo.utils.variables import as_bool
 
 @transformer
+@profiled('model_training')
 def train_model(data: dict, *args, **kwargs) -> dict:
     """
     Train machine learning model for churn prediction
+    
+    Set `model_backend` to 'hist_gradient_boosting' for large datasets
+    (default 'random_forest'); `hyperparameters` override the backend defaults.
+    
+    Set the `search` variable to tune hyperparameters first, e.g.
+    {"mode": "random", "n_samples": 12, "cpu_budget": 8, "eta": 3,
+     "space": {"n_estimators": [100, 200], "max_depth": [8, 16]}}
+    
+    Set `training_mode` to 'incremental' to warm-start the registered forest
+    with `trees_per_partition` trees fitted on this `partition` only; trees
+    from partitions older than `window_partitions` (or beyond `max_trees`)
+    are aged out (random_forest backend only).
     """
+    backend = get_backend(kwargs.get('model_backend', 'random_forest'))
+    hyperparameters = {**backend.default_hyperparameters, **kwargs.get('hyperparameters', {})}
+    search = kwargs.get('search')
+    upstream_cache = data.get('cache', {})
+    
+    incremental = None
+    if kwargs.get('training_mode') == 'incremental':
+        if not backend.supports_warm_start_partitions:
+            raise ValueError(f"Incremental training is not supported by the '{backend.name}' backend")
+        incremental = {
+            'partition': str(kwargs.get('partition') or (data.get('fingerprint') or 'unknown')[:12]),
+            'trees_per_partition': int(kwargs.get('trees_per_partition', 25)),
+            'window_partitions': kwargs.get('window_partitions'),
+            'max_trees': kwargs.get('max_trees')
+        }
+    
+    # Short-circuit to the cached model when the preprocessed data, code and
+    # hyperparameters are unchanged
+    cache = BlockCache()
+    cache_key = make_cache_key(
+        'model_training',
+        data.get('fingerprint'),
+        source_fingerprint('transformers/model_training.py'),
+        backend.name,
+        hyperparameters,
+        search,
+        incremental
+    )
+    entry = cache.get(cache_key) if as_bool(kwargs.get('use_cache'), default=True) and data.get('fingerprint') else None
+    if entry:
+        metrics = cache.load(entry, 'metrics')
+        cache.restore_file(entry, 'churn_model.pkl', MODEL_PATH)
+        with open(METRICS_PATH, 'w') as f:
+            json.dump(metrics, f, indent=2)
+        metrics['cache'] = {**upstream_cache, **cache_status('model_training', cache_key, hit=True)}
+        print(f"♻️  Training cache hit: {cache_key[:12]}")
+        print(f"Accuracy: {metrics['accuracy']:.4f}")
+        print(f"AUC Score: {metrics['auc_score']:.4f}")
+        return metrics
+    
     # Convert lists back to numpy arrays for ML training
     import numpy as np
-    X_train = np.array(data['X_train'])
-    y_train = np.array(data['y_train'])
-    X_test = np.array(data['X_test'])
-    y_test = np.array(data['y_test'])
-    
-    # Initialize and train model
-    model = RandomForestClassifier(
-        n_estimators=100,
-        max_depth=10,
-        random_state=42,
-        n_jobs=-1
-    )
+    if 'array_paths' in data:
+        # Streaming preprocessing wrote memmapped .npy files
+        arrays = {name: np.load(path, mmap_mode='r') for name, path in data['array_paths'].items()}
+        X_train, y_train = arrays['X_train'], arrays['y_train']
+        X_test, y_test = arrays['X_test'], arrays['y_test']
+    else:
+        X_train = np.array(data['X_train'], dtype=MODEL_DTYPE)
+        y_train = np.array(data['y_train'])
+        X_test = np.array(data['X_test'], dtype=MODEL_DTYPE)
+        y_test = np.array(data['y_test'])
+    
+    parent = load_registered_model() if incremental else None
+    if incremental and not parent:
+        print("No registered model to warm-start from, training from scratch")
+        incremental = None
     
-    print("Training model...")
-    model.fit(X_train, y_train)
+    search_summary = None
+    if search and not parent:
+        candidates = candidate_configs(
+            search.get('space', backend.search_space),
+            mode=search.get('mode', 'grid'),
+            n_samples=search.get('n_samples', 10),
+            random_state=hyperparameters['random_state']
+        )
+        print(f"Searching {len(candidates)} hyperparameter configurations...")
+        best_params, search_summary = successive_halving_search(
+            X_train, y_train, candidates,
+            cpu_budget=search.get('cpu_budget'),
+            eta=search.get('eta', 3),
+            random_state=hyperparameters['random_state'],
+            backend=backend.name
+        )
+        hyperparameters = {**hyperparameters, **best_params}
+        print(f"Best configuration: {best_params} "
+              f"(validation AUC {search_summary['best_val_auc_score']:.4f}, "
+              f"{search_summary['trials_run']} trials in {search_summary['search_seconds']}s)")
+    
+    training_start = time.perf_counter()
+    if parent and parent['lineage'].get('model_backend', 'random_forest') != backend.name:
+        raise ValueError(
+            f"Registered model {parent['version']} was not trained with the '{backend.name}' backend"
+        )
+    if parent:
+        # Add trees fitted on the new partition to the registered forest
+        print(f"Warm-starting {parent['version']} with partition {incremental['partition']}...")
+        model, tree_partitions, dropped = warm_start_update(
+            parent['model'], X_train, y_train,
+            partition=incremental['partition'],
+            tree_partitions=initial_tree_partitions(parent['model'], parent['lineage']),
+            trees_per_partition=incremental['trees_per_partition'],
+            window_partitions=incremental['window_partitions'],
+            max_trees=incremental['max_trees']
+        )
+        incremental.update({
+            'parent_version': parent['version'],
+            'tree_partitions': tree_partitions,
+            'partitions': [partition for partition, _ in tree_partitions],
+            'trees_dropped': dropped,
+            'n_trees': len(model.estimators_)
+        })
+        fitted_params = model.get_params()
+        hyperparameters = {name: fitted_params[name] for name in hyperparameters}
+        hyperparameters['n_estimators'] = len(model.estimators_)
+        print(f"Forest now has {len(model.estimators_)} trees ({dropped} aged out)")
+    else:
+        # Initialize and train model
+        model = backend.build(hyperparameters, n_jobs=-1)
+        
+        print(f"Training {backend.model_type}...")
+        model.fit(X_train, y_train)
+    training_seconds = time.perf_counter() - training_start
     
     # Make predictions
     y_pred = model.predict(X_test)
@@ -41,10 +161,7 @@ def train_model(data: dict, *args, **kwargs) -> dict:
     auc_score = roc_auc_score(y_test, y_pred_proba)
     
     # Feature importance
-    feature_importance = dict(zip(
-        data['feature_names'], 
-        model.feature_importances_
-    ))
+    feature_importance = backend.feature_importance(model, X_test, y_test, data['feature_names'])
     
     # Sort by importance
     feature_importance = dict(sorted(
@@ -54,7 +171,7 @@ def train_model(data: dict, *args, **kwargs) -> dict:
     ))
     
     # Save model
-    model_path = '/home/src/mlops_demo/models/churn_model.pkl'
+    model_path = MODEL_PATH
     joblib.dump(model, model_path)
     
     # Save metrics
@@ -64,12 +181,27 @@ def train_model(data: dict, *args, **kwargs) -> dict:
         'feature_importance': feature_importance,
         'model_path': model_path,
         'training_samples': len(X_train),
-        'test_samples': len(X_test)
+        'test_samples': len(X_test),
+        'model_backend': backend.name,
+        'model_type': type(model).__name__,
+        'model_params': model_params(model),
+        'hyperparameters': hyperparameters,
+        'hyperparameter_search': search_summary,
+        'training_mode': 'incremental' if incremental else 'full',
+        'incremental': incremental,
+        'training_seconds': round(training_seconds, 4),
+        'dtype_policy': data.get('dtype_policy'),
+        'data_metadata': data.get('data_metadata'),
+        'fingerprint': cache_key
     }
     
-    with open('/home/src/mlops_demo/models/metrics.json', 'w') as f:
+    with open(METRICS_PATH, 'w') as f:
         json.dump(metrics, f, indent=2)
     
+    cache.put(cache_key, objects={'metrics': metrics}, files={'churn_model.pkl': model_path},
+              meta={'block': 'model_training'})
+    metrics['cache'] = {**upstream_cache, **cache_status('model_training', cache_key, hit=False)}
+    
     print(f"Model trained successfully!")
     print(f"Accuracy: {accuracy:.4f}")
     print(f"AUC Score: {auc_score:.4f}")
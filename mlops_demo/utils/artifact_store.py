@@ -0,0 +1,184 @@
+"""
+Content-addressed artifact store of the model registry.
+
+Artifacts are stored once under model_registry/objects/<sha[:2]>/<sha>.<codec>,
+keyed by the SHA-256 of their uncompressed bytes, and each version directory
+hardlinks them under the usual names (model.pkl, scaler.pkl, ...) so readers
+are unchanged. Files are streamed as bytes: nothing is unpickled.
+
+Compression is chosen per artifact type (benchmarks/artifact_store.py). The
+codecs are the ones joblib.load detects from the file header, so a compressed
+model.pkl loads exactly like an uncompressed one. JSON artifacts stay raw.
+
+An object whose link count drops to 1 is no longer referenced by any version
+and can be collected (registry_retention.collect_objects).
+"""
+import bz2
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import tempfile
+import zlib
+
+from mlops_demo.utils.paths import ARTIFACT_STORE_PATH
+
+CHUNK_SIZE = 1 << 20
+MANIFEST_NAME = 'artifacts.json'
+
+# zlib level 1 on a 100-tree forest: 3.1x smaller, load 23ms -> 45ms.
+# Scalers are < 1KB; imputation values and feature profiles are read as plain JSON.
+DEFAULT_COMPRESSION = {
+    'model': 'zlib:1',
+    'scaler': None,
+    'imputation': None,
+    'profile': None
+}
+
+
+def _compressor(codec):
+    """Streaming writer factory for 'codec[:level]' (None = raw bytes)"""
+    if not codec:
+        return None
+    name, _, level = codec.partition(':')
+    level = int(level) if level else None
+    if name == 'zlib':
+        return lambda f: _ZlibWriter(f, 3 if level is None else level)
+    if name == 'gzip':
+        return lambda f: gzip.GzipFile(fileobj=f, mode='wb', compresslevel=3 if level is None else level, mtime=0)
+    if name == 'xz':
+        return lambda f: lzma.LZMAFile(f, mode='wb', format=lzma.FORMAT_XZ, preset=1 if level is None else level)
+    if name == 'bz2':
+        return lambda f: bz2.BZ2File(f, mode='wb', compresslevel=9 if level is None else level)
+    raise ValueError(f"Unknown compression '{codec}', expected zlib, gzip, xz or bz2")
+
+
+class _ZlibWriter:
+    """Raw zlib stream, as written by joblib.dump(compress='zlib')"""
+
+    def __init__(self, f, level):
+        self._f = f
+        self._compressor = zlib.compressobj(level)
+
+    def write(self, data):
+        self._f.write(self._compressor.compress(data))
+
+    def close(self):
+        self._f.write(self._compressor.flush())
+
+
+def parse_compression(spec):
+    """'model=zlib:3,scaler=none' -> {'model': 'zlib:3', 'scaler': None}"""
+    if isinstance(spec, dict):
+        return spec
+    parsed = {}
+    for item in filter(None, (spec or '').split(',')):
+        kind, _, codec = item.partition('=')
+        parsed[kind.strip()] = None if codec.strip() in ('', 'none') else codec.strip()
+    return parsed
+
+
+class ArtifactStore:
+
+    def __init__(self, root=None, compression=None):
+        self.root = root or ARTIFACT_STORE_PATH
+        self.compression = {
+            **DEFAULT_COMPRESSION,
+            **parse_compression(os.environ.get('ARTIFACT_COMPRESSION')),
+            **parse_compression(compression)
+        }
+
+    def object_path(self, digest, codec):
+        suffix = (codec or 'raw').replace(':', '')
+        return os.path.join(self.root, digest[:2], f'{digest}.{suffix}')
+
+    def put(self, source, kind):
+        """
+        Store the bytes of `source` (compressed per `kind`) unless an identical
+        object exists. Returns the object's manifest entry.
+        """
+        codec = self.compression.get(kind)
+        os.makedirs(self.root, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.incoming.')
+        try:
+            with open(source, 'rb') as src, os.fdopen(fd, 'wb') as raw_out:
+                writer_factory = _compressor(codec)
+                out = writer_factory(raw_out) if writer_factory else raw_out
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    size += len(chunk)
+                    out.write(chunk)
+                if writer_factory:
+                    out.close()
+
+            digest = digest.hexdigest()
+            path = self.object_path(digest, codec)
+            deduplicated = os.path.exists(path)
+            if deduplicated:
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return {
+            'sha256': digest,
+            'object': os.path.relpath(path, self.root),
+            'compression': codec,
+            'bytes': size,
+            'stored_bytes': os.path.getsize(path),
+            'deduplicated': deduplicated
+        }
+
+    def link(self, entry, destination):
+        """Expose a stored object at `destination` (hardlink, copy if linking is impossible)"""
+        path = os.path.join(self.root, entry['object'])
+        if os.path.exists(destination):
+            os.remove(destination)
+        try:
+            os.link(path, destination)
+            return 'hardlink'
+        except OSError:
+            shutil.copyfile(path, destination)
+            return 'copy'
+
+    def add_version_artifacts(self, version_path, artifacts):
+        """
+        Store and link {name: (source_path, kind)} into a version directory and
+        write its manifest. Missing optional sources are skipped.
+        """
+        manifest = {}
+        for name, (source, kind) in artifacts.items():
+            if not source or not os.path.exists(source):
+                continue
+            entry = self.put(source, kind)
+            try:
+                link = self.link(entry, os.path.join(version_path, name))
+            except FileNotFoundError:
+                # The deduplicated object was garbage-collected in between: store it again
+                entry = self.put(source, kind)
+                link = self.link(entry, os.path.join(version_path, name))
+            entry['kind'] = kind
+            entry['link'] = link
+            manifest[name] = entry
+        with open(os.path.join(version_path, MANIFEST_NAME), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+
+    def disk_usage(self):
+        """Bytes used by stored objects (each counted once)"""
+        total = 0
+        for root, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return total
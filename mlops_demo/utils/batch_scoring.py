@@ -0,0 +1,238 @@
+"""
+Offline batch scoring of the served model over large customer files.
+
+The input (CSV or Parquet) is streamed in chunks; each chunk is scored
+vectorized (one scaler.transform and one predict_proba call) by a pool of
+worker processes that load the model once at startup, and written by the
+worker itself as
+
+    <output>/model_version=<version>/part-<chunk>.parquet
+
+so scores never travel back through the parent. Part files are renamed into
+place when complete: rerunning on the same input, chunk size, model version
+and feature snapshot skips the chunks already written.
+
+With a feature store (mlops_demo/prediction_service/feature_store.py), the
+input may hold bare customer_ids: features missing from the file (absent
+columns or empty cells) are looked up per customer, every worker reading the
+same snapshot.
+"""
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import joblib
+import numpy as np
+
+from mlops_demo.prediction_service.feature_store import FeatureStore, current_snapshot
+from mlops_demo.utils.features import FEATURE_NAMES, ID_COLUMN
+from mlops_demo.utils.incremental_training import load_registered_model
+from mlops_demo.utils.paths import REGISTRY_PATH
+from mlops_demo.utils.streaming_preprocessing import iter_chunks, source_fingerprint
+
+DEFAULT_CHUNK_SIZE = 250_000
+RISK_LEVELS = ['Low', 'Medium', 'High']
+PROGRESS_FILE = '_progress.json'
+# Up to this many rows, a forest's predict_proba is dominated by joblib's
+# per-tree dispatch (~0.1 ms per tree): the trees are averaged directly
+SMALL_BATCH_ROWS = 64
+
+# Model loaded once per worker process, see _load_worker_scorer
+_WORKER = {}
+
+
+def load_scorer(version_path):
+    """Model, scaler, imputation values and dtype of a registered version"""
+    model = joblib.load(os.path.join(version_path, 'model.pkl'))
+    # Parallelism comes from the process pool, not from the estimator
+    if hasattr(model, 'n_jobs'):
+        model.n_jobs = 1
+    imputation = {}
+    imputation_path = os.path.join(version_path, 'imputation.json')
+    if os.path.exists(imputation_path):
+        with open(imputation_path) as f:
+            imputation = json.load(f).get('values', {})
+    # Versions registered before the dtype policy were trained on float64
+    dtype = 'float64'
+    lineage_path = os.path.join(version_path, 'lineage.json')
+    if os.path.exists(lineage_path):
+        with open(lineage_path) as f:
+            dtype = (json.load(f).get('dtype_policy') or {}).get('model_dtype', 'float64')
+    return {
+        'model': model,
+        'scaler': joblib.load(os.path.join(version_path, 'scaler.pkl')),
+        'imputation': imputation,
+        'dtype': dtype,
+        'churn_index': list(model.classes_).index(1)
+    }
+
+
+def predict_churn_probability(scorer, X):
+    """Churn probability of scaled rows; same result as model.predict_proba"""
+    model = scorer['model']
+    trees = getattr(model, 'estimators_', None)
+    if len(X) <= SMALL_BATCH_ROWS and isinstance(trees, list) and trees and hasattr(trees[0], 'tree_'):
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        proba = sum(tree.predict_proba(X, check_input=False) for tree in trees) / len(trees)
+    else:
+        proba = model.predict_proba(X)
+    return proba[:, scorer['churn_index']]
+
+
+def score_frame(scorer, df):
+    """Score a chunk of customers; missing features are imputed like serving does"""
+    import pandas as pd
+
+    X = df.reindex(columns=FEATURE_NAMES)
+    if X.isna().any().any():
+        X = X.fillna({name: scorer['imputation'].get(name, 0) for name in FEATURE_NAMES})
+    # The scaler was fitted on a DataFrame: keep the column names
+    X = X.astype(scorer['dtype'], copy=False)
+    churn_probability = predict_churn_probability(scorer, scorer['scaler'].transform(X))
+    risk = np.digitize(churn_probability, [0.3, 0.7], right=True)
+
+    scores = pd.DataFrame({
+        'churn_probability': churn_probability.astype(np.float32),
+        'prediction': (churn_probability > 0.5).astype(np.int8),
+        'risk_level': pd.Categorical.from_codes(risk, RISK_LEVELS)
+    }, index=df.index)
+    if ID_COLUMN in df.columns:
+        scores.insert(0, ID_COLUMN, df[ID_COLUMN].to_numpy())
+    return scores
+
+
+def _load_worker_scorer(version_path, feature_store_path=None, feature_snapshot=None):
+    _WORKER['scorer'] = load_scorer(version_path)
+    _WORKER['features'] = None
+    if feature_snapshot:
+        _WORKER['features'] = FeatureStore(feature_store_path, snapshot=feature_snapshot)
+
+
+def _score_chunk(index, chunk, partition_path):
+    """Score one chunk and write its part file (runs in a worker)"""
+    start = time.perf_counter()
+    not_found = 0
+    if _WORKER['features'] is not None and ID_COLUMN in chunk.columns:
+        chunk, found = _WORKER['features'].fill(chunk)
+        not_found = int(len(found) - found.sum())
+    scores = score_frame(_WORKER['scorer'], chunk)
+    path = os.path.join(partition_path, f'part-{index:06d}.parquet')
+    tmp_path = os.path.join(partition_path, f'.part-{index:06d}.parquet.tmp')
+    scores.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return {
+        'index': index,
+        'rows': len(scores),
+        'seconds': time.perf_counter() - start,
+        'customers_not_found': not_found,
+        'risk_levels': scores['risk_level'].value_counts().to_dict()
+    }
+
+
+def _completed_chunks(partition_path, progress, resume=True):
+    """Chunk indices already written by the same run; outputs of any other run are cleared"""
+    progress_path = os.path.join(partition_path, PROGRESS_FILE)
+    previous = None
+    if os.path.exists(progress_path):
+        with open(progress_path) as f:
+            previous = json.load(f)
+    parts = glob.glob(os.path.join(partition_path, 'part-*.parquet'))
+    if resume and previous == progress:
+        return {int(os.path.basename(path)[5:11]) for path in parts}
+    stale = parts + glob.glob(os.path.join(partition_path, '.part-*.tmp'))
+    for path in stale + glob.glob(os.path.join(partition_path, '_SUCCESS')):
+        os.remove(path)
+    with open(progress_path, 'w') as f:
+        json.dump(progress, f, indent=2)
+    return set()
+
+
+def score_source(source, output_path, registry_path=REGISTRY_PATH, chunk_size=DEFAULT_CHUNK_SIZE,
+                 n_jobs=None, resume=True, report_every=10, feature_store_path=None):
+    """
+    Score every customer of `source` with the served model. Returns a run
+    summary (rows scored/skipped, rows per second, risk level counts).
+    Customers the feature store does not know are scored on the features of
+    the file, imputed where missing, and counted in customers_not_found.
+    """
+    registered = load_registered_model(registry_path, with_model=False)
+    if registered is None:
+        raise ValueError('No trained model found. Please run the training pipeline first.')
+    version = registered['version']
+    n_jobs = max(1, n_jobs or os.cpu_count() or 1)
+
+    feature_snapshot = current_snapshot(feature_store_path) if feature_store_path else None
+
+    partition_path = os.path.join(output_path, f'model_version={version}')
+    os.makedirs(partition_path, exist_ok=True)
+    progress = {
+        'source': os.path.abspath(source),
+        'source_fingerprint': source_fingerprint(source),
+        'chunk_size': chunk_size,
+        'model_version': version,
+        'feature_snapshot': feature_snapshot
+    }
+    completed = _completed_chunks(partition_path, progress, resume)
+
+    summary = {
+        'model_version': version,
+        'output_path': partition_path,
+        'n_jobs': n_jobs,
+        'chunk_size': chunk_size,
+        'chunks': 0,
+        'rows_scored': 0,
+        'rows_skipped': 0,
+        'feature_snapshot': feature_snapshot,
+        'customers_not_found': 0,
+        'risk_levels': dict.fromkeys(RISK_LEVELS, 0),
+        'worker_seconds': 0.0
+    }
+    start = time.perf_counter()
+
+    def collect(result):
+        summary['chunks'] += 1
+        summary['rows_scored'] += result['rows']
+        summary['worker_seconds'] += result['seconds']
+        summary['customers_not_found'] += result['customers_not_found']
+        for level, count in result['risk_levels'].items():
+            summary['risk_levels'][level] += int(count)
+        if summary['chunks'] % report_every == 0:
+            elapsed = time.perf_counter() - start
+            print(f"   {summary['rows_scored']:,} rows scored, {summary['rows_scored'] / elapsed:,.0f} rows/s")
+
+    chunks = iter_chunks(source, chunk_size)
+    if n_jobs == 1:
+        _load_worker_scorer(registered['path'], feature_store_path, feature_snapshot)
+        for index, chunk in enumerate(chunks):
+            if index in completed:
+                summary['rows_skipped'] += len(chunk)
+                continue
+            collect(_score_chunk(index, chunk, partition_path))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_load_worker_scorer,
+            initargs=(registered['path'], feature_store_path, feature_snapshot)
+        ) as pool:
+            pending = set()
+            for index, chunk in enumerate(chunks):
+                if index in completed:
+                    summary['rows_skipped'] += len(chunk)
+                    continue
+                # Bounded read-ahead: at most two chunks per worker in memory
+                if len(pending) >= 2 * n_jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+                pending.add(pool.submit(_score_chunk, index, chunk, partition_path))
+            for future in pending:
+                collect(future.result())
+
+    summary['seconds'] = round(time.perf_counter() - start, 3)
+    summary['rows_per_second'] = round(summary['rows_scored'] / summary['seconds']) if summary['seconds'] else None
+    summary['worker_seconds'] = round(summary['worker_seconds'], 3)
+    with open(os.path.join(partition_path, '_SUCCESS'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
@@ -0,0 +1,190 @@
+"""
+Content-addressed cache for pipeline block outputs.
+
+A cache key is the SHA256 of everything that determines a block's output:
+the upstream data fingerprint, the block source code (with the
+mlops_demo/utils modules it relies on) and its parameters.
+Entries live on disk as one directory per key; the store is bounded in size
+and evicts the least recently used entries first.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import joblib
+
+from mlops_demo.utils.paths import BLOCK_CACHE_PATH, block_source_path
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+META_FILE = 'meta.json'
+
+
+def make_cache_key(*parts):
+    """Hash arbitrary JSON-serializable parts into a stable cache key"""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def dataframe_fingerprint(df):
+    """Same hash make_dataset uses for data versioning"""
+    import pandas as pd
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=True).values).hexdigest()
+
+
+def utils_fingerprint():
+    """Hash of every mlops_demo/utils module, where most of the blocks' logic lives"""
+    utils_path = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(utils_path)):
+        if name.endswith('.py'):
+            digest.update(name.encode())
+            with open(os.path.join(utils_path, name), 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def source_fingerprint(relative_path):
+    """
+    Hash of a block's source file and of the mlops_demo/utils package it
+    calls into; changes whenever the code producing the output changes
+    """
+    path = block_source_path(relative_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        block_hash = hashlib.sha256(f.read()).hexdigest()
+    return make_cache_key(block_hash, utils_fingerprint())
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class BlockCache:
+    """
+    Size-bounded on-disk store of block outputs with LRU eviction.
+
+    Each entry is a directory holding joblib-serialized objects, raw files and
+    a meta.json whose mtime records the last access. Outputs too large to copy
+    (e.g. memmapped arrays) stay where the block wrote them as directories
+    attached to the entry: they count towards its size and are evicted with it.
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or BLOCK_CACHE_PATH
+        self.max_bytes = int(max_bytes or os.environ.get('BLOCK_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        os.makedirs(self.root, exist_ok=True)
+
+    def _entry_path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key):
+        """Return the entry directory for key (marking it as used) or None"""
+        path = self._entry_path(key)
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            os.utime(meta_path, None)
+        except OSError:
+            return None
+        return path
+
+    def load(self, entry_path, name):
+        return joblib.load(os.path.join(entry_path, f'{name}.joblib'))
+
+    def restore_file(self, entry_path, name, destination):
+        """Copy a cached raw file back to where the pipeline expects it"""
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(os.path.join(entry_path, name), destination)
+        return destination
+
+    def put(self, key, objects=None, files=None, meta=None, attached=None):
+        """
+        Store objects (name -> python object) and files (name -> source path)
+        under key, owning the `attached` directories. The entry is staged in a
+        temp dir and renamed into place so concurrent readers never see a
+        partial entry.
+        """
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f'.{key[:8]}_', dir=self.root)
+        try:
+            for name, obj in (objects or {}).items():
+                joblib.dump(obj, os.path.join(staging, f'{name}.joblib'))
+            for name, source in (files or {}).items():
+                shutil.copyfile(source, os.path.join(staging, name))
+            with open(os.path.join(staging, META_FILE), 'w') as f:
+                json.dump({
+                    'key': key,
+                    'created_at': time.time(),
+                    'attached': [os.path.abspath(directory) for directory in attached or []],
+                    **(meta or {})
+                }, f, indent=2)
+
+            if os.path.exists(path):
+                shutil.rmtree(path, ignore_errors=True)
+            os.replace(staging, path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        # Never the entry just written: its attached outputs are about to be read
+        self.evict(keep=path)
+        return path
+
+    @staticmethod
+    def _attached(path):
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                return json.load(f).get('attached', [])
+        except (OSError, ValueError):
+            return []
+
+    def entries(self):
+        """List (path, last_access, size) for every complete entry, attached directories included"""
+        result = []
+        for shard in os.listdir(self.root):
+            shard_path = os.path.join(self.root, shard)
+            if shard.startswith('.') or not os.path.isdir(shard_path):
+                continue
+            for key in os.listdir(shard_path):
+                path = os.path.join(shard_path, key)
+                meta_path = os.path.join(path, META_FILE)
+                if not os.path.exists(meta_path):
+                    continue
+                size = _dir_size(path) + sum(_dir_size(directory) for directory in self._attached(path))
+                result.append((path, os.path.getmtime(meta_path), size))
+        return result
+
+    def evict(self, keep=None):
+        """Drop least recently used entries (but `keep`) until the store fits max_bytes"""
+        entries = sorted(self.entries(), key=lambda e: e[1])
+        total = sum(size for _, _, size in entries)
+        entries = [entry for entry in entries if entry[0] != keep]
+        evicted = []
+        while entries and total > self.max_bytes:
+            path, _, size = entries.pop(0)
+            attached = self._attached(path)
+            # The entry first: a reader never finds it with its arrays gone
+            shutil.rmtree(path, ignore_errors=True)
+            for directory in attached:
+                shutil.rmtree(directory, ignore_errors=True)
+            total -= size
+            evicted.append(path)
+        return evicted
+
+
+def cache_status(block_uuid, key, hit):
+    """Lineage record for one block's cache lookup"""
+    return {block_uuid: {'status': 'hit' if hit else 'miss', 'key': key}}
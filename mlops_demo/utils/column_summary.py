@@ -0,0 +1,232 @@
+"""
+Compact, mergeable summary of a DataFrame's numeric columns for chart blocks.
+
+Per column: count, missing, min/max/mean, a histogram and quantiles; plus a
+fixed-size uniform reservoir sample of rows for scatter-style charts. Every
+part is built chunk by chunk and merges across chunks (or workers), and its
+size depends on `max_bins`, the sketch size and `sample_size`, never on the
+row count, so charts render from it in constant time and payload.
+
+Histogram bins have a power-of-two width aligned on zero: two histograms
+always share bin edges once the finer one is coarsened (pairs of bins
+folded), so merging is exact. The width doubles whenever the values span more
+than `max_bins` bins.
+"""
+import numpy as np
+
+from mlops_demo.utils.streaming_stats import QuantileSketch
+
+SUMMARY_FORMAT = 1
+DEFAULT_MAX_BINS = 64
+DEFAULT_SAMPLE_SIZE = 500
+SUMMARY_QUANTILES = tuple(round(q, 2) for q in np.linspace(0, 1, 21))
+
+
+class StreamingHistogram:
+    """Histogram with aligned power-of-two bins, at most `max_bins` of them"""
+
+    def __init__(self, max_bins=DEFAULT_MAX_BINS):
+        self.max_bins = max_bins
+        self.width = None
+        self.start = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def _coarsen(self):
+        index = (self.start + np.arange(self.counts.size)) // 2
+        self.counts = np.bincount(index - index[0], weights=self.counts).astype(np.int64)
+        self.start = int(index[0])
+        self.width *= 2
+
+    def _add(self, start, counts):
+        end = max(self.start + self.counts.size, start + counts.size)
+        first = min(self.start, start) if self.counts.size else start
+        merged = np.zeros(end - first, dtype=np.int64)
+        merged[self.start - first:self.start - first + self.counts.size] += self.counts
+        merged[start - first:start - first + counts.size] += counts
+        self.start, self.counts = first, merged
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return self
+        low, high = values.min(), values.max()
+        if self.width is None:
+            span = max(high - low, 1e-9)
+            self.width = 2.0 ** np.ceil(np.log2(span / self.max_bins))
+            # Integer columns: no bin narrower than one unit
+            if np.array_equal(values, np.floor(values)):
+                self.width = max(self.width, 1.0)
+        while True:
+            first, last = int(np.floor(low / self.width)), int(np.floor(high / self.width))
+            if self.counts.size:
+                first = min(first, self.start)
+                last = max(last, self.start + self.counts.size - 1)
+            if last - first < self.max_bins:
+                break
+            if self.counts.size:
+                self._coarsen()
+            else:
+                self.width *= 2
+        index = np.floor(values / self.width).astype(np.int64)
+        low_index = int(index.min())
+        self._add(low_index, np.bincount(index - low_index))
+        return self
+
+    def merge(self, other):
+        if other.width is None:
+            return self
+        other = _copy_histogram(other)
+        if self.width is None:
+            self.width, self.start, self.counts = other.width, other.start, other.counts
+            return self
+        while self.width < other.width:
+            self._coarsen()
+        while other.width < self.width:
+            other._coarsen()
+        self._add(other.start, other.counts)
+        while self.counts.size > self.max_bins:
+            self._coarsen()
+        return self
+
+    def to_dict(self):
+        """Non-empty range only: {'edges': [...], 'counts': [...]}"""
+        if not self.counts.size:
+            return {'edges': [], 'counts': []}
+        nonzero = np.flatnonzero(self.counts)
+        first, last = nonzero[0], nonzero[-1] + 1
+        edges = (self.start + np.arange(first, last + 1)) * self.width
+        return {'edges': edges.tolist(), 'counts': self.counts[first:last].tolist()}
+
+
+def _copy_histogram(histogram):
+    copy = StreamingHistogram(histogram.max_bins)
+    copy.width, copy.start, copy.counts = histogram.width, histogram.start, histogram.counts.copy()
+    return copy
+
+
+class Reservoir:
+    """Uniform sample of `size` rows over a stream of chunks (algorithm R, vectorized)"""
+
+    def __init__(self, size=DEFAULT_SAMPLE_SIZE, seed=0):
+        self.size = size
+        self.seen = 0
+        self.rows = None
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if self.rows is None:
+            self.rows = np.empty((0, X.shape[1]))
+        fill = min(self.size - len(self.rows), len(X))
+        if fill > 0:
+            self.rows = np.vstack([self.rows, X[:fill]])
+        rest = X[fill:]
+        if len(rest):
+            # Row t of the stream replaces a random slot with probability size / (t + 1)
+            positions = self.seen + fill + np.arange(len(rest))
+            slots = self._rng.integers(0, positions + 1)
+            keep = slots < self.size
+            # Fancy assignment keeps the last write per slot, like the sequential algorithm
+            self.rows[slots[keep]] = rest[keep]
+        self.seen += len(X)
+        return self
+
+    def merge(self, other):
+        """Uniform sample of both streams: rows drawn from each in proportion to what it saw"""
+        if other.rows is None or not other.seen:
+            return self
+        if self.rows is None or not self.seen:
+            self.rows, self.seen = other.rows.copy(), other.seen
+            return self
+        size = min(self.size, len(self.rows) + len(other.rows))
+        from_self = self._rng.hypergeometric(self.seen, other.seen, size)
+        from_self = min(max(from_self, size - len(other.rows)), len(self.rows))
+        self.rows = np.vstack([
+            self.rows[self._rng.choice(len(self.rows), from_self, replace=False)],
+            other.rows[self._rng.choice(len(other.rows), size - from_self, replace=False)]
+        ])
+        self.seen += other.seen
+        return self
+
+
+class ColumnSummary:
+    """Mergeable summary of the numeric columns of a stream of DataFrame chunks"""
+
+    def __init__(self, columns, max_bins=DEFAULT_MAX_BINS, sketch_size=1024, sample_size=DEFAULT_SAMPLE_SIZE,
+                 seed=0):
+        self.columns = list(columns)
+        n = len(self.columns)
+        self.histograms = [StreamingHistogram(max_bins) for _ in range(n)]
+        self.sketches = [QuantileSketch(k=sketch_size, seed=seed + i) for i in range(n)]
+        self.reservoir = Reservoir(sample_size, seed=seed)
+        self.count = np.zeros(n, dtype=np.int64)
+        self.missing = np.zeros(n, dtype=np.int64)
+        self.total = np.zeros(n)
+        self.minimum = np.full(n, np.inf)
+        self.maximum = np.full(n, -np.inf)
+        self.rows = 0
+
+    def update(self, df):
+        X = df[self.columns].to_numpy(dtype=np.float64)
+        finite = np.isfinite(X)
+        for i in range(len(self.columns)):
+            values = X[finite[:, i], i]
+            self.histograms[i].update(values)
+            self.sketches[i].update(values)
+            if values.size:
+                self.minimum[i] = min(self.minimum[i], values.min())
+                self.maximum[i] = max(self.maximum[i], values.max())
+                self.total[i] += values.sum()
+        self.count += finite.sum(axis=0)
+        self.missing += (~finite).sum(axis=0)
+        self.reservoir.update(X)
+        self.rows += len(X)
+        return self
+
+    def merge(self, other):
+        for i in range(len(self.columns)):
+            self.histograms[i].merge(other.histograms[i])
+            self.sketches[i].merge(other.sketches[i])
+        self.count += other.count
+        self.missing += other.missing
+        self.total += other.total
+        self.minimum = np.minimum(self.minimum, other.minimum)
+        self.maximum = np.maximum(self.maximum, other.maximum)
+        self.reservoir.merge(other.reservoir)
+        self.rows += other.rows
+        return self
+
+    def to_dict(self):
+        """JSON-serializable summary (the block output charts read)"""
+        columns = {}
+        for i, name in enumerate(self.columns):
+            count = int(self.count[i])
+            columns[name] = {
+                'count': count,
+                'missing': int(self.missing[i]),
+                'min': float(self.minimum[i]) if count else None,
+                'max': float(self.maximum[i]) if count else None,
+                'mean': float(self.total[i] / count) if count else None,
+                'histogram': self.histograms[i].to_dict(),
+                'quantiles': {str(q): self.sketches[i].quantile(q) for q in SUMMARY_QUANTILES} if count else {}
+            }
+        sample = self.reservoir.rows if self.reservoir.rows is not None else np.empty((0, len(self.columns)))
+        return {
+            'format': SUMMARY_FORMAT,
+            'rows': int(self.rows),
+            'columns': columns,
+            'sample': {'columns': self.columns, 'rows': sample.tolist()}
+        }
+
+
+def numeric_columns(df):
+    return [column for column in df.columns if np.issubdtype(df[column].dtype, np.number)]
+
+
+def summarize(df, columns=None, chunk_size=100_000, **options):
+    """Summary dict of df's numeric columns, built chunk by chunk"""
+    summary = ColumnSummary(columns or numeric_columns(df), **options)
+    for start in range(0, len(df), chunk_size):
+        summary.update(df.iloc[start:start + chunk_size])
+    return summary.to_dict()
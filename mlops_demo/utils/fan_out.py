@@ -0,0 +1,194 @@
+"""
+Fan-out of parameterized child pipeline runs with bounded concurrency.
+
+fan_out() starts one child run per variables dict (a data partition, a
+hyperparameter set...), never more than `max_concurrency` at a time, and
+starts the next one as soon as a slot frees. Each running child is polled
+with its own adaptive backoff: `initial_poll` seconds at first, multiplied by
+`backoff` while its status does not change, capped at `max_poll`, so a child
+finishing quickly is noticed within a fraction of a second while long ones
+cost few status queries. Child outputs are aggregated into one dict for
+downstream blocks.
+
+The trigger API is pluggable: MageTriggerAPI (trigger_pipeline, inside Mage)
+or LocalTriggerAPI, an in-process stub used by tests and benchmarks.
+"""
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# PipelineRun statuses (mage_ai PipelineRun.PipelineRunStatus values)
+INITIAL, RUNNING, COMPLETED, FAILED, CANCELLED = 'initial', 'running', 'completed', 'failed', 'cancelled'
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+class MageTriggerAPI:
+    """Child runs created with mage_ai's trigger_pipeline, polled from the orchestration DB"""
+
+    def __init__(self):
+        self._runs = {}
+
+    def start(self, pipeline_uuid, variables):
+        from mage_ai.orchestration.triggers.api import trigger_pipeline
+
+        run = trigger_pipeline(pipeline_uuid, variables=variables, check_status=False, verbose=False)
+        self._runs[run.id] = run
+        return run.id
+
+    def status(self, run_id):
+        from mage_ai.orchestration.db import db_connection
+
+        run = self._runs[run_id]
+        db_connection.session.refresh(run)
+        return run.status.value
+
+    def outputs(self, run_id):
+        """Outputs of the child's leaf blocks: {block_uuid: output}"""
+        from mage_ai.data_preparation.models.block.remote.models import RemoteBlock
+
+        run = self._runs[run_id]
+        pipeline = run.pipeline
+        outputs = {}
+        for block in pipeline.blocks_by_uuid.values():
+            if block.downstream_blocks or block.type in ('markdown', 'chart', 'scratchpad'):
+                continue
+            values = RemoteBlock.load(
+                block_uuid=block.uuid,
+                execution_partition=run.execution_partition,
+                pipeline_uuid=pipeline.uuid,
+                repo_path=pipeline.repo_path,
+            ).get_outputs()
+            outputs[block.uuid] = values[0] if len(values) == 1 else values
+        return outputs
+
+
+class LocalTriggerAPI:
+    """
+    In-process stand-in for the trigger API: each child run calls
+    `run(variables)` in a thread, after `start_latency` seconds in the
+    'initial' state (the scheduler picking the run up).
+    """
+
+    def __init__(self, run, start_latency=0.0, max_workers=256):
+        self.run = run
+        self.start_latency = start_latency
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.status_calls = 0
+        self.runs = {}
+        self._lock = threading.Lock()
+
+    def start(self, pipeline_uuid, variables):
+        with self._lock:
+            run_id = len(self.runs) + 1
+            record = self.runs[run_id] = {'status': INITIAL, 'created_at': time.monotonic()}
+
+        def execute():
+            time.sleep(self.start_latency)
+            record['status'] = RUNNING
+            try:
+                record['output'] = self.run(variables)
+                record['status'] = COMPLETED
+            except Exception as e:
+                record['error'] = str(e)
+                record['status'] = FAILED
+            record['finished_at'] = time.monotonic()
+
+        self.pool.submit(execute)
+        return run_id
+
+    def status(self, run_id):
+        self.status_calls += 1
+        return self.runs[run_id]['status']
+
+    def outputs(self, run_id):
+        return self.runs[run_id].get('output')
+
+
+def fan_out(api, pipeline_uuid, variables_list, max_concurrency=4, initial_poll=0.25, max_poll=10.0,
+            backoff=1.5, timeout=None, error_on_failure=False, verbose=True):
+    """
+    Run `pipeline_uuid` once per variables dict and wait for all of them.
+    Returns {'children': [...] (input order), 'completed', 'failed',
+    'seconds', 'status_calls', ...}; child outputs are under 'output'.
+    """
+    variables_list = list(variables_list)
+    children = [{'index': index, 'variables': variables, 'status': None} for index, variables in enumerate(variables_list)]
+    waiting = list(reversed(children))
+    running = []
+    status_calls = 0
+    start = time.monotonic()
+
+    while waiting or running:
+        now = time.monotonic()
+        while waiting and len(running) < max_concurrency:
+            child = waiting.pop()
+            child['run_id'] = api.start(pipeline_uuid, child['variables'])
+            child.update(status=INITIAL, started_at=now, poll=initial_poll, next_poll_at=now + initial_poll)
+            running.append(child)
+
+        for child in [c for c in running if c['next_poll_at'] <= now]:
+            status = api.status(child['run_id'])
+            status_calls += 1
+            if status in FINISHED:
+                child['seconds'] = round(time.monotonic() - child['started_at'], 3)
+                child['status'] = status
+                if status == COMPLETED:
+                    child['output'] = api.outputs(child['run_id'])
+                running.remove(child)
+                if verbose:
+                    print(f"   child {child['index']} ({child['run_id']}): {status} in {child['seconds']:.2f}s")
+                continue
+            # Back off while nothing changes; poll fast again after a transition
+            child['poll'] = initial_poll if status != child['status'] else min(child['poll'] * backoff, max_poll)
+            child['status'] = status
+            child['next_poll_at'] = now + child['poll']
+
+        if timeout is not None and time.monotonic() - start > timeout:
+            for child in running + waiting:
+                child['status'] = 'timeout' if child in running else 'not_started'
+            break
+        if running and not (waiting and len(running) < max_concurrency):
+            time.sleep(max(0.0, min(c['next_poll_at'] for c in running) - time.monotonic()))
+
+    for child in children:
+        for key in ('poll', 'next_poll_at', 'started_at'):
+            child.pop(key, None)
+
+    durations = [c['seconds'] for c in children if 'seconds' in c]
+    result = {
+        'pipeline_uuid': pipeline_uuid,
+        'children': children,
+        'completed': sum(c['status'] == COMPLETED for c in children),
+        'failed': sum(c['status'] != COMPLETED for c in children),
+        'max_concurrency': max_concurrency,
+        'seconds': round(time.monotonic() - start, 3),
+        'child_seconds_p50': round(statistics.median(durations), 3) if durations else None,
+        'status_calls': status_calls
+    }
+    if error_on_failure and result['failed']:
+        failed = [c['index'] for c in children if c['status'] != COMPLETED]
+        raise RuntimeError(f'{len(failed)} child runs of {pipeline_uuid} did not complete: {failed}')
+    return result
+
+
+def find_metric(output, metric):
+    """Value of `metric` in a child output (top level or one block output deep)"""
+    if not isinstance(output, dict):
+        return None
+    if isinstance(output.get(metric), (int, float)):
+        return output[metric]
+    for value in output.values():
+        if isinstance(value, dict) and isinstance(value.get(metric), (int, float)):
+            return value[metric]
+    return None
+
+
+def select_best(result, metric, mode='max'):
+    """Completed child with the best `metric` (e.g. one hyperparameter set per child)"""
+    scored = [(find_metric(c.get('output'), metric), c) for c in result['children'] if c['status'] == COMPLETED]
+    scored = [(value, child) for value, child in scored if value is not None]
+    if not scored:
+        return None
+    pick = max if mode == 'max' else min
+    return pick(scored, key=lambda pair: pair[0])[1]
@@ -0,0 +1,70 @@
+"""
+Reference profile of the training features, registered with each model version.
+
+Per feature: a few quantiles and a histogram over quantile bin cuts (so each
+training bin holds about the same share of rows), both read from mergeable
+QuantileSketches. Sketches are exact below `sketch_size` values, and the
+streaming preprocessing builds the profile from the sketches it already keeps,
+without another pass over the data.
+
+The prediction service bins served features on the same cuts and scores drift
+against the training counts (prediction_service/drift_monitor.py, which reads
+the JSON as it cannot import this package):
+
+    {"format": 1, "rows": n, "bins": 10,
+     "features": {name: {"count", "missing", "cuts": [...], "counts": [...], "quantiles": {...}}}}
+
+Bin i holds the values in (cuts[i - 1], cuts[i]]; the first and last bins are open.
+"""
+import json
+
+import numpy as np
+
+from mlops_demo.utils.streaming_stats import QuantileSketch
+
+PROFILE_FORMAT = 1
+PROFILE_BINS = 10
+PROFILE_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def feature_summary(sketch, missing, bins=PROFILE_BINS):
+    if sketch.count == 0:
+        return {'count': 0, 'missing': int(missing), 'cuts': [], 'counts': [0], 'quantiles': {}}
+    cuts = np.unique([sketch.quantile(q) for q in np.arange(1, bins) / bins])
+    # The top cut would leave the last bin empty (max value): drop it
+    cuts = cuts[cuts < sketch.quantile(1.0)]
+    ranks = sketch.rank(cuts)
+    counts = np.diff(np.concatenate([[0.0], ranks, [sketch.count]]))
+    return {
+        'count': int(sketch.count),
+        'missing': int(missing),
+        'cuts': [float(cut) for cut in cuts],
+        'counts': [int(round(count)) for count in counts],
+        'quantiles': {str(q): sketch.quantile(q) for q in PROFILE_QUANTILES}
+    }
+
+
+def profile_from_sketches(feature_names, sketches, missing, rows, bins=PROFILE_BINS):
+    """Profile from per-feature QuantileSketches and missing-value counts"""
+    return {
+        'format': PROFILE_FORMAT,
+        'rows': int(rows),
+        'bins': bins,
+        'features': {
+            name: feature_summary(sketch, n_missing, bins)
+            for name, sketch, n_missing in zip(feature_names, sketches, missing)
+        }
+    }
+
+
+def build_profile(df, feature_names, bins=PROFILE_BINS, sketch_size=4096):
+    """Profile of the raw (not imputed, not scaled) feature columns of df"""
+    X = df[list(feature_names)].to_numpy(dtype=np.float64)
+    sketches = [QuantileSketch(k=sketch_size, seed=i).update(X[:, i]) for i in range(X.shape[1])]
+    return profile_from_sketches(feature_names, sketches, np.isnan(X).sum(axis=0), len(X), bins)
+
+
+def save_profile(profile, path):
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=2)
+    return path
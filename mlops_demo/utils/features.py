@@ -0,0 +1,60 @@
+"""
+Feature list and dtype policy of the churn pipeline.
+
+Every value of the synthetic customer data fits in float32 or a small integer
+type, so loaders downcast at ingestion and the scaler and model are trained on
+MODEL_DTYPE. Tree models split on float32 internally anyway, so this halves
+memory without changing predictions. The policy is recorded in lineage.json;
+prediction_service/app.py cannot import this package and reads it from there.
+"""
+import numpy as np
+
+FEATURE_NAMES = [
+    'account_age', 'monthly_charges', 'total_charges', 'num_services',
+    'customer_service_calls', 'contract_length', 'payment_method_score',
+    'usage_frequency', 'support_tickets', 'satisfaction_score'
+]
+ID_COLUMN = 'customer_id'
+TARGET_COLUMN = 'churn'
+
+FEATURE_DTYPES = {
+    **{name: 'float32' for name in FEATURE_NAMES},
+    'account_age': 'int16',
+    'num_services': 'int8'
+}
+COLUMN_DTYPES = {
+    **FEATURE_DTYPES,
+    ID_COLUMN: 'int32',
+    TARGET_COLUMN: 'int8'
+}
+MODEL_DTYPE = 'float32'
+
+
+def dtype_policy():
+    """Policy as recorded in preprocessing output and lineage"""
+    return {'columns': dict(COLUMN_DTYPES), 'model_dtype': MODEL_DTYPE}
+
+
+def apply_dtype_policy(df, dtypes=None):
+    """
+    Downcast the policy columns present in df, in place. Integer columns
+    holding missing values become float32 instead; values that do not fit
+    the declared integer type raise ValueError rather than wrap around.
+    """
+    dtypes = COLUMN_DTYPES if dtypes is None else dtypes
+    casts = {}
+    for column, dtype in dtypes.items():
+        if column not in df.columns or df[column].dtype == dtype:
+            continue
+        values = df[column]
+        if np.issubdtype(np.dtype(dtype), np.integer):
+            if values.isna().any():
+                dtype = 'float32'
+            else:
+                info = np.iinfo(dtype)
+                if len(values) and (values.min() < info.min or values.max() > info.max):
+                    raise ValueError(f"Column '{column}' does not fit in {dtype}")
+        casts[column] = dtype
+    for column, dtype in casts.items():
+        df[column] = df[column].astype(dtype)
+    return df
@@ -0,0 +1,185 @@
+"""
+Parallel hyperparameter search for the churn model training block.
+
+The training matrix is copied once into POSIX shared memory; worker processes
+attach to it by name instead of receiving a pickled copy per trial. Rows are
+shuffled when copied in, so every successive-halving rung trains on a prefix of
+the shared array (a zero-copy view) and scores on the validation rows kept at
+the end.
+"""
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from mlops_demo.utils.model_backends import get_backend
+
+DEFAULT_SEARCH_SPACE = get_backend('random_forest').search_space
+
+# Per-worker handles to the shared training data, set by _attach_shared_data
+_SHARED = {}
+
+
+def candidate_configs(search_space, mode='grid', n_samples=10, random_state=42):
+    """Expand a search space into a list of parameter dicts (full grid or random sample)"""
+    names = sorted(search_space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(search_space[n] for n in names))]
+    if mode == 'grid' or n_samples >= len(grid):
+        return grid
+    if mode != 'random':
+        raise ValueError(f"Unknown search mode '{mode}', expected 'grid' or 'random'")
+    rng = np.random.default_rng(random_state)
+    return [grid[i] for i in sorted(rng.choice(len(grid), size=n_samples, replace=False))]
+
+
+def split_cpu_budget(cpu_budget, n_candidates, min_jobs_per_model=1):
+    """
+    Split cores between parallel trials and per-model n_jobs.
+    Trials are preferred (they scale linearly); leftover cores go to each model.
+    """
+    cpu_budget = max(1, int(cpu_budget or os.cpu_count() or 1))
+    parallel_trials = max(1, min(n_candidates, cpu_budget // min_jobs_per_model))
+    jobs_per_model = max(1, cpu_budget // parallel_trials)
+    return parallel_trials, jobs_per_model
+
+
+class SharedTrainingData:
+    """Owner of the shared-memory copies of X/y; use as a context manager"""
+
+    def __init__(self, X, y):
+        # Keep float32 training data float32: half the shared memory
+        X = np.asarray(X)
+        X = np.ascontiguousarray(X, dtype=np.result_type(X.dtype, np.float32))
+        y = np.ascontiguousarray(y, dtype=np.int64)
+        self.blocks = {}
+        self.spec = {}
+        for name, array in (('X', X), ('y', y)):
+            shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+            self.blocks[name] = shm
+            self.spec[name] = (shm.name, array.shape, array.dtype.str)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        for shm in self.blocks.values():
+            shm.close()
+            shm.unlink()
+
+
+def _attach_shared_data(spec):
+    for name, (shm_name, shape, dtype) in spec.items():
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name, track=False)
+        except TypeError:
+            # Python < 3.13 registers the attached segment again, but pool
+            # workers (fork, spawn and forkserver alike) report to the
+            # parent's resource tracker: registering is idempotent there and
+            # the parent's unlink() unregisters it. Unregistering here would
+            # drop the parent's own registration.
+            shm = shared_memory.SharedMemory(name=shm_name)
+        _SHARED[f'{name}_shm'] = shm
+        _SHARED[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def _run_trial(params, n_rows, n_fit_total, n_jobs, random_state, backend_name):
+    from sklearn.metrics import roc_auc_score
+
+    X, y = _SHARED['X'], _SHARED['y']
+    start = time.perf_counter()
+    model = get_backend(backend_name).build({**params, 'random_state': random_state}, n_jobs=n_jobs)
+    model.fit(X[:n_rows], y[:n_rows])
+    score = roc_auc_score(y[n_fit_total:], model.predict_proba(X[n_fit_total:])[:, 1])
+    return {
+        'params': params,
+        'rows': int(n_rows),
+        'val_auc_score': float(score),
+        'fit_seconds': round(time.perf_counter() - start, 4)
+    }
+
+
+def successive_halving_search(
+    X_train,
+    y_train,
+    candidates,
+    cpu_budget=None,
+    eta=3,
+    min_rows=None,
+    validation_fraction=0.2,
+    random_state=42,
+    backend='random_forest',
+):
+    """
+    Evaluate candidates on growing row budgets, keeping the best 1/eta at each
+    rung, until one candidate remains or the full training set is used.
+    Returns (best_params, summary).
+    """
+    from sklearn.model_selection import train_test_split
+
+    X_train = np.asarray(X_train)
+    y_train = np.asarray(y_train)
+    fit_idx, val_idx = train_test_split(
+        np.arange(len(y_train)), test_size=validation_fraction,
+        random_state=random_state, stratify=y_train
+    )
+    # Shuffled fit rows first so every rung's subsample is a prefix view
+    order = np.concatenate([fit_idx, val_idx])
+    n_fit_total = len(fit_idx)
+
+    n_rungs = max(1, int(np.ceil(np.log(max(len(candidates), 1)) / np.log(eta))) + 1)
+    min_rows = min_rows or max(100, n_fit_total // eta ** (n_rungs - 1))
+    parallel_trials, jobs_per_model = split_cpu_budget(cpu_budget, len(candidates))
+
+    rungs = []
+    remaining = list(candidates)
+    start = time.perf_counter()
+    with SharedTrainingData(X_train[order], y_train[order]) as shared:
+        with ProcessPoolExecutor(
+            max_workers=parallel_trials,
+            initializer=_attach_shared_data,
+            initargs=(shared.spec,)
+        ) as pool:
+            rung = 0
+            while True:
+                n_rows = min(n_fit_total, int(min_rows * eta ** rung))
+                trials = list(pool.map(
+                    _run_trial,
+                    remaining,
+                    [n_rows] * len(remaining),
+                    [n_fit_total] * len(remaining),
+                    [jobs_per_model] * len(remaining),
+                    [random_state] * len(remaining),
+                    [backend] * len(remaining)
+                ))
+                trials.sort(key=lambda t: t['val_auc_score'], reverse=True)
+                rungs.append({'rung': rung, 'rows': n_rows, 'trials': trials})
+                if len(trials) == 1 or n_rows >= n_fit_total:
+                    break
+                remaining = [t['params'] for t in trials[:max(1, len(trials) // eta)]]
+                rung += 1
+
+    best = rungs[-1]['trials'][0]
+    summary = {
+        'strategy': 'successive_halving',
+        'backend': backend,
+        'eta': eta,
+        'candidates': len(candidates),
+        'trials_run': sum(len(r['trials']) for r in rungs),
+        'parallel_trials': parallel_trials,
+        'jobs_per_model': jobs_per_model,
+        'best_params': best['params'],
+        'best_val_auc_score': best['val_auc_score'],
+        'search_seconds': round(time.perf_counter() - start, 3),
+        'rungs': [
+            {'rung': r['rung'], 'rows': r['rows'], 'trials': [
+                {'params': t['params'], 'val_auc_score': t['val_auc_score'], 'fit_seconds': t['fit_seconds']}
+                for t in r['trials']
+            ]}
+            for r in rungs
+        ]
+    }
+    return best['params'], summary
@@ -0,0 +1,181 @@
+"""
+Vectorized missing-value imputation for pipeline transformer blocks.
+
+Statistics for all numeric columns are computed in one NaN-aware NumPy pass
+(split across threads for wide frames) and filled with a single in-place
+fillna, instead of sorting Python lists and copying a sub-frame per column.
+Chunked input is supported through mergeable statistics.
+"""
+import os
+import warnings
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mlops_demo.utils.streaming_stats import QuantileSketch, RunningMoments
+
+STRATEGIES = ('median', 'mean', 'mode', 'constant')
+PARALLEL_MIN_COLUMNS = 16
+
+
+def _column_groups(n_columns, n_jobs):
+    n_groups = max(1, min(n_jobs, n_columns))
+    return [group for group in np.array_split(np.arange(n_columns), n_groups) if group.size]
+
+
+def _nan_mode(values):
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return np.nan
+    # Sorted uniques: argmax breaks ties on the smallest value
+    uniques, counts = np.unique(values, return_counts=True)
+    return uniques[np.argmax(counts)]
+
+
+def _most_common(counts):
+    """Most frequent value of {value: count}; ties go to the smallest value, like _nan_mode"""
+    top = max(counts.values())
+    tied = [value for value, count in counts.items() if count == top]
+    try:
+        return min(tied)
+    except TypeError:
+        # Mixed types in an object column
+        return min(tied, key=str)
+
+
+class Imputer:
+    """
+    Fill missing values with a per-column statistic.
+
+    strategy: 'median', 'mean', 'mode' or 'constant' (uses fill_value)
+    n_jobs: threads used to compute statistics on wide frames (-1 = all cores)
+
+    Non-numeric columns support 'mode' and 'constant' only; other strategies
+    leave them untouched.
+    """
+
+    def __init__(self, strategy='median', fill_value=None, columns=None, n_jobs=-1):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown imputation strategy '{strategy}', expected one of {STRATEGIES}")
+        if strategy == 'constant' and fill_value is None:
+            raise ValueError("strategy='constant' requires a fill_value")
+        self.strategy = strategy
+        self.fill_value = fill_value
+        self.columns = columns
+        self.n_jobs = n_jobs
+        self.statistics_ = None
+
+    def _n_jobs(self):
+        if self.n_jobs in (None, -1):
+            return os.cpu_count() or 1
+        return self.n_jobs
+
+    def _numeric_columns(self, df):
+        columns = self.columns if self.columns is not None else list(df.columns)
+        return [col for col in columns if df[col].dtype.kind in 'biuf']
+
+    def _other_columns(self, df):
+        columns = self.columns if self.columns is not None else list(df.columns)
+        return [col for col in columns if df[col].dtype.kind not in 'biuf']
+
+    def _numeric_statistics(self, values):
+        if self.strategy == 'median':
+            reducer = lambda block: np.nanmedian(block, axis=0)
+        elif self.strategy == 'mean':
+            reducer = lambda block: np.nanmean(block, axis=0)
+        else:
+            reducer = lambda block: np.array([_nan_mode(block[:, i]) for i in range(block.shape[1])])
+
+        n_columns = values.shape[1]
+        n_jobs = self._n_jobs()
+        if n_jobs == 1 or n_columns < PARALLEL_MIN_COLUMNS:
+            return reducer(values)
+
+        groups = _column_groups(n_columns, n_jobs)
+        result = np.empty(n_columns)
+        with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+            for group, stats in zip(groups, pool.map(lambda g: reducer(values[:, g]), groups)):
+                result[group] = stats
+        return result
+
+    def fit(self, df):
+        """Compute fill values from a DataFrame"""
+        if self.strategy == 'constant':
+            columns = self.columns if self.columns is not None else list(df.columns)
+            self.statistics_ = {col: self.fill_value for col in columns}
+            return self
+
+        statistics = {}
+        numeric = self._numeric_columns(df)
+        if numeric:
+            values = df[numeric].to_numpy(dtype=np.float64)
+            with warnings.catch_warnings():
+                # All-NaN columns yield NaN, which fillna then leaves as is
+                warnings.simplefilter('ignore', RuntimeWarning)
+                statistics.update(zip(numeric, self._numeric_statistics(values).tolist()))
+
+        if self.strategy == 'mode':
+            for col in self._other_columns(df):
+                counts = df[col].value_counts(dropna=True)
+                if len(counts):
+                    statistics[col] = _most_common(counts.to_dict())
+
+        self.statistics_ = statistics
+        return self
+
+    def fit_chunks(self, chunks, sketch_size=1024):
+        """
+        Compute fill values from an iterable of DataFrame chunks in bounded memory.
+        Medians come from a quantile sketch, so they are approximate.
+        """
+        if self.strategy == 'constant':
+            first = next(iter(chunks))
+            return self.fit(first)
+
+        numeric = None
+        moments = sketches = None
+        counters = {}
+        for chunk in chunks:
+            if numeric is None:
+                numeric = self._numeric_columns(chunk)
+                moments = RunningMoments(len(numeric))
+                sketches = [QuantileSketch(k=sketch_size, seed=i) for i in range(len(numeric))]
+            values = chunk[numeric].to_numpy(dtype=np.float64)
+            if self.strategy == 'mean':
+                moments.update(values)
+            elif self.strategy == 'median':
+                for i, sketch in enumerate(sketches):
+                    sketch.update(values[:, i])
+            else:
+                for col in numeric + self._other_columns(chunk):
+                    counters.setdefault(col, Counter()).update(chunk[col].value_counts(dropna=True).to_dict())
+
+        if self.strategy == 'mean':
+            statistics = dict(zip(numeric, np.where(moments.count > 0, moments.mean, np.nan).tolist()))
+        elif self.strategy == 'median':
+            statistics = {col: sketch.quantile(0.5) for col, sketch in zip(numeric, sketches)}
+        else:
+            statistics = {col: _most_common(counter) for col, counter in counters.items() if counter}
+
+        self.statistics_ = statistics
+        return self
+
+    def transform(self, df, inplace=True):
+        """Fill NaNs with the fitted statistics (in place by default)"""
+        if self.statistics_ is None:
+            raise RuntimeError('Imputer must be fitted before transform')
+        values = {col: value for col, value in self.statistics_.items()
+                  if col in df.columns and value == value}
+        if inplace:
+            df.fillna(value=values, inplace=True)
+            return df
+        return df.fillna(value=values)
+
+    def transform_chunks(self, chunks):
+        """Lazily fill each chunk of a large table"""
+        for chunk in chunks:
+            yield self.transform(chunk, inplace=True)
+
+    def fit_transform(self, df, inplace=True):
+        return self.fit(df).transform(df, inplace=inplace)
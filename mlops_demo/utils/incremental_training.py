@@ -0,0 +1,106 @@
+"""
+Incremental (warm-start) retraining of the registered RandomForest.
+
+Instead of refitting on the full history, new trees are fitted on the newly
+arrived partition and appended to the currently registered forest. Each tree
+remembers which partition it was fitted on, so a sliding window can age out
+trees from old partitions.
+"""
+import json
+import os
+import zlib
+
+import joblib
+
+from mlops_demo.utils.paths import REGISTRY_PATH
+from mlops_demo.utils.registry_catalog import RegistryCatalog
+
+
+def load_registered_model(registry_path=REGISTRY_PATH, with_model=True):
+    """
+    Load the currently served model (registry catalog, else latest.json).
+    Returns dict(model, scaler, imputation, version, path, lineage) or None if
+    nothing is registered. with_model=False skips unpickling the forest.
+    """
+    catalog_path = os.path.join(registry_path, 'catalog.db')
+    latest_info = RegistryCatalog(catalog_path, read_only=True).current() if os.path.exists(catalog_path) else None
+    latest_path = os.path.join(registry_path, 'latest.json')
+    if latest_info is None:
+        if not os.path.exists(latest_path):
+            return None
+        with open(latest_path, 'r') as f:
+            latest_info = json.load(f)
+
+    lineage = {}
+    lineage_path = os.path.join(latest_info['path'], 'lineage.json')
+    if os.path.exists(lineage_path):
+        with open(lineage_path, 'r') as f:
+            lineage = json.load(f)
+
+    imputation = None
+    imputation_path = os.path.join(latest_info['path'], 'imputation.json')
+    if os.path.exists(imputation_path):
+        with open(imputation_path, 'r') as f:
+            imputation = json.load(f)
+
+    return {
+        'model': joblib.load(os.path.join(latest_info['path'], 'model.pkl')) if with_model else None,
+        'scaler': joblib.load(os.path.join(latest_info['path'], 'scaler.pkl')),
+        'imputation': imputation,
+        'version': latest_info['version'],
+        'path': latest_info['path'],
+        'lineage': lineage
+    }
+
+
+def initial_tree_partitions(model, lineage):
+    """
+    Tree -> partition bookkeeping of a registered model. Models trained from
+    scratch count as a single partition covering all their trees.
+    """
+    incremental = lineage.get('incremental') or {}
+    if incremental.get('tree_partitions'):
+        return [list(group) for group in incremental['tree_partitions']]
+    data_version = (lineage.get('data_lineage') or {}).get('version') or lineage.get('version', 'initial')
+    return [[data_version, len(model.estimators_)]]
+
+
+def apply_window(model, tree_partitions, window_partitions=None, max_trees=None):
+    """
+    Drop the oldest trees so that at most `window_partitions` partitions and
+    `max_trees` trees remain. Returns the pruned tree_partitions.
+    """
+    tree_partitions = [list(group) for group in tree_partitions]
+    dropped = 0
+    while len(tree_partitions) > 1 and (
+        (window_partitions and len(tree_partitions) > window_partitions)
+        or (max_trees and sum(n for _, n in tree_partitions) > max_trees)
+    ):
+        _, n_trees = tree_partitions.pop(0)
+        dropped += n_trees
+
+    if dropped:
+        model.estimators_ = model.estimators_[dropped:]
+        model.n_estimators = len(model.estimators_)
+    return tree_partitions, dropped
+
+
+def warm_start_update(model, X, y, partition, tree_partitions, trees_per_partition=25,
+                      window_partitions=None, max_trees=None, n_jobs=-1):
+    """
+    Append `trees_per_partition` trees fitted on (X, y) to `model`, then apply
+    the sliding window. Returns (model, tree_partitions, trees_dropped).
+    """
+    # Reseed per partition: after the window drops old trees the default seed
+    # stream would hand out the same tree seeds again
+    model.set_params(
+        warm_start=True,
+        n_estimators=len(model.estimators_) + trees_per_partition,
+        n_jobs=n_jobs,
+        random_state=zlib.crc32(str(partition).encode())
+    )
+    model.fit(X, y)
+    tree_partitions = tree_partitions + [[partition, trees_per_partition]]
+    tree_partitions, dropped = apply_window(model, tree_partitions, window_partitions, max_trees)
+    model.set_params(warm_start=False)
+    return model, tree_partitions, dropped
@@ -0,0 +1,110 @@
+"""
+Model backends for the churn training block.
+
+A backend knows how to build its estimator from hyperparameters, which
+defaults and search space to use, and how to compute feature importance.
+Serving only relies on predict/predict_proba, so any registered backend can
+be loaded by the prediction service and the prediction blocks.
+
+random_forest            RandomForestClassifier (the original model)
+hist_gradient_boosting   HistGradientBoostingClassifier: features binned into
+                         at most 255 buckets, far fewer and shallower trees,
+                         so training scales with rows and the model stays small
+"""
+import numpy as np
+
+
+class ModelBackend:
+    name = None
+    default_hyperparameters = {}
+    search_space = {}
+    supports_warm_start_partitions = False
+
+    def estimator_class(self):
+        raise NotImplementedError
+
+    @property
+    def model_type(self):
+        return self.estimator_class().__name__
+
+    def build(self, hyperparameters, n_jobs=-1):
+        return self.estimator_class()(**hyperparameters)
+
+    def feature_importance(self, model, X, y, feature_names):
+        return dict(zip(feature_names, map(float, model.feature_importances_)))
+
+
+class RandomForestBackend(ModelBackend):
+    name = 'random_forest'
+    default_hyperparameters = {
+        'n_estimators': 100,
+        'max_depth': 10,
+        'random_state': 42
+    }
+    search_space = {
+        'n_estimators': [50, 100, 200],
+        'max_depth': [6, 10, 16, None],
+        'min_samples_leaf': [1, 2, 5]
+    }
+    supports_warm_start_partitions = True
+
+    def estimator_class(self):
+        from sklearn.ensemble import RandomForestClassifier
+        return RandomForestClassifier
+
+    def build(self, hyperparameters, n_jobs=-1):
+        return self.estimator_class()(**hyperparameters, n_jobs=n_jobs)
+
+
+class HistGradientBoostingBackend(ModelBackend):
+    name = 'hist_gradient_boosting'
+    default_hyperparameters = {
+        'max_iter': 200,
+        'learning_rate': 0.1,
+        'max_leaf_nodes': 31,
+        'max_depth': 6,
+        'max_bins': 255,
+        'early_stopping': 'auto',
+        'random_state': 42
+    }
+    search_space = {
+        'max_iter': [100, 200, 400],
+        'learning_rate': [0.05, 0.1, 0.2],
+        'max_leaf_nodes': [15, 31, 63]
+    }
+
+    def estimator_class(self):
+        from sklearn.ensemble import HistGradientBoostingClassifier
+        return HistGradientBoostingClassifier
+
+    def feature_importance(self, model, X, y, feature_names, max_rows=2000):
+        """No impurity importances for boosting: use permutation importance on a sample"""
+        from sklearn.inspection import permutation_importance
+
+        rng = np.random.default_rng(0)
+        rows = rng.choice(len(y), size=min(max_rows, len(y)), replace=False)
+        result = permutation_importance(
+            model, np.asarray(X)[rows], np.asarray(y)[rows],
+            scoring='roc_auc', n_repeats=3, random_state=0
+        )
+        return dict(zip(feature_names, map(float, result.importances_mean)))
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (RandomForestBackend(), HistGradientBoostingBackend())
+}
+
+
+def get_backend(name='random_forest'):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown model backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]
+
+
+def model_params(model):
+    """JSON-serialisable get_params() of a fitted estimator, for lineage"""
+    return {
+        name: value for name, value in model.get_params().items()
+        if value is None or isinstance(value, (str, int, float, bool))
+    }
@@ -0,0 +1,221 @@
+"""
+Process-wide cache of the served model.
+
+Prediction blocks and the prediction client get the served version through
+get_model(): the model is unpickled once per process and kept until the
+registry serves another version (catalog.db / latest.json are stat-ed on each
+call, the version is only re-resolved when one of them changed).
+
+Mage runs every pipeline run in a process forked from the scheduler, so a
+module-level cache would start empty in each run. The scheduler is therefore
+started through this module: the cache is warmed in the scheduler process
+before Mage starts, and a watcher thread reloads it on promotion, so every
+forked run inherits a loaded model. The watcher is restarted right away only
+in the direct children of the process that warmed the cache with
+watch_forks=True (Mage's scheduler loop); other forks, such as pool workers,
+only restart it on their first get_model() call.
+
+    python -m mlops_demo.utils.model_cache start mlops_demo --instance-type scheduler
+"""
+import os
+import sys
+import threading
+import time
+
+from mlops_demo.utils.paths import REGISTRY_PATH
+
+# registry path -> {'stamp', 'version', 'path', 'scorer', 'load_seconds'}
+_MODELS = {}
+_LOCK = threading.Lock()
+_STATS = {'hits': 0, 'loads': 0, 'load_seconds': 0.0}
+# Set by warm(watch_seconds=...): {'registry_path', 'watch_seconds'}
+_WATCH = {}
+# pid of the process whose direct children restart the watcher at fork
+_WATCH_FORKS_OF = None
+# Watcher of a forked parent, restarted by the child's first get_model()
+_PENDING_WATCH = {}
+
+
+def _after_fork():
+    global _LOCK
+    # A fork taken while the watcher held the lock would leave it locked forever
+    _LOCK = threading.Lock()
+    if not _WATCH:
+        return
+    # Threads do not survive fork: Mage forks its scheduler loop from the
+    # process that warmed the cache, which must keep following promotions
+    if os.getppid() == _WATCH_FORKS_OF:
+        _start_watcher()
+    else:
+        _PENDING_WATCH.update(_WATCH)
+        _WATCH.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+
+
+def registry_stamp(registry_path):
+    """Modification stamp of the served-version pointers (catalog and latest.json)"""
+    stamp = []
+    for name in ('catalog.db', 'latest.json'):
+        try:
+            stat = os.stat(os.path.join(registry_path, name))
+            stamp.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+        except FileNotFoundError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def resolve_served_version(registry_path=REGISTRY_PATH):
+    """Served {'version', 'path'} (catalog, else latest.json), or None if nothing is registered"""
+    catalog_path = os.path.join(registry_path, 'catalog.db')
+    if os.path.exists(catalog_path):
+        from mlops_demo.utils.registry_catalog import RegistryCatalog
+
+        current = RegistryCatalog(catalog_path, read_only=True).current()
+        if current:
+            return current
+    latest_path = os.path.join(registry_path, 'latest.json')
+    if not os.path.exists(latest_path):
+        return None
+    import json
+
+    with open(latest_path, 'r') as f:
+        return json.load(f)
+
+
+def get_model(registry_path=REGISTRY_PATH):
+    """
+    Cached scorer of the served version (see batch_scoring.load_scorer).
+    Returns (entry, cache_hit); entry holds version, path, scorer and the
+    seconds its loading took.
+    """
+    if _PENDING_WATCH:
+        _resume_watcher()
+    stamp = registry_stamp(registry_path)
+    entry = _MODELS.get(registry_path)
+    if entry is not None and entry['stamp'] == stamp:
+        _STATS['hits'] += 1
+        return entry, True
+    with _LOCK:
+        entry = _MODELS.get(registry_path)
+        if entry is not None and entry['stamp'] == stamp:
+            _STATS['hits'] += 1
+            return entry, True
+        served = resolve_served_version(registry_path)
+        if served is None:
+            raise ValueError('No trained model found. Please run the training pipeline first.')
+        cache_hit = entry is not None and entry['version'] == served['version']
+        if not cache_hit:
+            from mlops_demo.utils.batch_scoring import load_scorer
+
+            start = time.perf_counter()
+            scorer = load_scorer(served['path'])
+            entry = {
+                'version': served['version'],
+                'path': served['path'],
+                'scorer': scorer,
+                'load_seconds': time.perf_counter() - start
+            }
+            _STATS['loads'] += 1
+            _STATS['load_seconds'] += entry['load_seconds']
+        else:
+            _STATS['hits'] += 1
+        # Same version behind a touched pointer: keep the model, remember the new stamp
+        entry = dict(entry, stamp=stamp)
+        _MODELS[registry_path] = entry
+        return entry, cache_hit
+
+
+def cache_info():
+    """Hits, loads and cumulated load time of this process, and the cached versions"""
+    return dict(_STATS, versions={path: entry['version'] for path, entry in _MODELS.items()})
+
+
+def clear_cache():
+    """Drop every cached model (next call reloads from the registry)"""
+    with _LOCK:
+        _MODELS.clear()
+
+
+def _load(registry_path):
+    try:
+        entry, cache_hit = get_model(registry_path)
+    except ValueError:
+        return None
+    if not cache_hit:
+        print(f"🔥 Model cache: {entry['version']} loaded in {entry['load_seconds'] * 1000:.0f} ms")
+    return entry['version']
+
+
+def _watch(registry_path, watch_seconds):
+    while True:
+        time.sleep(watch_seconds)
+        try:
+            _load(registry_path)
+        except Exception as e:
+            print(f"⚠️ Model cache refresh failed: {e}")
+
+
+def _start_watcher():
+    threading.Thread(target=_watch, kwargs=dict(_WATCH), name='model-cache-watch', daemon=True).start()
+
+
+def _resume_watcher():
+    with _LOCK:
+        if not _PENDING_WATCH or _WATCH:
+            return
+        _WATCH.update(_PENDING_WATCH)
+        _PENDING_WATCH.clear()
+    _start_watcher()
+
+
+def warm(registry_path=REGISTRY_PATH, watch_seconds=None, watch_forks=False):
+    """
+    Load the served model now; with watch_seconds, a daemon thread then
+    checks the registry at that interval and loads newly promoted versions.
+    With watch_forks, the processes this one forks restart the thread at
+    once (other forks restart it on their first get_model() call).
+    Returns the served version, or None when nothing is registered yet.
+    """
+    global _WATCH_FORKS_OF
+    version = _load(registry_path)
+    if watch_seconds and not _WATCH:
+        _WATCH.update(registry_path=registry_path, watch_seconds=watch_seconds)
+        _start_watcher()
+    if watch_forks:
+        _WATCH_FORKS_OF = os.getpid()
+    return version
+
+
+def main(argv=None):
+    """`start <mage start arguments>`: warm the cache, then run `mage start` in this process"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in ('start', 'warm'):
+        print('usage: python -m mlops_demo.utils.model_cache start|warm [mage start arguments]')
+        return 2
+    registry_path = os.environ.get('MODEL_CACHE_REGISTRY_PATH', REGISTRY_PATH)
+    watch_seconds = float(os.environ.get('MODEL_CACHE_WATCH_SECONDS', 30))
+    try:
+        version = warm(
+            registry_path,
+            watch_seconds=watch_seconds if argv[0] == 'start' else None,
+            watch_forks=argv[0] == 'start'
+        )
+    except Exception as e:
+        # The scheduler must start even with a broken registry: runs then load the model themselves
+        print(f"⚠️ Model cache not warmed: {e}")
+        version = None
+    if version is None:
+        print(f"⚠️ Model cache: no served model in {registry_path} yet")
+    if argv[0] == 'warm':
+        return 0
+
+    from mage_ai.cli.main import app
+
+    sys.argv = ['mage'] + argv
+    return app()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Filesystem locations shared by the pipeline blocks.
+
+Everything hangs off USER_CODE_PATH (set by docker-compose to /home/src) so the
+blocks can also be exercised outside the Mage containers.
+"""
+import os
+
+USER_CODE_PATH = os.environ.get('USER_CODE_PATH', '/home/src')
+PROJECT_PATH = os.path.join(USER_CODE_PATH, 'mlops_demo')
+
+MODELS_PATH = os.path.join(PROJECT_PATH, 'models')
+REGISTRY_PATH = os.path.join(PROJECT_PATH, 'model_registry')
+REGISTRY_CATALOG_PATH = os.path.join(REGISTRY_PATH, 'catalog.db')
+ARTIFACT_STORE_PATH = os.path.join(REGISTRY_PATH, 'objects')
+BATCH_SCORES_PATH = os.path.join(PROJECT_PATH, 'batch_scores')
+PREDICTION_QUEUE_PATH = os.environ.get(
+    'PREDICTION_QUEUE_PATH',
+    os.path.join(PROJECT_PATH, 'prediction_queue', 'queue.db')
+)
+BLOCK_CACHE_PATH = os.environ.get(
+    'BLOCK_CACHE_PATH',
+    os.path.join(PROJECT_PATH, '.block_cache')
+)
+FEATURE_STORE_PATH = os.environ.get(
+    'FEATURE_STORE_PATH',
+    os.path.join(PROJECT_PATH, 'feature_store')
+)
+SOURCE_CACHE_PATH = os.environ.get(
+    'SOURCE_CACHE_PATH',
+    os.path.join(PROJECT_PATH, '.source_cache')
+)
+
+SCALER_PATH = os.path.join(MODELS_PATH, 'scaler.pkl')
+MODEL_PATH = os.path.join(MODELS_PATH, 'churn_model.pkl')
+METRICS_PATH = os.path.join(MODELS_PATH, 'metrics.json')
+IMPUTATION_PATH = os.path.join(MODELS_PATH, 'imputation.json')
+FEATURE_PROFILE_PATH = os.path.join(MODELS_PATH, 'feature_profile.json')
+PREPROCESSED_PATH = os.path.join(MODELS_PATH, 'preprocessed')
+
+
+def block_source_path(relative_path):
+    """Absolute path of a block file, e.g. 'transformers/model_training.py'"""
+    return os.path.join(PROJECT_PATH, relative_path)
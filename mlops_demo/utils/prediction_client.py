@@ -0,0 +1,125 @@
+"""
+In-process churn prediction client for the served model.
+
+Replaces the predict.py script generated by the online_prediction pipeline,
+which imported pandas and sklearn up front and reloaded both pickles on every
+call. Here:
+
+- importing the module only pulls the standard library basics; numpy,
+  pandas, joblib and sklearn (and even json) are imported on the first
+  prediction
+- the served model comes from model_cache: loaded once per process and kept
+  until the registry serves another version
+- predict() scores one customer, predict_batch() scores many in a single
+  vectorized call (scaling, imputation and dtype as in batch_scoring)
+- a customer can be given as a bare customer_id (or a dict with customer_id
+  and some features overriding the stored ones): its features come from the
+  feature store materialized by the training pipeline
+
+    from mlops_demo.utils.prediction_client import predict_churn, batch_predict
+"""
+from mlops_demo.utils.model_cache import get_model
+from mlops_demo.utils.paths import FEATURE_STORE_PATH, REGISTRY_PATH
+
+# One store reader per path and process, like the model cache
+_FEATURE_STORES = {}
+
+
+def get_feature_store(path=FEATURE_STORE_PATH):
+    from mlops_demo.prediction_service.feature_store import FeatureStore
+
+    if path not in _FEATURE_STORES:
+        _FEATURE_STORES[path] = FeatureStore(path)
+    return _FEATURE_STORES[path]
+
+
+class PredictionClient:
+
+    def __init__(self, registry_path=REGISTRY_PATH, feature_store_path=FEATURE_STORE_PATH):
+        self.registry_path = registry_path
+        self.feature_store_path = feature_store_path
+
+    def load(self):
+        """Cached scorer of the served version (see model_cache.get_model)"""
+        return get_model(self.registry_path)[0]
+
+    @property
+    def version(self):
+        return self.load()['version']
+
+    def predict_batch(self, data):
+        """
+        Score many customers at once (list of dicts or customer_ids, or
+        DataFrame). Returns a DataFrame with churn_probability, prediction and
+        risk_level (and customer_id when given), in input order. Raises
+        KeyError for customer_ids the feature store does not know that come
+        without any feature.
+        """
+        import pandas as pd
+
+        from mlops_demo.utils.batch_scoring import score_frame
+        from mlops_demo.utils.features import FEATURE_NAMES, ID_COLUMN
+
+        entry = self.load()
+        if isinstance(data, pd.DataFrame):
+            df = data
+        else:
+            df = pd.DataFrame.from_records([
+                item if isinstance(item, dict) else {ID_COLUMN: item} for item in data
+            ])
+        if ID_COLUMN in df.columns and self.feature_store_path:
+            df, found = get_feature_store(self.feature_store_path).fill(df)
+            featureless = ~found & df.reindex(columns=FEATURE_NAMES).isna().all(axis=1).to_numpy()
+            if featureless.any():
+                raise KeyError(f"Unknown customer_id {df.loc[featureless, ID_COLUMN].tolist()}")
+        scores = score_frame(entry['scorer'], df)
+        scores['model_version'] = entry['version']
+        return scores
+
+    def predict(self, input_data):
+        """Score one customer; same result dict as the generated predict_churn"""
+        return self.to_results([input_data], self.predict_batch([input_data]))[0]
+
+    @staticmethod
+    def to_results(inputs, scores):
+        from datetime import datetime
+
+        timestamp = datetime.now().isoformat()
+        results = []
+        for input_data, (churn, prediction, risk_level, version) in zip(inputs, zip(
+            scores['churn_probability'].tolist(), scores['prediction'].tolist(),
+            scores['risk_level'].astype(str).tolist(), scores['model_version'].tolist()
+        )):
+            results.append({
+                'input_data': input_data,
+                'prediction': prediction,
+                'prediction_label': 'Will Churn' if prediction == 1 else 'Will Not Churn',
+                'probability': {
+                    'no_churn': 1.0 - churn,
+                    'churn': churn
+                },
+                'confidence': max(churn, 1.0 - churn),
+                'risk_level': risk_level,
+                'model_version': version,
+                'prediction_timestamp': timestamp,
+                'status': 'success'
+            })
+        return results
+
+
+def predict_churn(input_data, registry_path=REGISTRY_PATH):
+    """Churn prediction for one customer; errors are returned, not raised"""
+    try:
+        return PredictionClient(registry_path).predict(input_data)
+    except Exception as e:
+        return {'error': str(e), 'status': 'error'}
+
+
+def batch_predict(data_list, registry_path=REGISTRY_PATH):
+    """Churn predictions for many customers, scored in one vectorized call"""
+    data_list = list(data_list)
+    try:
+        client = PredictionClient(registry_path)
+        return client.to_results(data_list, client.predict_batch(data_list))
+    except Exception as e:
+        return [{'error': str(e), 'status': 'error'} for _ in data_list]
@@ -0,0 +1,638 @@
+"""
+Coalesced execution of API-triggered predictions.
+
+Triggering asynch_prediction_pipeline once per prediction pays a whole Mage
+pipeline run (scheduling, process start, model lookup) for a few milliseconds
+of inference. Here requests are appended to a durable SQLite queue (a local
+stand-in for the compose Redis) and a dispatcher launches one pipeline run per
+batch, as soon as `max_batch_size` requests are waiting or the oldest one has
+waited `max_wait_seconds`. The run (load_model_and_make_prediction with the
+`batch_id` variable) scores the whole batch in one vectorized call and stores
+one result per request id.
+
+Requests survive restarts. A batch whose run cannot be started, exits with
+an error or has no result after `claim_timeout` seconds is retried with
+exponential backoff (a retry waits for a free run slot like a new batch), and
+failed after `max_attempts` runs.
+
+    python -m mlops_demo.utils.prediction_queue serve --port 5001
+    python -m mlops_demo.utils.prediction_queue enqueue '{"account_age": 36, ...}'
+    python -m mlops_demo.utils.prediction_queue result <request_id>
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from mlops_demo.utils.paths import PREDICTION_QUEUE_PATH, REGISTRY_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS requests (
+    request_id TEXT PRIMARY KEY,
+    input_data TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    batch_id TEXT,
+    enqueued_at REAL NOT NULL,
+    completed_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_requests_status ON requests (status, enqueued_at);
+CREATE INDEX IF NOT EXISTS idx_requests_batch ON requests (batch_id);
+
+CREATE TABLE IF NOT EXISTS batches (
+    batch_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    claimed_at REAL NOT NULL,
+    retry_at REAL,
+    completed_at REAL,
+    model_version TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_batches_status ON batches (status, claimed_at);
+"""
+
+# Request status: queued -> claimed (in a batch whose run was launched) -> done | failed
+QUEUED, CLAIMED, DONE, FAILED = 'queued', 'claimed', 'done', 'failed'
+# Batch status: claimed -> done | failed, or claimed -> retry (run failed, waiting for
+# `retry_at`) -> claimed again; the requests of a batch to retry stay claimed
+RETRY = 'retry'
+
+
+class PredictionQueue:
+
+    def __init__(self, path=None):
+        self.path = path or PREDICTION_QUEUE_PATH
+        self._schema_ready = False
+
+    def connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._schema_ready:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    # ---------------------------------------------------------------- clients
+
+    def enqueue(self, input_data, request_id=None):
+        return self.enqueue_many([input_data], [request_id] if request_id else None)[0]
+
+    def enqueue_many(self, inputs, request_ids=None):
+        """Append prediction requests; returns their request ids"""
+        request_ids = list(request_ids or (uuid.uuid4().hex for _ in inputs))
+        now = time.time()
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    'INSERT INTO requests (request_id, input_data, enqueued_at) VALUES (?, ?, ?)',
+                    [(request_id, json.dumps(data), now) for request_id, data in zip(request_ids, inputs)]
+                )
+        finally:
+            conn.close()
+        return request_ids
+
+    def result(self, request_id):
+        """{'request_id', 'status', 'batch_id', 'result' | 'error'}, or None for an unknown id"""
+        return self.results([request_id]).get(request_id)
+
+    def results(self, request_ids):
+        request_ids = list(request_ids)
+        conn = self.connect()
+        try:
+            rows = []
+            # Stay under SQLite's bound parameter limit
+            for offset in range(0, len(request_ids), 500):
+                chunk = request_ids[offset:offset + 500]
+                rows += conn.execute(
+                    'SELECT request_id, status, batch_id, enqueued_at, completed_at, result, error FROM requests '
+                    f"WHERE request_id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+        finally:
+            conn.close()
+        results = {}
+        for row in rows:
+            entry = {'request_id': row['request_id'], 'status': row['status'], 'batch_id': row['batch_id']}
+            if row['result'] is not None:
+                entry['result'] = json.loads(row['result'])
+            if row['error'] is not None:
+                entry['error'] = row['error']
+            if row['completed_at'] is not None:
+                entry['latency_ms'] = round((row['completed_at'] - row['enqueued_at']) * 1000, 1)
+            results[row['request_id']] = entry
+        return results
+
+    def wait(self, request_id, timeout=30.0, poll_seconds=0.02):
+        """Result of a request once done or failed (None if still pending after `timeout`)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = self.result(request_id)
+            if entry is None or entry['status'] in (DONE, FAILED):
+                return entry
+            if time.monotonic() >= deadline:
+                return entry
+            time.sleep(poll_seconds)
+
+    # ------------------------------------------------------------- dispatcher
+
+    def pending(self):
+        """(number of queued requests, enqueue time of the oldest)"""
+        conn = self.connect()
+        try:
+            count, oldest = conn.execute(
+                'SELECT COUNT(*), MIN(enqueued_at) FROM requests WHERE status = ?', (QUEUED,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return count, oldest
+
+    def in_flight(self):
+        conn = self.connect()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM batches WHERE status = ?', (CLAIMED,)).fetchone()[0]
+        finally:
+            conn.close()
+
+    def claim(self, max_size):
+        """Move up to `max_size` of the oldest queued requests into a new batch; returns its id"""
+        conn = self.connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            request_ids = [row[0] for row in conn.execute(
+                'SELECT request_id FROM requests WHERE status = ? ORDER BY enqueued_at, rowid LIMIT ?',
+                (QUEUED, max_size)
+            )]
+            if not request_ids:
+                conn.rollback()
+                return None
+            batch_id = f"b_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+            conn.execute(
+                'INSERT INTO batches (batch_id, status, size, claimed_at) VALUES (?, ?, ?, ?)',
+                (batch_id, CLAIMED, len(request_ids), time.time())
+            )
+            conn.executemany(
+                'UPDATE requests SET status = ?, batch_id = ? WHERE request_id = ?',
+                [(CLAIMED, batch_id, request_id) for request_id in request_ids]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return batch_id
+
+    def reclaim(self):
+        """Claim again the batch to retry that is due first; returns its id"""
+        now = time.time()
+        conn = self.connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT batch_id FROM batches WHERE status = ? AND retry_at <= ? ORDER BY retry_at LIMIT 1',
+                (RETRY, now)
+            ).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+            conn.execute(
+                'UPDATE batches SET status = ?, attempts = attempts + 1, claimed_at = ?, retry_at = NULL '
+                'WHERE batch_id = ?', (CLAIMED, now, row['batch_id'])
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return row['batch_id']
+
+    def retry(self, batch_id, error, max_attempts, backoff):
+        """
+        Schedule another run of a claimed batch whose run failed, `backoff`
+        seconds after the first failure and twice as long after each next
+        one; fail it once it had `max_attempts` runs. Returns whether it
+        will be retried.
+        """
+        now = time.time()
+        conn = self.connect()
+        try:
+            with conn:
+                row = conn.execute(
+                    'SELECT attempts FROM batches WHERE batch_id = ? AND status = ?', (batch_id, CLAIMED)
+                ).fetchone()
+                if row is None:
+                    # Completed meanwhile, or already retried
+                    return False
+                if row['attempts'] < max_attempts:
+                    conn.execute(
+                        'UPDATE batches SET status = ?, error = ?, retry_at = ? WHERE batch_id = ?',
+                        (RETRY, error, now + backoff * 2 ** (row['attempts'] - 1), batch_id)
+                    )
+                    return True
+        finally:
+            conn.close()
+        self.fail(batch_id, f'{error} ({max_attempts} runs)')
+        return False
+
+    def stale_batches(self, claim_timeout):
+        """Ids of the batches claimed more than `claim_timeout` seconds ago without a result"""
+        conn = self.connect()
+        try:
+            return [row[0] for row in conn.execute(
+                'SELECT batch_id FROM batches WHERE status = ? AND claimed_at < ?',
+                (CLAIMED, time.time() - claim_timeout)
+            )]
+        finally:
+            conn.close()
+
+    # -------------------------------------------------------------- batch run
+
+    def batch_inputs(self, batch_id):
+        """[(request_id, input_data)] of a claimed batch (empty once completed)"""
+        conn = self.connect()
+        try:
+            rows = conn.execute(
+                'SELECT request_id, input_data FROM requests WHERE batch_id = ? AND status = ? ORDER BY rowid',
+                (batch_id, CLAIMED)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [(row['request_id'], json.loads(row['input_data'])) for row in rows]
+
+    def complete(self, batch_id, results, errors=None, model_version=None):
+        """Store one result (or error) per request and close the batch"""
+        now = time.time()
+        conn = self.connect()
+        try:
+            with conn:
+                conn.executemany(
+                    'UPDATE requests SET status = ?, result = ?, completed_at = ? WHERE request_id = ? AND batch_id = ?',
+                    [(DONE, json.dumps(result), now, request_id, batch_id) for request_id, result in results.items()]
+                )
+                conn.executemany(
+                    'UPDATE requests SET status = ?, error = ?, completed_at = ? WHERE request_id = ? AND batch_id = ?',
+                    [(FAILED, error, now, request_id, batch_id) for request_id, error in (errors or {}).items()]
+                )
+                conn.execute(
+                    'UPDATE batches SET status = ?, completed_at = ?, model_version = ? WHERE batch_id = ?',
+                    (DONE, now, model_version, batch_id)
+                )
+        finally:
+            conn.close()
+
+    def fail(self, batch_id, error):
+        now = time.time()
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute(
+                    'UPDATE requests SET status = ?, error = ?, completed_at = ? WHERE batch_id = ? AND status = ?',
+                    (FAILED, error, now, batch_id, CLAIMED)
+                )
+                conn.execute(
+                    'UPDATE batches SET status = ?, error = ?, completed_at = ? WHERE batch_id = ?',
+                    (FAILED, error, now, batch_id)
+                )
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------ maintenance
+
+    def stats(self):
+        conn = self.connect()
+        try:
+            requests = dict(conn.execute('SELECT status, COUNT(*) FROM requests GROUP BY status').fetchall())
+            batches = dict(conn.execute('SELECT status, COUNT(*) FROM batches GROUP BY status').fetchall())
+            done = conn.execute(
+                'SELECT COUNT(*), AVG(size) FROM batches WHERE status = ?', (DONE,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return {
+            'requests': requests,
+            'batches': batches,
+            'mean_batch_size': round(done[1], 1) if done[1] else None
+        }
+
+    def purge(self, older_than_seconds):
+        """Drop completed requests and batches older than `older_than_seconds`"""
+        cutoff = time.time() - older_than_seconds
+        conn = self.connect()
+        try:
+            with conn:
+                removed = conn.execute(
+                    'DELETE FROM requests WHERE status IN (?, ?) AND completed_at < ?', (DONE, FAILED, cutoff)
+                ).rowcount
+                conn.execute('DELETE FROM batches WHERE status IN (?, ?) AND completed_at < ?', (DONE, FAILED, cutoff))
+        finally:
+            conn.close()
+        return removed
+
+
+def score_batch(queue, batch_id, registry_path=REGISTRY_PATH):
+    """
+    Score every request of a batch with the served model in one vectorized
+    call and store the per-request results. Requests with a non-numeric
+    feature fail individually; missing features are imputed.
+    """
+    import pandas as pd
+
+    from mlops_demo.utils.batch_scoring import score_frame
+    from mlops_demo.utils.features import FEATURE_NAMES
+    from mlops_demo.utils.model_cache import get_model
+
+    start = time.perf_counter()
+    requests = queue.batch_inputs(batch_id)
+    summary = {'batch_id': batch_id, 'requests': len(requests), 'scored': 0, 'failed': 0}
+    if not requests:
+        # Already completed (e.g. a relaunched batch whose first run finished late)
+        return summary
+    try:
+        model, cache_hit = get_model(registry_path)
+        errors = {}
+        records = []
+        for request_id, input_data in requests:
+            if isinstance(input_data, dict):
+                records.append(input_data)
+            else:
+                errors[request_id] = 'input_data must be a JSON object'
+                records.append({})
+        df = pd.DataFrame.from_records(records, columns=FEATURE_NAMES)
+        for name in FEATURE_NAMES:
+            values = pd.to_numeric(df[name], errors='coerce')
+            for position in (values.isna() & df[name].notna()).to_numpy().nonzero()[0]:
+                errors.setdefault(requests[position][0], f'{name} must be a number')
+            df[name] = values
+        valid = [request_id not in errors for request_id, _ in requests]
+        valid_ids = [request_id for (request_id, _), keep in zip(requests, valid) if keep]
+        results = {}
+        if valid_ids:
+            scores = score_frame(model['scorer'], df[valid])
+        else:
+            scores = pd.DataFrame(columns=['churn_probability', 'prediction', 'risk_level'])
+
+        timestamp = pd.Timestamp.now().isoformat()
+        for request_id, churn, prediction, risk_level in zip(
+            valid_ids, scores['churn_probability'].tolist(), scores['prediction'].tolist(),
+            scores['risk_level'].astype(str).tolist()
+        ):
+            results[request_id] = {
+                'prediction': prediction,
+                'probability': {'no_churn': 1 - churn, 'churn': churn},
+                'risk_level': risk_level,
+                'model_version': model['version'],
+                'prediction_timestamp': timestamp
+            }
+        queue.complete(batch_id, results, errors, model['version'])
+    except Exception as e:
+        queue.fail(batch_id, str(e))
+        raise
+
+    summary.update(
+        scored=len(results),
+        failed=len(errors),
+        model_version=model['version'],
+        model_cache='hit' if cache_hit else 'load',
+        seconds=round(time.perf_counter() - start, 4)
+    )
+    return summary
+
+
+# ---------------------------------------------------------------- launchers
+# A launcher starts the pipeline run of one batch and returns without waiting.
+
+def trigger_launcher(url, timeout=10):
+    """POST to a Mage API trigger of asynch_prediction_pipeline (variables: batch_id)"""
+    import urllib.request
+
+    def launch(batch_id):
+        body = json.dumps({'pipeline_run': {'variables': {'batch_id': batch_id}}}).encode()
+        request = urllib.request.Request(url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+    return launch
+
+
+def command_launcher(command, stdout=None):
+    """
+    Run `command` (a list, '{batch_id}' substituted) in a child process.
+    `launch.reap()` returns the (batch_id, exit code) of the runs finished since
+    the last call.
+    """
+    running = []
+
+    def launch(batch_id):
+        process = subprocess.Popen([part.replace('{batch_id}', batch_id) for part in command], stdout=stdout)
+        running.append((batch_id, process))
+
+    def reap():
+        finished = [(batch_id, process.returncode) for batch_id, process in running if process.poll() is not None]
+        running[:] = [(batch_id, process) for batch_id, process in running if process.returncode is None]
+        return finished
+
+    launch.running = running
+    launch.reap = reap
+    return launch
+
+
+# The `mage` console script of the image (mage_ai.cli has no __main__)
+MAGE_CLI_COMMAND = [
+    'mage', 'run', 'mlops_demo', 'asynch_prediction_pipeline',
+    '--runtime-vars', '{"batch_id": "{batch_id}"}'
+]
+# Scores the batch in a plain Python process, without Mage (local runs, benchmarks)
+LOCAL_COMMAND = [sys.executable, '-m', 'mlops_demo.utils.prediction_queue', 'score', '{batch_id}']
+
+
+class Dispatcher:
+
+    def __init__(self, queue, launch, max_batch_size=500, max_wait_seconds=1.0, max_in_flight=2,
+                 claim_timeout=300.0, max_attempts=3, retry_backoff=5.0):
+        self.queue = queue
+        self.launch = launch
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.max_in_flight = max_in_flight
+        self.claim_timeout = claim_timeout
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.launched = 0
+
+    def _retry(self, batch_id, error):
+        retried = self.queue.retry(batch_id, error, self.max_attempts, self.retry_backoff)
+        print(f"⚠️ Batch {batch_id}: {error}" + ('' if retried else ', batch failed'))
+
+    def _launch(self, batch_id):
+        """Start the run of a claimed batch; on failure the batch is retried later"""
+        try:
+            self.launch(batch_id)
+        except Exception as e:
+            self._retry(batch_id, f'run not started: {e}')
+            return False
+        self.launched += 1
+        return True
+
+    def poll(self):
+        """Launch the runs due now; returns the batch ids launched"""
+        # Launchers that know when a run ends (child processes) report failed runs
+        # right away; the others' failures show as batches without a result
+        for batch_id, returncode in getattr(self.launch, 'reap', list)():
+            if returncode:
+                self._retry(batch_id, f'run exited with code {returncode}')
+        for batch_id in self.queue.stale_batches(self.claim_timeout):
+            self._retry(batch_id, f'no result after {self.claim_timeout:g}s')
+
+        launched = []
+        in_flight = self.queue.in_flight()
+        while in_flight < self.max_in_flight:
+            # Batches to retry first, they hold the oldest requests
+            batch_id = self.queue.reclaim()
+            if batch_id is None:
+                count, oldest = self.queue.pending()
+                if not count or (count < self.max_batch_size and time.time() - oldest < self.max_wait_seconds):
+                    break
+                batch_id = self.queue.claim(self.max_batch_size)
+                if batch_id is None:
+                    break
+            if not self._launch(batch_id):
+                # Do not burn the attempts of every queued batch on a launcher that is down
+                break
+            launched.append(batch_id)
+            in_flight += 1
+        return launched
+
+    def run(self, poll_seconds=0.05, stop=None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                for batch_id in self.poll():
+                    print(f"🚀 Launched run for batch {batch_id}")
+            except Exception as e:
+                print(f"⚠️ Dispatch failed: {e}")
+            stop.wait(poll_seconds)
+
+
+def serve(queue, dispatcher, host='0.0.0.0', port=5001):
+    """
+    HTTP front end: POST /predict (one input, or {"inputs": [...]}) queues the
+    requests and answers 202 with their ids; GET /results/<id>?wait=<seconds>
+    returns the result (202 while pending); GET /stats.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def _reply(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_POST(self):
+            if self.path != '/predict':
+                return self._reply(404, {'error': 'not found'})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'null')
+            except ValueError:
+                return self._reply(400, {'error': 'invalid JSON'})
+            if isinstance(body, dict) and isinstance(body.get('inputs'), list):
+                return self._reply(202, {'request_ids': queue.enqueue_many(body['inputs'])})
+            if not isinstance(body, dict):
+                return self._reply(400, {'error': 'expected a JSON object'})
+            return self._reply(202, {'request_id': queue.enqueue(body)})
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/stats':
+                return self._reply(200, dict(queue.stats(), launched=dispatcher.launched))
+            if url.path.startswith('/results/'):
+                wait = float(parse_qs(url.query).get('wait', ['0'])[0])
+                entry = queue.wait(url.path[len('/results/'):], timeout=min(wait, 60))
+                if entry is None:
+                    return self._reply(404, {'error': 'unknown request id'})
+                return self._reply(200 if entry['status'] in (DONE, FAILED) else 202, entry)
+            return self._reply(404, {'error': 'not found'})
+
+        def log_message(self, format, *args):
+            pass
+
+    stop = threading.Event()
+    threading.Thread(target=dispatcher.run, kwargs={'stop': stop}, name='dispatcher', daemon=True).start()
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"📮 Prediction queue on {host}:{port} (batches of up to {dispatcher.max_batch_size}, "
+          f"window {dispatcher.max_wait_seconds}s)")
+    try:
+        server.serve_forever()
+    finally:
+        stop.set()
+        server.server_close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Coalesce triggered predictions into batched pipeline runs')
+    parser.add_argument('--queue', default=None, help=f'default: {PREDICTION_QUEUE_PATH}')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    for name, help_text in (('serve', 'HTTP front end + dispatcher'), ('dispatch', 'dispatcher only')):
+        command = sub.add_parser(name, help=help_text)
+        command.add_argument('--max-batch-size', type=int, default=500)
+        command.add_argument('--max-wait-seconds', type=float, default=1.0)
+        command.add_argument('--max-in-flight', type=int, default=2)
+        command.add_argument('--launcher', choices=('trigger', 'mage-cli', 'local'),
+                             default='trigger' if os.environ.get('PREDICTION_TRIGGER_URL') else 'mage-cli')
+        command.add_argument('--trigger-url', default=os.environ.get('PREDICTION_TRIGGER_URL'),
+                             help='Mage API trigger URL of asynch_prediction_pipeline')
+        if name == 'serve':
+            command.add_argument('--host', default='0.0.0.0')
+            command.add_argument('--port', type=int, default=5001)
+
+    enqueue = sub.add_parser('enqueue', help='queue one request (JSON object)')
+    enqueue.add_argument('input_data')
+    result = sub.add_parser('result', help='result of a request')
+    result.add_argument('request_id')
+    result.add_argument('--wait', type=float, default=0)
+    score = sub.add_parser('score', help='score a claimed batch in this process')
+    score.add_argument('batch_id')
+    sub.add_parser('stats', help='request and batch counts')
+    purge = sub.add_parser('purge', help='drop completed requests')
+    purge.add_argument('--older-than-hours', type=float, default=24)
+
+    args = parser.parse_args(argv)
+    queue = PredictionQueue(args.queue)
+
+    if args.command in ('serve', 'dispatch'):
+        if args.launcher == 'trigger':
+            if not args.trigger_url:
+                parser.error('--trigger-url (or PREDICTION_TRIGGER_URL) is required with --launcher trigger')
+            launch = trigger_launcher(args.trigger_url)
+        else:
+            launch = command_launcher(MAGE_CLI_COMMAND if args.launcher == 'mage-cli' else LOCAL_COMMAND)
+        dispatcher = Dispatcher(queue, launch, args.max_batch_size, args.max_wait_seconds, args.max_in_flight)
+        if args.command == 'serve':
+            serve(queue, dispatcher, args.host, args.port)
+        else:
+            dispatcher.run()
+    elif args.command == 'enqueue':
+        print(queue.enqueue(json.loads(args.input_data)))
+    elif args.command == 'result':
+        print(json.dumps(queue.wait(args.request_id, timeout=args.wait), indent=2))
+    elif args.command == 'score':
+        print(json.dumps(score_batch(queue, args.batch_id), indent=2))
+    elif args.command == 'stats':
+        print(json.dumps(queue.stats(), indent=2))
+    elif args.command == 'purge':
+        print(f"Removed {queue.purge(args.older_than_hours * 3600)} requests")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""
+Per-block resource instrumentation for the Mage pipeline blocks.
+
+`profiled(block_uuid)` wraps a data_loader/transformer/data_exporter function
+and measures wall/CPU time, peak RSS delta, output size and row count. The
+record travels downstream with the block output (key 'performance' of dict
+outputs, `attrs['performance']` of DataFrames), the same way cache statuses
+do, so register_model can aggregate the whole run into lineage.json.
+
+Set the `profile_blocks` variable to also collect a sampled call profile
+(a background thread reading this thread's stack every few ms); only the
+profile of the slowest block is kept in lineage.
+
+Compare two registered versions from the command line:
+    python -m mlops_demo.utils.profiling compare v_20240101_120000 v_20240102_120000
+"""
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+
+SAMPLE_INTERVAL = 0.005
+PROFILE_TOP_N = 15
+
+# Record of the block currently running in this process, see running_record()
+_RUNNING = {}
+
+
+def current_rss_bytes():
+    """Resident set size of this process (Linux /proc, falling back to peak RSS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class RSSSampler:
+    """Background thread recording the peak RSS while a block runs"""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.start_rss = self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_rss = max(self.peak_rss, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss_bytes()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss_bytes())
+
+
+class StackSampler:
+    """
+    Statistical profiler: samples the stack of the calling thread every
+    `interval` seconds, up to the `root` code object. Much cheaper than
+    cProfile on numpy/sklearn heavy code since it does not hook every call.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL, root=None):
+        self.interval = interval
+        self.root = root
+        self.samples = 0
+        self.own = Counter()
+        self.cumulative = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            self.samples += 1
+            self.own[_frame_label(frame)] += 1
+            seen = set()
+            while frame is not None:
+                label = _frame_label(frame)
+                if label not in seen:
+                    seen.add(label)
+                    self.cumulative[label] += 1
+                # Frames above the block function are the caller's, not the block's
+                frame = None if frame.f_code is self.root else frame.f_back
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def report(self, top_n=PROFILE_TOP_N):
+        def rows(counter):
+            return [
+                {'function': label, 'samples': n, 'seconds': round(n * self.interval, 3)}
+                for label, n in counter.most_common(top_n)
+            ]
+        return {
+            'interval_seconds': self.interval,
+            'samples': self.samples,
+            'cumulative': rows(self.cumulative),
+            'own': rows(self.own)
+        }
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}:{code.co_name}"
+
+
+def output_size_bytes(output):
+    """Approximate in-memory size of a block output without serializing it"""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(output, pd.DataFrame):
+        return int(output.memory_usage(index=True, deep=True).sum())
+    if isinstance(output, np.ndarray):
+        return int(output.nbytes)
+    if isinstance(output, dict):
+        return sys.getsizeof(output) + sum(output_size_bytes(v) for v in output.values())
+    if isinstance(output, (list, tuple)):
+        if not output:
+            return sys.getsizeof(output)
+        # Extrapolate from the first element: nested lists of floats are large
+        return sys.getsizeof(output) + len(output) * output_size_bytes(output[0])
+    return sys.getsizeof(output)
+
+
+def output_rows(output):
+    """Row count of a block output, None when it has no natural notion of rows"""
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(output, (pd.DataFrame, np.ndarray)):
+        return int(len(output))
+    if isinstance(output, dict):
+        shapes = output.get('data_shapes')
+        if shapes:
+            return int(shapes['X_train_shape'][0] + shapes['X_test_shape'][0])
+        if 'training_samples' in output:
+            return int(output['training_samples']) + int(output.get('test_samples', 0))
+    return None
+
+
+def upstream_performance(args):
+    """Performance records carried by the upstream block output, if any"""
+    import pandas as pd
+
+    if not args:
+        return {}
+    upstream = args[0]
+    if isinstance(upstream, dict):
+        return dict(upstream.get('performance') or {})
+    if isinstance(upstream, pd.DataFrame):
+        return dict(upstream.attrs.get('performance') or {})
+    return {}
+
+
+def running_record():
+    """
+    Measurements of the block currently running, up to now. Lets a data
+    exporter include its own cost in what it writes before it returns.
+    """
+    if not _RUNNING:
+        return None
+    return {
+        'wall_seconds': round(time.perf_counter() - _RUNNING['wall_start'], 4),
+        'cpu_seconds': round(time.process_time() - _RUNNING['cpu_start'], 4),
+        'peak_rss_delta_bytes': _RUNNING['rss'].peak_rss - _RUNNING['rss'].start_rss,
+        'peak_rss_bytes': _RUNNING['rss'].peak_rss,
+    }
+
+
+def profiled(block_uuid):
+    """Decorator measuring a block; place it under the Mage decorator"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            import pandas as pd
+
+            upstream = upstream_performance(args)
+            sampler = StackSampler(root=function.__code__) if kwargs.get('profile_blocks') else None
+            _RUNNING.clear()
+            _RUNNING.update({
+                'wall_start': time.perf_counter(),
+                'cpu_start': time.process_time()
+            })
+            try:
+                with RSSSampler() as rss:
+                    _RUNNING['rss'] = rss
+                    if sampler:
+                        with sampler:
+                            output = function(*args, **kwargs)
+                    else:
+                        output = function(*args, **kwargs)
+                record = running_record()
+            finally:
+                _RUNNING.clear()
+
+            # A tuple is several Mage outputs: the first one carries the records
+            primary = output[0] if isinstance(output, tuple) and output else output
+            record.update({
+                'rss_start_bytes': rss.start_rss,
+                'peak_rss_bytes': rss.peak_rss,
+                'peak_rss_delta_bytes': rss.peak_rss - rss.start_rss,
+                'output_bytes': (
+                    sum(output_size_bytes(o) for o in output) if isinstance(output, tuple)
+                    else output_size_bytes(output) if output is not None else 0
+                ),
+                'rows': output_rows(primary)
+            })
+            if sampler:
+                record['profile'] = sampler.report()
+
+            performance = {**upstream, block_uuid: record}
+            if isinstance(primary, dict):
+                primary['performance'] = performance
+            elif isinstance(primary, pd.DataFrame):
+                primary.attrs['performance'] = performance
+            return output
+        return wrapper
+    return decorator
+
+
+def summarize_performance(blocks):
+    """
+    Aggregate per-block records into the lineage `performance` section.
+    Only the sampled profile of the slowest block is kept.
+    """
+    blocks = {uuid: dict(record) for uuid, record in blocks.items()}
+    slowest = max(blocks, key=lambda uuid: blocks[uuid]['wall_seconds']) if blocks else None
+    profile = None
+    for uuid, record in blocks.items():
+        sampled = record.pop('profile', None)
+        if uuid == slowest:
+            profile = sampled
+    return {
+        'blocks': blocks,
+        'total_wall_seconds': round(sum(r['wall_seconds'] for r in blocks.values()), 4),
+        'total_cpu_seconds': round(sum(r['cpu_seconds'] for r in blocks.values()), 4),
+        'peak_rss_bytes': max((r['peak_rss_bytes'] for r in blocks.values()), default=0),
+        'slowest_block': slowest,
+        'slowest_block_profile': profile
+    }
+
+
+COMPARED_METRICS = ('wall_seconds', 'cpu_seconds', 'peak_rss_delta_bytes', 'output_bytes', 'rows')
+
+
+def compare_performance(before, after):
+    """Per-block metric ratios (after / before) of two lineage performance sections"""
+    comparison = {}
+    for uuid in sorted(set(before.get('blocks', {})) | set(after.get('blocks', {}))):
+        old = before.get('blocks', {}).get(uuid, {})
+        new = after.get('blocks', {}).get(uuid, {})
+        comparison[uuid] = {}
+        for metric in COMPARED_METRICS:
+            a, b = old.get(metric), new.get(metric)
+            comparison[uuid][metric] = {
+                'before': a,
+                'after': b,
+                'ratio': round(b / a, 3) if a and b is not None else None
+            }
+    return comparison
+
+
+def load_performance(version, registry_path=None):
+    from mlops_demo.utils.paths import REGISTRY_PATH
+
+    with open(os.path.join(registry_path or REGISTRY_PATH, version, 'lineage.json')) as f:
+        return json.load(f).get('performance') or {}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compare block performance of two registered versions')
+    sub = parser.add_subparsers(dest='command', required=True)
+    compare = sub.add_parser('compare')
+    compare.add_argument('before')
+    compare.add_argument('after')
+    compare.add_argument('--registry-path', default=None)
+    args = parser.parse_args(argv)
+
+    comparison = compare_performance(
+        load_performance(args.before, args.registry_path),
+        load_performance(args.after, args.registry_path)
+    )
+    print(f"{'block':<22} {'metric':<22} {args.before:>20} {args.after:>20} {'ratio':>7}")
+    for uuid, metrics in comparison.items():
+        for metric, values in metrics.items():
+            ratio = '' if values['ratio'] is None else f"x{values['ratio']}"
+            print(f"{uuid:<22} {metric:<22} {str(values['before']):>20} {str(values['after']):>20} {ratio:>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,424 @@
+"""
+SQLite catalog of the model registry.
+
+register_model indexes every version (timestamp, metrics, data hash, git
+commit, status...) in model_registry/catalog.db, so questions like "best AUC
+in the last 30 days" are one indexed query instead of opening every
+lineage.json. The served version lives in the `served` table: promotion is a
+single transaction, readers never see a half-written pointer, and the
+prediction service resolves it with one primary-key lookup. Every promotion
+is also logged (`promotions`) and versions can be pinned (`pins`), both used
+by registry_retention to decide what may be deleted.
+
+latest.json is still written (atomically) for the blocks that read it.
+
+The catalog keeps SQLite's default rollback journal rather than WAL: the
+prediction service mounts the registry read-only and WAL readers need write
+access to the -shm file.
+
+    python -m mlops_demo.utils.registry_catalog list --since-days 30 --order-by auc_score
+    python -m mlops_demo.utils.registry_catalog promote v_20240101_120000
+"""
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from mlops_demo.utils.paths import REGISTRY_CATALOG_PATH, REGISTRY_PATH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    version TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    status TEXT NOT NULL,
+    model_type TEXT,
+    model_backend TEXT,
+    training_mode TEXT,
+    parent_version TEXT,
+    accuracy REAL,
+    auc_score REAL,
+    training_samples INTEGER,
+    data_version TEXT,
+    data_hash TEXT,
+    git_commit TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_versions_timestamp ON versions (timestamp);
+CREATE INDEX IF NOT EXISTS idx_versions_auc_score ON versions (auc_score);
+CREATE INDEX IF NOT EXISTS idx_versions_data_hash ON versions (data_hash);
+CREATE INDEX IF NOT EXISTS idx_versions_git_commit ON versions (git_commit);
+CREATE INDEX IF NOT EXISTS idx_versions_status ON versions (status, timestamp);
+CREATE TABLE IF NOT EXISTS served (
+    slot TEXT PRIMARY KEY,
+    version TEXT NOT NULL REFERENCES versions (version),
+    promoted_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS promotions (
+    slot TEXT NOT NULL,
+    version TEXT NOT NULL,
+    promoted_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_promotions_slot ON promotions (slot, promoted_at);
+CREATE TABLE IF NOT EXISTS pins (
+    version TEXT PRIMARY KEY REFERENCES versions (version),
+    pinned_at TEXT NOT NULL,
+    reason TEXT
+);
+"""
+
+COLUMNS = (
+    'version', 'path', 'timestamp', 'status', 'model_type', 'model_backend',
+    'training_mode', 'parent_version', 'accuracy', 'auc_score', 'training_samples',
+    'data_version', 'data_hash', 'git_commit'
+)
+ORDERABLE = ('timestamp', 'accuracy', 'auc_score', 'training_samples', 'version')
+SERVED_SLOT = 'current'
+
+CURRENT_VERSION_SQL = (
+    "SELECT v.version, v.path FROM served s JOIN versions v ON v.version = s.version "
+    "WHERE s.slot = ?"
+)
+
+
+def row_from_lineage(lineage, path):
+    """Catalog row of a registered version from its lineage.json content"""
+    metrics = lineage.get('metrics') or {}
+    data = lineage.get('data_lineage') or {}
+    samples = metrics.get('training_samples')
+    timestamp = lineage.get('timestamp') or datetime.now().isoformat()
+    if '_' in timestamp:
+        # metadata.json of early versions uses the version's %Y%m%d_%H%M%S stamp
+        timestamp = datetime.strptime(timestamp, '%Y%m%d_%H%M%S').isoformat()
+    return {
+        'version': lineage['version'],
+        'path': path,
+        'timestamp': timestamp,
+        'status': lineage.get('status', 'registered'),
+        'model_type': lineage.get('model_type'),
+        'model_backend': lineage.get('model_backend'),
+        'training_mode': lineage.get('training_mode'),
+        'parent_version': lineage.get('parent_version'),
+        'accuracy': metrics.get('accuracy'),
+        'auc_score': metrics.get('auc_score'),
+        'training_samples': samples if isinstance(samples, int) else None,
+        'data_version': data.get('version'),
+        'data_hash': data.get('hash'),
+        'git_commit': (lineage.get('code_lineage') or {}).get('git_commit')
+    }
+
+
+def _served_since(conn, since, slot=SERVED_SLOT):
+    """Versions served at any moment since `since` (the current one included)"""
+    since = since.isoformat()
+    rows = conn.execute(
+        'SELECT version, promoted_at FROM promotions WHERE slot = ? ORDER BY promoted_at, rowid', (slot,)
+    ).fetchall()
+    served = {row['version'] for row in conn.execute('SELECT version FROM served WHERE slot = ?', (slot,))}
+    for row, following in zip(rows, rows[1:]):
+        # A version stays served until the next promotion
+        if following['promoted_at'] >= since:
+            served.add(row['version'])
+    return served
+
+
+def write_latest_pointer(registry_path, version, path):
+    """Write latest.json via a temporary file + rename so readers never see it torn"""
+    latest_path = os.path.join(registry_path, 'latest.json')
+    fd, tmp_path = tempfile.mkstemp(dir=registry_path, prefix='.latest.', suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({
+            'version': version,
+            'path': path,
+            'updated_at': datetime.now().strftime("%Y%m%d_%H%M%S")
+        }, f, indent=2)
+    os.replace(tmp_path, latest_path)
+    return latest_path
+
+
+class RegistryCatalog:
+
+    def __init__(self, path=None, read_only=False):
+        self.path = path or REGISTRY_CATALOG_PATH
+        self.read_only = read_only
+
+    def connect(self):
+        if self.read_only:
+            conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, timeout=5)
+        else:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.executescript(SCHEMA)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def register(self, lineage, path):
+        row = row_from_lineage(lineage, path)
+        conn = self.connect()
+        try:
+            with conn:
+                # Re-indexing an existing version keeps its status (e.g. 'served')
+                conn.execute(
+                    f"INSERT INTO versions ({', '.join(COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(COLUMNS))}) "
+                    f"ON CONFLICT (version) DO UPDATE SET "
+                    + ', '.join(f'{c} = excluded.{c}' for c in COLUMNS if c not in ('version', 'status')),
+                    [row[c] for c in COLUMNS]
+                )
+        finally:
+            conn.close()
+        return row
+
+    def promote(self, version, slot=SERVED_SLOT):
+        """
+        Make `version` the served one: status flip and pointer update in a
+        single transaction, then refresh latest.json for legacy readers.
+        """
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('SELECT path FROM versions WHERE version = ?', (version,)).fetchone()
+                if row is None:
+                    raise KeyError(f"Unknown model version '{version}'")
+                previous = conn.execute('SELECT version FROM served WHERE slot = ?', (slot,)).fetchone()
+                if previous and previous['version'] != version:
+                    conn.execute("UPDATE versions SET status = 'registered' WHERE version = ?",
+                                 (previous['version'],))
+                conn.execute("UPDATE versions SET status = 'served' WHERE version = ?", (version,))
+                promoted_at = datetime.now().isoformat()
+                conn.execute(
+                    'INSERT OR REPLACE INTO served (slot, version, promoted_at) VALUES (?, ?, ?)',
+                    (slot, version, promoted_at)
+                )
+                conn.execute(
+                    'INSERT INTO promotions (slot, version, promoted_at) VALUES (?, ?, ?)',
+                    (slot, version, promoted_at)
+                )
+        finally:
+            conn.close()
+        if slot == SERVED_SLOT:
+            write_latest_pointer(os.path.dirname(self.path), version, row['path'])
+        return {'version': version, 'path': row['path']}
+
+    def pin(self, version, reason=None):
+        """Protect a version from retention (see registry_retention)"""
+        conn = self.connect()
+        try:
+            with conn:
+                if conn.execute('SELECT 1 FROM versions WHERE version = ?', (version,)).fetchone() is None:
+                    raise KeyError(f"Unknown model version '{version}'")
+                conn.execute(
+                    'INSERT OR REPLACE INTO pins (version, pinned_at, reason) VALUES (?, ?, ?)',
+                    (version, datetime.now().isoformat(), reason)
+                )
+        finally:
+            conn.close()
+
+    def unpin(self, version):
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM pins WHERE version = ?', (version,))
+        finally:
+            conn.close()
+
+    def pinned(self):
+        conn = self.connect()
+        try:
+            return {row['version']: dict(row) for row in conn.execute('SELECT * FROM pins')}
+        finally:
+            conn.close()
+
+    def served_since(self, since):
+        conn = self.connect()
+        try:
+            return _served_since(conn, since)
+        finally:
+            conn.close()
+
+    def remove(self, versions, grace_seconds=0):
+        """
+        Unindex versions in one transaction, skipping any that are pinned or
+        were served during the last `grace_seconds` (a server may still be
+        loading them). promote() takes the same write lock, so a version cannot
+        be promoted while it is being removed. Returns the removed rows; only
+        their directories may be deleted afterwards.
+        """
+        conn = self.connect()
+        removed = []
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                protected = _served_since(conn, datetime.now() - timedelta(seconds=grace_seconds))
+                protected |= {row['version'] for row in conn.execute('SELECT version FROM served')}
+                protected |= {row['version'] for row in conn.execute('SELECT version FROM pins')}
+                for version in versions:
+                    if version in protected:
+                        continue
+                    row = conn.execute('SELECT * FROM versions WHERE version = ?', (version,)).fetchone()
+                    if row is None:
+                        continue
+                    conn.execute('DELETE FROM versions WHERE version = ?', (version,))
+                    conn.execute('DELETE FROM promotions WHERE version = ?', (version,))
+                    removed.append(dict(row))
+        finally:
+            conn.close()
+        return removed
+
+    def current(self, slot=SERVED_SLOT):
+        conn = self.connect()
+        try:
+            row = conn.execute(CURRENT_VERSION_SQL, (slot,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def get(self, version):
+        conn = self.connect()
+        try:
+            row = conn.execute('SELECT * FROM versions WHERE version = ?', (version,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def query(self, since=None, until=None, min_auc=None, data_hash=None, git_commit=None,
+              status=None, model_backend=None, order_by='timestamp', descending=True, limit=None):
+        """Filter versions on indexed columns; `since`/`until` are datetimes or ISO strings"""
+        if order_by not in ORDERABLE:
+            raise ValueError(f"Cannot order by '{order_by}', expected one of {ORDERABLE}")
+        clauses, params = [], []
+        for column, op, value in (
+            ('timestamp', '>=', since), ('timestamp', '<', until), ('auc_score', '>=', min_auc),
+            ('data_hash', '=', data_hash), ('git_commit', '=', git_commit),
+            ('status', '=', status), ('model_backend', '=', model_backend)
+        ):
+            if value is not None:
+                clauses.append(f'{column} {op} ?')
+                params.append(value.isoformat() if isinstance(value, datetime) else value)
+        sql = 'SELECT * FROM versions'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += f" ORDER BY {order_by} {'DESC' if descending else 'ASC'}"
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(int(limit))
+        conn = self.connect()
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def best(self, metric='auc_score', since_days=None):
+        since = datetime.now() - timedelta(days=since_days) if since_days else None
+        rows = self.query(since=since, order_by=metric, limit=1)
+        return rows[0] if rows else None
+
+    def ensure_indexed(self):
+        """Backfill a new, empty catalog from the version directories already on disk"""
+        conn = self.connect()
+        try:
+            empty = conn.execute('SELECT 1 FROM versions LIMIT 1').fetchone() is None
+        finally:
+            conn.close()
+        return self.rebuild() if empty else 0
+
+    def rebuild(self, registry_path=None):
+        """
+        Index the existing v_* directories (migration of registries predating
+        the catalog). Versions without lineage.json are read from metadata.json.
+        """
+        registry_path = registry_path or os.path.dirname(self.path)
+        indexed = 0
+        for name in sorted(os.listdir(registry_path)):
+            candidates = [os.path.join(registry_path, name, f) for f in ('lineage.json', 'metadata.json')]
+            existing = [path for path in candidates if os.path.exists(path)]
+            if not (name.startswith('v_') and existing):
+                continue
+            with open(existing[0]) as f:
+                lineage = json.load(f)
+            lineage.setdefault('version', name)
+            self.register(lineage, os.path.join(registry_path, name))
+            indexed += 1
+
+        latest_path = os.path.join(registry_path, 'latest.json')
+        if os.path.exists(latest_path) and not self.current():
+            with open(latest_path) as f:
+                latest = json.load(f)
+            if self.get(latest['version']):
+                self.promote(latest['version'])
+        return indexed
+
+
+def _print_rows(rows):
+    print(f"{'version':<22} {'timestamp':<20} {'status':<10} {'backend':<24} {'auc':>7} {'data hash':<14} {'commit':<10}")
+    for r in rows:
+        auc = f"{r['auc_score']:.4f}" if r['auc_score'] is not None else '-'
+        print(f"{r['version']:<22} {r['timestamp'][:19]:<20} {r['status']:<10} "
+              f"{(r['model_backend'] or '-'):<24} {auc:>7} {(r['data_hash'] or '-')[:12]:<14} "
+              f"{(r['git_commit'] or '-')[:8]:<10}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Query the model registry catalog')
+    parser.add_argument('--catalog', default=None, help=f'default: {REGISTRY_CATALOG_PATH}')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    listing = sub.add_parser('list', help='list versions')
+    listing.add_argument('--since-days', type=float)
+    listing.add_argument('--min-auc', type=float)
+    listing.add_argument('--data-hash')
+    listing.add_argument('--git-commit')
+    listing.add_argument('--status')
+    listing.add_argument('--backend')
+    listing.add_argument('--order-by', default='timestamp', choices=ORDERABLE)
+    listing.add_argument('--limit', type=int)
+
+    best = sub.add_parser('best', help='best version by metric')
+    best.add_argument('--metric', default='auc_score', choices=ORDERABLE)
+    best.add_argument('--since-days', type=float)
+
+    sub.add_parser('current', help='currently served version')
+    show = sub.add_parser('show', help='catalog row of one version')
+    show.add_argument('version')
+    promote = sub.add_parser('promote', help='serve a version')
+    promote.add_argument('version')
+    pin = sub.add_parser('pin', help='protect a version from retention')
+    pin.add_argument('version')
+    pin.add_argument('--reason')
+    unpin = sub.add_parser('unpin', help='remove the protection of a version')
+    unpin.add_argument('version')
+    sub.add_parser('rebuild', help=f'index existing versions of {REGISTRY_PATH}')
+
+    args = parser.parse_args(argv)
+    catalog = RegistryCatalog(args.catalog)
+
+    if args.command == 'list':
+        since = datetime.now() - timedelta(days=args.since_days) if args.since_days else None
+        _print_rows(catalog.query(
+            since=since, min_auc=args.min_auc, data_hash=args.data_hash, git_commit=args.git_commit,
+            status=args.status, model_backend=args.backend, order_by=args.order_by, limit=args.limit
+        ))
+    elif args.command == 'best':
+        row = catalog.best(args.metric, args.since_days)
+        _print_rows([row] if row else [])
+    elif args.command == 'current':
+        print(json.dumps(catalog.current(), indent=2))
+    elif args.command == 'show':
+        print(json.dumps(catalog.get(args.version), indent=2))
+    elif args.command == 'promote':
+        print(json.dumps(catalog.promote(args.version), indent=2))
+    elif args.command == 'pin':
+        catalog.pin(args.version, args.reason)
+        print(f"Pinned {args.version}")
+    elif args.command == 'unpin':
+        catalog.unpin(args.version)
+        print(f"Unpinned {args.version}")
+    elif args.command == 'rebuild':
+        print(f"Indexed {catalog.rebuild()} versions into {catalog.path}")
+
+
+if __name__ == '__main__':
+    main()
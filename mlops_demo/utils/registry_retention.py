@@ -0,0 +1,339 @@
+"""
+Retention and garbage collection of the model registry.
+
+A policy combines three rules, all optional:
+- keep_last: only the N most recent versions are kept
+- max_age_days: versions older than this are deleted
+- max_size: oldest versions are deleted until the registry (version
+  directories + artifact objects) fits the budget
+
+Whatever the rules say, the served version, pinned versions
+(`registry_catalog pin`), the top `keep_top` versions by `metric` and any
+version served during the last `grace_seconds` are kept.
+
+Deletion is safe while the prediction service is loading a model:
+- versions are unindexed in the same catalog transaction that re-checks
+  the protections, so they can no longer be resolved or promoted
+- their directory is renamed into .trash/ before being removed
+- files a process already opened stay readable until it closes them
+Artifact objects (artifact_store) are only removed once no version links
+them any more (link count 1); in-flight `.incoming.` writes are ignored.
+
+    python -m mlops_demo.utils.registry_retention plan --keep-last 20 --max-size 2GB
+    python -m mlops_demo.utils.registry_retention apply --keep-last 20 --max-size 2GB
+"""
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timedelta
+
+from mlops_demo.utils.paths import ARTIFACT_STORE_PATH, REGISTRY_PATH
+from mlops_demo.utils.registry_catalog import RegistryCatalog
+
+TRASH_DIR = '.trash'
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1 << 10, 'MB': 1 << 20, 'GB': 1 << 30, 'TB': 1 << 40}
+
+
+def parse_size(value):
+    """'500MB' / '2GB' / 1024 -> bytes"""
+    if value is None or isinstance(value, int):
+        return value
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?B?)\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid size '{value}', expected e.g. 500MB or 2GB")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def format_size(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f"{n:.0f}{unit}" if unit == 'B' else f"{n:.1f}{unit}"
+        n /= 1024
+
+
+class RetentionPolicy:
+
+    def __init__(self, keep_last=None, max_age_days=None, max_size=None, keep_top=3,
+                 metric='auc_score', grace_seconds=600):
+        self.keep_last = int(keep_last) if keep_last is not None else None
+        self.max_age_days = float(max_age_days) if max_age_days is not None else None
+        self.max_size = parse_size(max_size)
+        self.keep_top = int(keep_top)
+        self.metric = metric
+        self.grace_seconds = float(grace_seconds)
+
+    @classmethod
+    def parse(cls, spec):
+        """'keep_last=20,max_age_days=30,max_size=2GB' (a dict or policy is returned as is)"""
+        if spec is None or isinstance(spec, cls):
+            return spec
+        if isinstance(spec, dict):
+            return cls(**spec)
+        options = {}
+        for item in filter(None, spec.split(',')):
+            key, _, value = item.partition('=')
+            options[key.strip()] = value.strip() if key.strip() == 'metric' else value.strip() or None
+        return cls(**options)
+
+    @property
+    def active(self):
+        return any(rule is not None for rule in (self.keep_last, self.max_age_days, self.max_size))
+
+    def to_dict(self):
+        return {
+            'keep_last': self.keep_last,
+            'max_age_days': self.max_age_days,
+            'max_size': self.max_size,
+            'keep_top': self.keep_top,
+            'metric': self.metric,
+            'grace_seconds': self.grace_seconds
+        }
+
+
+def _locations(catalog, registry_path, store_root):
+    catalog = catalog or RegistryCatalog()
+    registry_path = registry_path or os.path.dirname(catalog.path)
+    if store_root is None:
+        store_root = ARTIFACT_STORE_PATH if registry_path == REGISTRY_PATH else os.path.join(registry_path, 'objects')
+    return catalog, registry_path, store_root
+
+
+def scan_usage(registry_path, store_root):
+    """
+    Disk usage of the registry: for every version directory the bytes it
+    owns alone and the store objects (by inode) it links; sizes of objects.
+    """
+    objects = {}
+    if os.path.isdir(store_root):
+        for root, _, files in os.walk(store_root):
+            for name in files:
+                if name.startswith('.incoming.'):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                objects[stat.st_ino] = {'path': os.path.join(root, name), 'bytes': stat.st_size,
+                                        'nlink': stat.st_nlink}
+
+    versions = {}
+    for name in os.listdir(registry_path):
+        path = os.path.join(registry_path, name)
+        if not (name.startswith('v_') and os.path.isdir(path)):
+            continue
+        owned, linked = 0, set()
+        for root, _, files in os.walk(path):
+            for file_name in files:
+                stat = os.stat(os.path.join(root, file_name))
+                if stat.st_ino in objects:
+                    linked.add(stat.st_ino)
+                else:
+                    owned += stat.st_size
+        versions[name] = {'path': path, 'owned_bytes': owned, 'objects': linked}
+    return versions, objects
+
+
+def plan(policy, catalog=None, registry_path=None, store_root=None, now=None):
+    """Dry run: which versions the policy deletes and how many bytes that frees"""
+    policy = RetentionPolicy.parse(policy)
+    catalog, registry_path, store_root = _locations(catalog, registry_path, store_root)
+    now = now or datetime.now()
+
+    usage, objects = scan_usage(registry_path, store_root)
+    rows = catalog.query(order_by='timestamp', descending=True)
+    current = catalog.current()
+
+    protected = {}
+    if current:
+        protected[current['version']] = 'served'
+    for version in catalog.served_since(now - timedelta(seconds=policy.grace_seconds)):
+        protected.setdefault(version, 'recently served')
+    for version in catalog.pinned():
+        protected.setdefault(version, 'pinned')
+    ranked = sorted((r for r in rows if r.get(policy.metric) is not None),
+                    key=lambda r: r[policy.metric], reverse=True)
+    for row in ranked[:policy.keep_top]:
+        protected.setdefault(row['version'], f'top {policy.keep_top} {policy.metric}')
+
+    # References still held on every object if nothing is deleted (the store's own
+    # link, other versions, anything outside the registry)
+    references = {ino: info['nlink'] for ino, info in objects.items()}
+    total_bytes = sum(v['owned_bytes'] for v in usage.values()) + sum(o['bytes'] for o in objects.values())
+    # Objects already unreferenced (e.g. left by an interrupted run) go anyway
+    orphan_bytes = sum(o['bytes'] for o in objects.values() if o['nlink'] == 1)
+
+    decisions = {}
+    for rank, row in enumerate(rows):
+        reasons = []
+        if policy.keep_last is not None and rank >= policy.keep_last:
+            reasons.append(f'beyond keep_last={policy.keep_last}')
+        if policy.max_age_days is not None and row['timestamp'] < (now - timedelta(days=policy.max_age_days)).isoformat():
+            reasons.append(f'older than {policy.max_age_days:g} days')
+        decisions[row['version']] = reasons
+
+    def release(version):
+        """Bytes freed by deleting `version` given what is already deleted"""
+        info = usage.get(version)
+        if info is None:
+            return 0
+        freed = info['owned_bytes']
+        for ino in info['objects']:
+            references[ino] -= 1
+            if references[ino] == 1:
+                freed += objects[ino]['bytes']
+        return freed
+
+    report_rows = []
+    remaining = total_bytes - orphan_bytes
+    deleted = []
+    for row in reversed(rows):  # oldest first
+        version = row['version']
+        if version in protected or not decisions[version]:
+            continue
+        freed = release(version)
+        remaining -= freed
+        deleted.append(version)
+        report_rows.append((row, 'delete', decisions[version], freed))
+
+    if policy.max_size is not None:
+        for row in reversed(rows):
+            if remaining <= policy.max_size:
+                break
+            version = row['version']
+            if version in protected or version in deleted:
+                continue
+            freed = release(version)
+            remaining -= freed
+            deleted.append(version)
+            report_rows.append((row, 'delete', [f'over size budget {format_size(policy.max_size)}'], freed))
+
+    kept = [
+        (row, 'keep', [protected[row['version']]] if row['version'] in protected else [], 0)
+        for row in rows if row['version'] not in deleted
+    ]
+    entries = sorted(kept + report_rows, key=lambda item: item[0]['timestamp'], reverse=True)
+    orphans = sorted(set(usage) - {row['version'] for row in rows})
+
+    return {
+        'policy': policy.to_dict(),
+        'registry_path': registry_path,
+        'versions': [
+            {
+                'version': row['version'],
+                'timestamp': row['timestamp'],
+                policy.metric: row.get(policy.metric),
+                'action': action,
+                'reasons': reasons,
+                'bytes': usage.get(row['version'], {}).get('owned_bytes', 0),
+                'reclaimed_bytes': freed
+            }
+            for row, action, reasons, freed in entries
+        ],
+        # Directories the catalog does not know about are never touched
+        'unindexed': orphans,
+        'delete': deleted,
+        'unreferenced_objects': sum(1 for n in references.values() if n <= 1),
+        'orphan_object_bytes': orphan_bytes,
+        'total_bytes': total_bytes,
+        'reclaimed_bytes': total_bytes - remaining,
+        'remaining_bytes': remaining,
+        'within_budget': policy.max_size is None or remaining <= policy.max_size
+    }
+
+
+def collect_objects(store_root=None):
+    """Remove artifact objects no version links any more; returns (count, bytes)"""
+    store_root = store_root or ARTIFACT_STORE_PATH
+    removed, freed = 0, 0
+    if not os.path.isdir(store_root):
+        return removed, freed
+    for root, _, files in os.walk(store_root):
+        for name in files:
+            if name.startswith('.incoming.'):
+                continue
+            path = os.path.join(root, name)
+            stat = os.stat(path)
+            if stat.st_nlink == 1:
+                # A concurrent registration relinking it re-stores the object
+                # (ArtifactStore.add_version_artifacts), so unlinking is safe
+                os.remove(path)
+                removed += 1
+                freed += stat.st_size
+    return removed, freed
+
+
+def apply(policy, catalog=None, registry_path=None, store_root=None, now=None):
+    """Delete what plan() selects, then collect unreferenced objects"""
+    policy = RetentionPolicy.parse(policy)
+    catalog, registry_path, store_root = _locations(catalog, registry_path, store_root)
+    report = plan(policy, catalog, registry_path, store_root, now)
+
+    # Protections are checked again under the catalog's write lock
+    removed = catalog.remove(report['delete'], grace_seconds=policy.grace_seconds)
+    trash = os.path.join(registry_path, TRASH_DIR)
+    os.makedirs(trash, exist_ok=True)
+    for row in removed:
+        path = os.path.join(registry_path, row['version'])
+        if os.path.isdir(path):
+            target = os.path.join(trash, f"{row['version']}.{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+            os.rename(path, target)
+    # Also finishes deletions interrupted by a previous run
+    for name in os.listdir(trash):
+        shutil.rmtree(os.path.join(trash, name), ignore_errors=True)
+
+    objects_removed, objects_bytes = collect_objects(store_root)
+    report.update({
+        'dry_run': False,
+        'deleted': [row['version'] for row in removed],
+        'skipped': sorted(set(report['delete']) - {row['version'] for row in removed}),
+        'objects_removed': objects_removed,
+        'objects_reclaimed_bytes': objects_bytes
+    })
+    return report
+
+
+def print_report(report):
+    print(f"{'version':<24} {'timestamp':<20} {'action':<7} {'size':>9} {'frees':>9}  reasons")
+    for v in report['versions']:
+        print(f"{v['version']:<24} {v['timestamp'][:19]:<20} {v['action']:<7} "
+              f"{format_size(v['bytes']):>9} {format_size(v['reclaimed_bytes']):>9}  {', '.join(v['reasons'])}")
+    for name in report['unindexed']:
+        print(f"{name:<24} {'':<20} {'skip':<7} {'':>9} {'':>9}  not in catalog (run registry-rebuild)")
+    print(f"\nRegistry: {format_size(report['total_bytes'])} -> {format_size(report['remaining_bytes'])} "
+          f"({format_size(report['reclaimed_bytes'])} reclaimed, {len(report['delete'])} versions)")
+    if not report['within_budget']:
+        print(f"⚠️  Protected versions alone exceed the size budget of {format_size(report['policy']['max_size'])}")
+    if 'deleted' in report:
+        print(f"Deleted {len(report['deleted'])} versions, {report['objects_removed']} objects "
+              f"({format_size(report['objects_reclaimed_bytes'])})")
+        if report['skipped']:
+            print(f"Skipped (became protected meanwhile): {', '.join(report['skipped'])}")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Apply a retention policy to the model registry')
+    parser.add_argument('command', choices=('plan', 'apply'), help='plan is a dry run')
+    parser.add_argument('--catalog', default=None)
+    parser.add_argument('--keep-last', type=int)
+    parser.add_argument('--max-age-days', type=float)
+    parser.add_argument('--max-size', help='e.g. 500MB, 2GB')
+    parser.add_argument('--keep-top', type=int, default=3)
+    parser.add_argument('--metric', default='auc_score')
+    parser.add_argument('--grace-seconds', type=float, default=600)
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args(argv)
+
+    policy = RetentionPolicy(
+        keep_last=args.keep_last, max_age_days=args.max_age_days, max_size=args.max_size,
+        keep_top=args.keep_top, metric=args.metric, grace_seconds=args.grace_seconds
+    )
+    catalog = RegistryCatalog(args.catalog)
+    report = apply(policy, catalog) if args.command == 'apply' else plan(policy, catalog)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()
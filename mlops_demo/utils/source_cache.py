@@ -0,0 +1,188 @@
+"""
+Local cache of remote data files (HTTP sources) for the data loaders.
+
+Each URL gets a directory under SOURCE_CACHE_PATH with:
+- source: the downloaded bytes, as served
+- data.parquet / data.feather: the parsed DataFrame, dtypes included
+- meta.json: the ETag / Last-Modified validators, the SHA256 of the source and
+  the key of the parsed copy (source hash + parse options)
+
+fetch() revalidates the cached copy with a conditional GET (If-None-Match /
+If-Modified-Since): an unchanged source answers 304 and nothing is
+transferred. In offline mode (or SOURCE_CACHE_OFFLINE=1) the network is never
+used; when the server cannot be reached the cached copy is served too, with a
+warning. read_csv() parses the CSV only when the source bytes changed,
+repeat runs read the typed columnar copy instead.
+
+    df, record = SourceCache().read_csv(url)
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from mlops_demo.utils.paths import SOURCE_CACHE_PATH
+
+META_FILE = 'meta.json'
+SOURCE_FILE = 'source'
+PARSED_FORMATS = ('parquet', 'feather')
+DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+class SourceCache:
+
+    def __init__(self, root=None, offline=None, timeout=30, max_age_seconds=0, session=None):
+        """
+        max_age_seconds: a copy fetched more recently than this is used
+        without revalidation (0: always revalidate unless offline).
+        session: requests-compatible session, e.g. to add authentication.
+        """
+        self.root = root or SOURCE_CACHE_PATH
+        self.offline = _env_flag('SOURCE_CACHE_OFFLINE') if offline is None else bool(offline)
+        self.timeout = timeout
+        self.max_age_seconds = max_age_seconds
+        self.session = session
+
+    def _entry_path(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.root, key[:2], key)
+
+    def _read_meta(self, path):
+        try:
+            with open(os.path.join(path, META_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, path, meta):
+        # Written last and atomically: a complete meta.json means a complete entry
+        fd, staging = tempfile.mkstemp(prefix='.meta_', dir=path)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(staging, os.path.join(path, META_FILE))
+
+    def _download(self, response, path):
+        digest = hashlib.sha256()
+        size = 0
+        fd, staging = tempfile.mkstemp(prefix='.source_', dir=path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_BYTES):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+            os.replace(staging, os.path.join(path, SOURCE_FILE))
+        except Exception:
+            os.unlink(staging)
+            raise
+        return digest.hexdigest(), size
+
+    def fetch(self, url):
+        """
+        Local copy of url, revalidated unless offline. Returns (source path,
+        meta dict, status) with status one of 'downloaded', 'not_modified',
+        'fresh' (within max_age_seconds), 'offline' or 'stale' (server
+        unreachable, cached copy served).
+        """
+        import requests
+
+        path = self._entry_path(url)
+        meta = self._read_meta(path)
+        source_path = os.path.join(path, SOURCE_FILE)
+        cached = meta is not None and os.path.exists(source_path)
+
+        if self.offline:
+            if not cached:
+                raise FileNotFoundError(f'No cached copy of {url} (offline mode)')
+            return source_path, meta, 'offline'
+        if cached and time.time() - meta['checked_at'] < self.max_age_seconds:
+            return source_path, meta, 'fresh'
+
+        headers = {}
+        if cached and meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if cached and meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        try:
+            response = (self.session or requests).get(url, headers=headers, timeout=self.timeout, stream=True)
+            with response:
+                if response.status_code == 304 and cached:
+                    status = 'not_modified'
+                else:
+                    response.raise_for_status()
+                    os.makedirs(path, exist_ok=True)
+                    sha256, size = self._download(response, path)
+                    meta = {
+                        **(meta or {}),
+                        'url': url,
+                        'etag': response.headers.get('ETag'),
+                        'last_modified': response.headers.get('Last-Modified'),
+                        'sha256': sha256,
+                        'bytes': size,
+                        'downloaded_at': time.time()
+                    }
+                    status = 'downloaded'
+        except requests.RequestException as e:
+            if not cached:
+                raise
+            print(f"⚠️  Warning: could not revalidate {url} ({e}), using the cached copy")
+            return source_path, meta, 'stale'
+
+        meta['checked_at'] = time.time()
+        self._write_meta(path, meta)
+        return source_path, meta, status
+
+    def read_csv(self, url, format='parquet', columns=None, **read_csv_options):
+        """
+        DataFrame of the CSV at url, parsed at most once per source version.
+        `columns` only reads those columns of the typed copy. Returns
+        (DataFrame, record) where record tells what was reused.
+        """
+        import pandas as pd
+
+        if format not in PARSED_FORMATS:
+            raise ValueError(f"Unknown parsed format '{format}', expected one of {PARSED_FORMATS}")
+        start = time.perf_counter()
+        source_path, meta, status = self.fetch(url)
+        path = os.path.dirname(source_path)
+        parsed_key = hashlib.sha256(json.dumps(
+            [meta['sha256'], format, read_csv_options], sort_keys=True, default=str
+        ).encode()).hexdigest()
+        parsed_path = os.path.join(path, f'data.{format}')
+
+        if meta.get('parsed_key') == parsed_key and os.path.exists(parsed_path):
+            read = pd.read_parquet if format == 'parquet' else pd.read_feather
+            df = read(parsed_path, columns=columns)
+            parsed = 'hit'
+        else:
+            df = pd.read_csv(source_path, **read_csv_options)
+            fd, staging = tempfile.mkstemp(prefix='.data_', dir=path)
+            os.close(fd)
+            try:
+                if format == 'parquet':
+                    df.to_parquet(staging, index=False)
+                else:
+                    df.reset_index(drop=True).to_feather(staging)
+                os.replace(staging, parsed_path)
+            except Exception:
+                os.unlink(staging)
+                raise
+            meta = {**meta, 'parsed_key': parsed_key, 'parsed_format': format}
+            self._write_meta(path, meta)
+            if columns is not None:
+                df = df[list(columns)]
+            parsed = 'miss'
+
+        return df, {
+            'url': url,
+            'status': status,
+            'parsed': parsed,
+            'sha256': meta['sha256'],
+            'etag': meta.get('etag'),
+            'seconds': round(time.perf_counter() - start, 4)
+        }
@@ -0,0 +1,287 @@
+"""
+Out-of-core preprocessing for the churn training pipeline.
+
+The in-memory path in transformers/data_preproecessing.py needs the whole frame
+in RAM. This module does the same work in two streaming passes:
+
+1. fit: per-chunk mergeable statistics (moments + median sketches) and the
+   train/test assignment counts
+2. transform: impute, scale and write each chunk into preallocated .npy
+   memmaps for the training block
+
+Stats from several files can be fitted in worker processes and merged.
+"""
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mlops_demo.utils.feature_profile import profile_from_sketches
+from mlops_demo.utils.features import COLUMN_DTYPES, ID_COLUMN, TARGET_COLUMN, apply_dtype_policy
+from mlops_demo.utils.streaming_stats import QuantileSketch, RunningMoments
+
+DEFAULT_CHUNK_SIZE = 100_000
+EXCLUDED_COLUMNS = [ID_COLUMN, TARGET_COLUMN]
+
+
+def iter_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield DataFrame chunks from a DataFrame, a CSV file or a Parquet file.
+    File chunks are downcast to the dtype policy as they are read.
+    """
+    import pandas as pd
+
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunk_size):
+            yield source.iloc[start:start + chunk_size]
+    elif str(source).endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size):
+            yield apply_dtype_policy(batch.to_pandas())
+    else:
+        for chunk in pd.read_csv(source, chunksize=chunk_size):
+            yield apply_dtype_policy(chunk)
+
+
+def source_fingerprint(source):
+    """Cheap fingerprint of a file source (path, size, mtime)"""
+    stat = os.stat(source)
+    return hashlib.sha256(f'{os.path.abspath(source)}:{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest()
+
+
+def _row_uniforms(ids, random_state):
+    """Deterministic U[0, 1) per row derived from its id, independent of row order"""
+    ids = np.asarray(ids).astype(np.uint64)
+    x = ids * np.uint64(0x9E3779B97F4A7C15) + np.uint64(random_state)
+    # splitmix64 finalizer
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class StratifiedStreamSplitter:
+    """
+    Per-row train/test assignment without a global shuffle.
+
+    Each row gets a pseudo-random draw from its id. Within a chunk, for every
+    class, the rows with the smallest draws go to test until the cumulative test
+    count for that class reaches round(test_size * rows_seen), so class
+    proportions stay exact at every chunk boundary.
+    """
+
+    def __init__(self, test_size=0.2, random_state=42):
+        self.test_size = test_size
+        self.random_state = random_state
+        self.seen = {}
+        self.assigned = {}
+
+    def assign(self, ids, y):
+        y = np.asarray(y)
+        draws = _row_uniforms(ids, self.random_state)
+        is_test = np.zeros(len(y), dtype=bool)
+        for label in np.unique(y):
+            rows = np.flatnonzero(y == label)
+            seen = self.seen.get(label, 0) + rows.size
+            wanted = int(round(self.test_size * seen)) - self.assigned.get(label, 0)
+            wanted = max(0, min(wanted, rows.size))
+            if wanted:
+                chosen = rows[np.argpartition(draws[rows], wanted - 1)[:wanted]]
+                is_test[chosen] = True
+            self.seen[label] = seen
+            self.assigned[label] = self.assigned.get(label, 0) + wanted
+        return is_test
+
+
+class StreamingStats:
+    """Mergeable partial fit state: moments, median sketches and split counts"""
+
+    def __init__(self, feature_names, sketch_size=1024):
+        self.feature_names = list(feature_names)
+        self.moments = RunningMoments(len(self.feature_names))
+        self.sketches = [QuantileSketch(k=sketch_size, seed=i) for i in range(len(self.feature_names))]
+        self.missing = np.zeros(len(self.feature_names), dtype=np.int64)
+        self.rows = 0
+        self.test_rows = 0
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        self.moments.update(X)
+        self.missing += np.isnan(X).sum(axis=0)
+        for i, sketch in enumerate(self.sketches):
+            sketch.update(X[:, i])
+        self.rows += X.shape[0]
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        self.missing += other.missing
+        self.rows += other.rows
+        self.test_rows += other.test_rows
+        return self
+
+    def medians(self):
+        return np.array([sketch.quantile(0.5) for sketch in self.sketches])
+
+    def scaler(self):
+        """
+        StandardScaler equivalent to fitting on the median-imputed data.
+        Imputed NaNs are folded into the moments analytically, so no second
+        pass over the raw data is needed.
+        """
+        from sklearn.preprocessing import StandardScaler
+
+        medians = self.medians()
+        moments = RunningMoments(len(self.feature_names)).merge(self.moments)
+        moments.add_constant(medians, self.missing)
+
+        var = moments.variance
+        scale = np.sqrt(var)
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+
+        scaler = StandardScaler()
+        scaler.mean_ = moments.mean.copy()
+        scaler.var_ = var
+        scaler.scale_ = scale
+        scaler.n_samples_seen_ = int(self.rows)
+        scaler.n_features_in_ = len(self.feature_names)
+        scaler.feature_names_in_ = np.array(self.feature_names, dtype=object)
+        return scaler
+
+
+def _chunk_ids(chunk, id_column, offset):
+    if id_column in chunk:
+        return chunk[id_column].to_numpy()
+    return np.arange(offset, offset + len(chunk))
+
+
+def _fit_source(source, feature_names, chunk_size, sketch_size, split):
+    """Fit one source; each source gets its own splitter so sources are independent"""
+    test_size, random_state, target, id_column = split
+    stats = StreamingStats(feature_names, sketch_size=sketch_size)
+    splitter = StratifiedStreamSplitter(test_size, random_state)
+    for chunk in iter_chunks(source, chunk_size):
+        stats.test_rows += int(splitter.assign(
+            _chunk_ids(chunk, id_column, stats.rows), chunk[target].to_numpy()
+        ).sum())
+        stats.update(chunk[feature_names].to_numpy(dtype=np.float64))
+    return stats
+
+
+def fit_stats(sources, feature_names, split, chunk_size=DEFAULT_CHUNK_SIZE, sketch_size=1024, n_jobs=1):
+    """
+    Fit StreamingStats over one or more sources, one worker process per source.
+    split is (test_size, random_state, target, id_column).
+    """
+    if n_jobs == 1 or len(sources) == 1:
+        partials = [_fit_source(s, feature_names, chunk_size, sketch_size, split) for s in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            partials = list(pool.map(
+                _fit_source, sources,
+                [feature_names] * len(sources),
+                [chunk_size] * len(sources),
+                [sketch_size] * len(sources),
+                [split] * len(sources)
+            ))
+    stats = partials[0]
+    for partial in partials[1:]:
+        stats.merge(partial)
+    return stats
+
+
+def save_imputation_values(feature_names, values, path):
+    with open(path, 'w') as f:
+        json.dump({
+            'strategy': 'median',
+            'values': dict(zip(feature_names, map(float, values)))
+        }, f, indent=2)
+    return path
+
+
+def preprocess_streaming(
+    sources,
+    output_dir,
+    test_size=0.2,
+    random_state=42,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    sketch_size=1024,
+    n_jobs=1,
+    target=TARGET_COLUMN,
+    id_column=ID_COLUMN,
+    dtype=np.float64,
+):
+    """
+    Two-pass out-of-core preprocessing. Returns the fitted scaler, the median
+    imputation values, the reference feature profile and the paths/shapes of
+    the written train/test arrays.
+    Statistics are accumulated in float64; the feature arrays are written as
+    `dtype` and the targets with the policy dtype of `target`.
+    """
+    sources = sources if isinstance(sources, (list, tuple)) else [sources]
+    first = next(iter_chunks(sources[0], chunk_size=1))
+    feature_names = [col for col in first.columns if col not in EXCLUDED_COLUMNS]
+
+    # Pass 1: statistics and split sizes (parallel across sources)
+    split = (test_size, random_state, target, id_column)
+    stats = fit_stats(sources, feature_names, split, chunk_size, sketch_size, n_jobs)
+    medians = stats.medians()
+    scaler = stats.scaler()
+    n_test = stats.test_rows
+    n_train = stats.rows - n_test
+
+    # Pass 2: impute, scale and write into preallocated memmaps
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {name: os.path.join(output_dir, f'{name}.npy') for name in ('X_train', 'X_test', 'y_train', 'y_test')}
+    open_memmap = np.lib.format.open_memmap
+    y_dtype = COLUMN_DTYPES.get(target, np.int64)
+    X_train = open_memmap(paths['X_train'], mode='w+', dtype=dtype, shape=(n_train, len(feature_names)))
+    X_test = open_memmap(paths['X_test'], mode='w+', dtype=dtype, shape=(n_test, len(feature_names)))
+    y_train = open_memmap(paths['y_train'], mode='w+', dtype=y_dtype, shape=(n_train,))
+    y_test = open_memmap(paths['y_test'], mode='w+', dtype=y_dtype, shape=(n_test,))
+
+    train_pos = test_pos = 0
+    for source in sources:
+        splitter = StratifiedStreamSplitter(test_size, random_state)
+        offset = 0
+        for chunk in iter_chunks(source, chunk_size):
+            y = chunk[target].to_numpy()
+            is_test = splitter.assign(_chunk_ids(chunk, id_column, offset), y)
+            offset += len(chunk)
+
+            X = chunk[feature_names].to_numpy(dtype=np.float64)
+            X = np.where(np.isnan(X), medians, X)
+            X = (X - scaler.mean_) / scaler.scale_
+
+            n = int(is_test.sum())
+            X_test[test_pos:test_pos + n] = X[is_test]
+            y_test[test_pos:test_pos + n] = y[is_test]
+            X_train[train_pos:train_pos + len(y) - n] = X[~is_test]
+            y_train[train_pos:train_pos + len(y) - n] = y[~is_test]
+            test_pos += n
+            train_pos += len(y) - n
+
+    for array in (X_train, X_test, y_train, y_test):
+        array.flush()
+
+    return {
+        'scaler': scaler,
+        'feature_names': feature_names,
+        'imputation_values': medians,
+        'paths': paths,
+        'shapes': {
+            'X_train_shape': (n_train, len(feature_names)),
+            'X_test_shape': (n_test, len(feature_names)),
+            'y_train_shape': (n_train,),
+            'y_test_shape': (n_test,)
+        },
+        'rows': stats.rows,
+        'feature_profile': profile_from_sketches(feature_names, stats.sketches, stats.missing, stats.rows),
+        'sketch_values_per_feature': max(sketch.size for sketch in stats.sketches)
+    }
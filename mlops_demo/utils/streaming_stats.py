@@ -0,0 +1,128 @@
+"""
+Mergeable, bounded-memory statistics for out-of-core preprocessing.
+
+RunningMoments keeps per-column count/mean/M2 (Chan et al. parallel update) so
+partial results from chunks or worker processes combine exactly.
+QuantileSketch is a KLL-style compactor sketch: memory is O(k log(n/k)) values
+per column whatever the row count, and sketches built on different chunks
+merge into one.
+"""
+import numpy as np
+
+
+class RunningMoments:
+    """NaN-aware per-column mean and variance over a stream of 2D chunks"""
+
+    def __init__(self, n_features):
+        self.count = np.zeros(n_features, dtype=np.int64)
+        self.mean = np.zeros(n_features, dtype=np.float64)
+        self.m2 = np.zeros(n_features, dtype=np.float64)
+
+    def _combine(self, count_b, mean_b, m2_b):
+        count = self.count + count_b
+        safe = np.where(count > 0, count, 1)
+        delta = mean_b - self.mean
+        self.mean = self.mean + delta * (count_b / safe)
+        self.m2 = self.m2 + m2_b + delta ** 2 * (self.count * count_b / safe)
+        self.count = count
+
+    def update(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        mask = ~np.isnan(X)
+        count_b = mask.sum(axis=0)
+        safe = np.where(count_b > 0, count_b, 1)
+        mean_b = np.where(mask, X, 0.0).sum(axis=0) / safe
+        m2_b = (np.where(mask, X - mean_b, 0.0) ** 2).sum(axis=0)
+        self._combine(count_b, mean_b, m2_b)
+        return self
+
+    def add_constant(self, values, counts):
+        """Account for `counts` extra rows equal to `values` (e.g. imputed NaNs)"""
+        counts = np.asarray(counts, dtype=np.int64)
+        self._combine(counts, np.asarray(values, dtype=np.float64), np.zeros_like(self.m2))
+        return self
+
+    def merge(self, other):
+        self._combine(other.count, other.mean, other.m2)
+        return self
+
+    @property
+    def variance(self):
+        """Population variance (ddof=0), matching StandardScaler.var_"""
+        return self.m2 / np.where(self.count > 0, self.count, 1)
+
+
+class QuantileSketch:
+    """Approximate quantiles of one column in bounded memory"""
+
+    def __init__(self, k=1024, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += values.size
+        self._compact()
+        return self
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            buffer = self.levels[level]
+            if buffer.size > self.k:
+                buffer = np.sort(buffer)
+                # Keep an odd leftover at this level so total weight is preserved
+                if buffer.size % 2:
+                    keep, buffer = buffer[:1], buffer[1:]
+                else:
+                    keep = np.empty(0)
+                promoted = buffer[self._rng.integers(2)::2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def merge(self, other):
+        for level, buffer in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], buffer])
+        self.count += other.count
+        self._compact()
+        return self
+
+    def quantile(self, q):
+        if self.count == 0:
+            return float('nan')
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(buffer.size, 2.0 ** level) for level, buffer in enumerate(self.levels)
+        ])
+        order = np.argsort(values, kind='mergesort')
+        values, cumulative = values[order], np.cumsum(weights[order])
+        target = q * cumulative[-1]
+        # Average the two middle ranks like pandas does for an even median
+        lower = values[min(np.searchsorted(cumulative, target), values.size - 1)]
+        upper = values[min(np.searchsorted(cumulative, target, side='right'), values.size - 1)]
+        return float((lower + upper) / 2)
+
+    def rank(self, points):
+        """Approximate number of values <= each of `points`"""
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([
+            np.full(buffer.size, 2.0 ** level) for level, buffer in enumerate(self.levels)
+        ])
+        order = np.argsort(values, kind='mergesort')
+        cumulative = np.concatenate([[0.0], np.cumsum(weights[order])])
+        return cumulative[np.searchsorted(values[order], points, side='right')]
+
+    @property
+    def size(self):
+        return sum(buffer.size for buffer in self.levels)
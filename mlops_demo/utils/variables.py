@@ -0,0 +1,17 @@
+"""
+Parsing of pipeline runtime variables.
+
+Variables set from the CLI (--runtime-vars), a trigger or the API arrive as
+strings as often as JSON booleans, and 'false' is truthy to Python.
+"""
+
+TRUE_STRINGS = ('1', 'true', 'yes', 'on')
+
+
+def as_bool(value, default=False):
+    """Boolean value of a runtime variable; `default` when it is not set"""
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE_STRINGS
+    return bool(value)